@@ -10,6 +10,7 @@ function usage {
   echo "  -f, --force              Force a clean re-build of the virtual environment. Useful when dependencies have been added."
   echo "  -s, --smoke              Only run smoke tests"
   echo "  -w, --whitebox           Only run whitebox tests"
+  echo "  -jN, --parallel=N        Run test classes in N parallel worker processes"
   echo "  -c, --nova-coverage      Enable Nova coverage collection"
   echo "  -p, --pep8               Just run pep8"
   echo "  -h, --help               Print this usage message"
@@ -30,12 +31,15 @@ function process_option {
     -p|--pep8) let just_pep8=1;;
     -s|--smoke) noseargs="$noseargs --attr=type=smoke";;
     -w|--whitebox) noseargs="$noseargs --attr=type=whitebox";;
+    -j*) parallel=${1#-j};;
+    --parallel=*) parallel=${1#--parallel=};;
     -S|--stdout) noseargs="$noseargs -s";;
     *) noseargs="$noseargs $1"
   esac
 }
 
 noseargs=""
+parallel=1
 just_pep8=0
 venv=.venv
 with_venv=tools/with_venv.sh
@@ -52,11 +56,24 @@ export NOSE_OPENSTACK_RED=15.00
 export NOSE_OPENSTACK_YELLOW=3.00
 export NOSE_OPENSTACK_SHOW_ELAPSED=1
 export NOSE_OPENSTACK_STDOUT=1
+export NOSE_WITH_REQUEST_TRACE=1
+export NOSE_WITH_API_ACCOUNTING=1
 
 for arg in "$@"; do
   process_option $arg
 done
 
+# Every test class runs in one of $parallel worker processes, nose merges
+# their results into a single report. Workers would race for the configured
+# demo tenant, so parallel runs require allow_tenant_isolation, which gives
+# each compute test class a tenant and user of its own. The boto, identity
+# and object_storage packages always work in the demo tenant; each of them is
+# handed to a single worker as a whole.
+if [ $parallel -gt 1 ]; then
+  export NOSE_PROCESSES=$parallel
+  export NOSE_PROCESS_TIMEOUT=${NOSE_PROCESS_TIMEOUT:-3600}
+fi
+
 if [ $no_site_packages -eq 1 ]; then
   installvenvopts="--no-site-packages"
 fi
@@ -73,6 +90,16 @@ function run_tests {
   ${wrapper} $NOSETESTS
 }
 
+function check_parallel {
+  isolation=$(${wrapper} python -c "import tempest.config
+print tempest.config.TempestConfig().compute.allow_tenant_isolation" | tail -1)
+  if [ "$isolation" != "True" ]; then
+    echo "Parallel runs need allow_tenant_isolation = true in the [compute]" \
+         "section of tempest.conf, the workers would race for the demo tenant" >&2
+    exit 1
+  fi
+}
+
 function run_pep8 {
   echo "Running pep8 ..."
   srcfiles="`find tempest -type f -name "*.py"`"
@@ -128,6 +155,10 @@ if [ $just_pep8 -eq 1 ]; then
     exit
 fi
 
+if [ $parallel -gt 1 ]; then
+  check_parallel
+fi
+
 if [ $nova_coverage -eq 1 ]; then
     run_coverage_start
 fi
@@ -48,4 +48,12 @@ setuptools.setup(name='tempest',
                  test_suite='nose.collector',
                  setup_requires=['setuptools_git>=0.4'],
                  scripts=['bin/tempest'],
+                 entry_points={
+                     'nose.plugins.0.10': [
+                         'request-trace = '
+                         'tempest.common.trace:RequestTracePlugin',
+                         'api-accounting = '
+                         'tempest.common.accounting:ApiAccountingPlugin',
+                     ],
+                 },
                  py_modules=[])
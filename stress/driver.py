@@ -16,18 +16,29 @@ Users pass in a description of the workload and a nova manager object
 to the bash_openstack function call"""
 
 import datetime
+import Queue
 import random
+import sys
+import threading
 import time
 
 from config import StressConfig
+from pending_action import ClusterSnapshot
 from state import ClusterState
 from state import FloatingIpState
 from state import KeyPairState
 from state import VolumeState
+from stats import StressStats
 from test_case import *
+from tempest.common import keypairs
 from tempest.common.utils.data_utils import rand_name
 import utils.util
 
+# the run report is written next to the debug log, as
+# stress.report.json or stress.report.csv plus stress.timeseries.csv
+REPORT_FILE = "stress.report"
+TIME_SERIES_FILE = "stress.timeseries.csv"
+
 # setup logging to file
 logging.basicConfig(
     format='%(asctime)s %(name)-20s %(levelname)-8s %(message)s',
@@ -96,6 +107,145 @@ def _error_in_logs(keypath, logdir, user, nodes):
     return False
 
 
+def _invoke(case, manager, state, stats):
+    """Invokes `case`, recording in `stats` how long the call took."""
+    start = time.time()
+    try:
+        retry = case.invoke(manager, state)
+    except Exception:
+        stats.record_action(str(case), time.time() - start, error=True)
+        raise
+    stats.record_action(str(case), time.time() - start)
+    return retry
+
+
+def _verify(manager, retry_list, stats):
+    """Retries the verifications once, recording in `stats` how long the
+    completed ones took. Returns those still pending.
+
+    All verifications are resolved against a single ClusterSnapshot, so a
+    cycle costs one listing of each resource type however many are
+    pending."""
+    snapshot = ClusterSnapshot(manager)
+    pending = []
+    for v in retry_list:
+        name = v.__class__.__name__
+        try:
+            v.check_timeout()
+            v.use_snapshot(snapshot)
+            done = v.retry()
+        except Exception:
+            stats.record_verification(name, v.elapsed(), error=True)
+            raise
+        if done:
+            stats.record_verification(name, v.elapsed())
+        else:
+            pending.append(v)
+    return pending
+
+
+def _write_report(stats, report_format, **info):
+    if report_format == 'csv':
+        path = REPORT_FILE + '.csv'
+        stats.write_csv(path, TIME_SERIES_FILE)
+    else:
+        path = REPORT_FILE + '.json'
+        stats.write_json(path, **info)
+    logging.info('Report written to %s' % path)
+
+
+class _RatePacer(object):
+    """Spaces the start of actions `1 / ops_per_sec` seconds apart, however
+    many workers share the pacer."""
+
+    def __init__(self, ops_per_sec):
+        self._interval = 1.0 / ops_per_sec
+        self._next_start = time.time()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            start = max(self._next_start, time.time())
+            self._next_start = start + self._interval
+        delay = start - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _Worker(threading.Thread):
+    """Invokes randomly chosen actions until `end_time` or until `stop` is
+    set, queueing the returned pending actions for verification."""
+
+    def __init__(self, manager, state, cases, stats, end_time, stop,
+                 retry_queue, pacer=None, sleep_time=0):
+        super(_Worker, self).__init__()
+        self.daemon = True
+        self.exc_info = None
+        self._manager = manager
+        self._state = state
+        self._cases = cases
+        self._stats = stats
+        self._end_time = end_time
+        self._stop = stop
+        self._retry_queue = retry_queue
+        self._pacer = pacer
+        self._sleep_time = sleep_time
+
+    def run(self):
+        while not self._stop.is_set():
+            if self._pacer is not None:
+                self._pacer.wait()
+            if self._stop.is_set() or time.time() >= self._end_time:
+                return
+            case = random.choice(self._cases)
+            logging.debug('%s chose %s' % (self.name, case))
+            try:
+                retry = _invoke(case, self._manager, self._state,
+                                self._stats)
+            except Exception:
+                logging.exception('%s failed running %s' % (self.name, case))
+                self.exc_info = sys.exc_info()
+                self._stop.set()
+                return
+            if retry is not None:
+                self._retry_queue.put(retry)
+            if self._pacer is None:
+                time.sleep(self._sleep_time)
+
+
+def _start_workers(manager, state, cases, stats, end_time, stop, retry_queue,
+                   count, ops_per_sec, sleep_time):
+    pacer = None
+    if ops_per_sec:
+        pacer = _RatePacer(ops_per_sec)
+    workers = [_Worker(manager, state, cases, stats, end_time, stop,
+                       retry_queue, pacer=pacer, sleep_time=sleep_time)
+               for _ in xrange(count)]
+    for worker in workers:
+        worker.start()
+    logging.info('Started %d workers%s' %
+                 (count, ' at %s ops/sec' % ops_per_sec if pacer else ''))
+    return workers
+
+
+def _join_workers(workers):
+    """Waits for all workers, then re-raises the first worker failure."""
+    for worker in workers:
+        worker.join()
+    for worker in workers:
+        if worker.exc_info is not None:
+            raise worker.exc_info[0], worker.exc_info[1], worker.exc_info[2]
+
+
+def _drain(retry_queue):
+    retries = []
+    while True:
+        try:
+            retries.append(retry_queue.get_nowait())
+        except Queue.Empty:
+            return retries
+
+
 def create_initial_vms(manager, state, count):
     image = manager.config.compute.image_ref
     flavor = manager.config.compute.flavor_ref
@@ -104,9 +254,10 @@ def create_initial_vms(manager, state, count):
     for _ in xrange(count):
         name = rand_name('initial_vm-')
         _, server = manager.servers_client.create_server(name, image, flavor)
-        servers.append(server)
-    for server in servers:
-        manager.servers_client.wait_for_server_status(server['id'], 'ACTIVE')
+        servers.append((name, server))
+    manager.servers_client.wait_for_servers_status(
+        [server['id'] for name, server in servers], 'ACTIVE')
+    for name, server in servers:
         logging.info('Server Name: %s Id: %s' % (name, server['id']))
         state.set_instance_state(server['id'], (server, 'ACTIVE'))
 
@@ -123,7 +274,7 @@ def create_initial_keypairs(manager, state, count):
     logging.info('Creating %d keypairs' % count)
     for _ in xrange(count):
         name = rand_name('keypair-')
-        _, keypair = manager.keypairs_client.create_keypair(name)
+        _, keypair = keypairs.import_keypair(manager.keypairs_client, name)
         logging.info('Keypair: %s' % name)
         state.add_keypair(KeyPairState(keypair))
 
@@ -160,6 +311,15 @@ def bash_openstack(manager,
                     `max_vms`    = maximum number of instances to launch
                                    (default: 32)
                     `seed`       = random seed (default: None)
+                    `workers`    = number of threads invoking actions
+                                   concurrently (default: 1)
+                    `ops_per_sec`= target rate of actions across all
+                                   workers; when unset every worker
+                                   sleeps `sleep_time` between actions
+                                   (default: None)
+                    `report_format` = 'json' or 'csv', format of the
+                                   latency and throughput report written
+                                   next to the debug log (default: json)
     """
     stress_config = StressConfig(manager.config._conf)
     # get keyword arguments
@@ -168,6 +328,11 @@ def bash_openstack(manager,
     sleep_time = float(kwargs.get('sleep_time', 3000)) / 1000
     max_vms = int(kwargs.get('max_vms', stress_config.max_instances))
     test_name = kwargs.get('test_name', 'unamed test')
+    worker_count = int(kwargs.get('workers', 1))
+    ops_per_sec = kwargs.get('ops_per_sec', None)
+    if ops_per_sec is not None:
+        ops_per_sec = float(ops_per_sec)
+    report_format = kwargs.get('report_format', 'json')
 
     keypath = stress_config.host_private_key_path
     user = stress_config.host_admin_user
@@ -187,6 +352,7 @@ def bash_openstack(manager,
     create_initial_volumes(manager, state,
                            int(kwargs.get('initial_volumes', 0)))
     test_end_time = time.time() + duration.seconds
+    stats = StressStats()
 
     retry_list = []
     last_retry = time.time()
@@ -198,72 +364,97 @@ def bash_openstack(manager,
     for kw in kwargs:
         logging.debug('\t%s = %s', kw, kwargs[kw])
 
-    while True:
-        if not cooldown:
-            if time.time() < test_end_time:
-                case = random.choice(cases)
-                logging.debug('Chose %s' % case)
-                retry = case.invoke(manager, state)
-                if retry is not None:
-                    retry_list.append(retry)
-            else:
-                logging.info('Cooling down...')
-                cooldown = True
-        if cooldown and len(retry_list) == 0:
-            if _error_in_logs(keypath, logdir, user, computes):
-                test_succeeded = False
-            break
-        # Retry verifications every 5 seconds.
-        if time.time() - last_retry > 5:
-            logging.debug('retry verifications for %d tasks', len(retry_list))
-            new_retry_list = []
-            for v in retry_list:
-                v.check_timeout()
-                if not v.retry():
-                    new_retry_list.append(v)
-            retry_list = new_retry_list
-            last_retry = time.time()
-        time.sleep(sleep_time)
-        # Check error logs after 100 actions
-        if logcheck_count > 100:
-            if _error_in_logs(keypath, logdir, user, computes):
-                test_succeeded = False
-                break
-            else:
-                logcheck_count = 0
-        else:
-            logcheck_count = logcheck_count + 1
-    # Cleanup
-    logging.info('Cleaning up: terminating virtual machines...')
-    vms = state.get_instances()
-    active_vms = [v for _k, v in vms.iteritems()
-                  if v and v[1] != 'TERMINATING']
-    for target in active_vms:
-        manager.servers_client.delete_server(target[0]['id'])
-        # check to see that the server was actually killed
-    for target in active_vms:
-        kill_id = target[0]['id']
-        i = 0
+    # With several workers, or a target rate, actions are invoked by
+    # threads while this loop only runs the verifications.
+    workers = []
+    stop = threading.Event()
+    retry_queue = Queue.Queue()
+    if worker_count > 1 or ops_per_sec:
+        workers = _start_workers(manager, state, cases, stats, test_end_time,
+                                 stop, retry_queue, worker_count, ops_per_sec,
+                                 sleep_time)
+
+    # The report is written even when an action, a worker or the cleanup
+    # fails, these are the runs it is most needed for.
+    try:
         while True:
-            try:
-                manager.servers_client.get_server(kill_id)
-            except Exception:
+            if not cooldown:
+                if time.time() < test_end_time and not stop.is_set():
+                    if not workers:
+                        case = random.choice(cases)
+                        logging.debug('Chose %s' % case)
+                        retry = _invoke(case, manager, state, stats)
+                        if retry is not None:
+                            retry_list.append(retry)
+                else:
+                    logging.info('Cooling down...')
+                    cooldown = True
+                    stop.set()
+                    _join_workers(workers)
+            retry_list.extend(_drain(retry_queue))
+            if cooldown and len(retry_list) == 0:
+                if _error_in_logs(keypath, logdir, user, computes):
+                    test_succeeded = False
                 break
-            i += 1
-            if i > 60:
-                _error_in_logs(keypath, logdir, user, computes)
-                raise Exception("Cleanup timed out")
-            time.sleep(1)
-        logging.info('killed %s' % kill_id)
-        state.delete_instance_state(kill_id)
-    for floating_ip_state in state.get_floating_ips():
-        manager.floating_ips_client.delete_floating_ip(
-                                            floating_ip_state.resource_id)
-    for keypair_state in state.get_keypairs():
-        manager.keypairs_client.delete_keypair(keypair_state.name)
-    for volume_state in state.get_volumes():
-        manager.volumes_client.delete_volume(volume_state.resource_id)
-
+            # Retry verifications every 5 seconds.
+            if time.time() - last_retry > 5:
+                logging.debug('retry verifications for %d tasks',
+                              len(retry_list))
+                retry_list = _verify(manager, retry_list, stats)
+                last_retry = time.time()
+            time.sleep(sleep_time)
+            # Check error logs after 100 actions
+            if logcheck_count > 100:
+                if _error_in_logs(keypath, logdir, user, computes):
+                    test_succeeded = False
+                    stop.set()
+                    _join_workers(workers)
+                    break
+                else:
+                    logcheck_count = 0
+            else:
+                logcheck_count = logcheck_count + 1
+        # Cleanup
+        logging.info('Cleaning up: terminating virtual machines...')
+        vms = state.get_instances()
+        active_vms = [v for _k, v in vms.iteritems()
+                      if v and v[1] != 'TERMINATING']
+        for target in active_vms:
+            manager.servers_client.delete_server(target[0]['id'])
+            # check to see that the server was actually killed
+        for target in active_vms:
+            kill_id = target[0]['id']
+            i = 0
+            while True:
+                try:
+                    manager.servers_client.get_server(kill_id)
+                except Exception:
+                    break
+                i += 1
+                if i > 60:
+                    _error_in_logs(keypath, logdir, user, computes)
+                    raise Exception("Cleanup timed out")
+                time.sleep(1)
+            logging.info('killed %s' % kill_id)
+            state.delete_instance_state(kill_id)
+        for floating_ip_state in state.get_floating_ips():
+            manager.floating_ips_client.delete_floating_ip(
+                                                floating_ip_state.resource_id)
+        for keypair_state in state.get_keypairs():
+            manager.keypairs_client.delete_keypair(keypair_state.name)
+        for volume_state in state.get_volumes():
+            manager.volumes_client.delete_volume(volume_state.resource_id)
+    except Exception:
+        test_succeeded = False
+        raise
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+        keypairs.close_key_pool()
+        _write_report(stats, report_format, test_name=test_name,
+                      succeeded=test_succeeded, workers=worker_count,
+                      ops_per_sec=ops_per_sec)
     if test_succeeded:
         logging.info('*** Test succeeded ***')
     else:
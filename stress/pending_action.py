@@ -17,9 +17,39 @@ that nova API calls such as create/delete are completed"""
 import logging
 import time
 
+from tempest.common import waiters
+from tempest.exceptions import NotFound
 from tempest.exceptions import TimeoutException
 
 
+class ClusterSnapshot(object):
+    """
+    One listing of servers and floating ips shared by all the
+    verifications of a retry cycle. Each listing is fetched the first
+    time it is needed, and every lookup after that is in memory.
+    """
+
+    def __init__(self, nova_manager):
+        self._manager = nova_manager
+        self._servers = None
+        self._floating_ips = None
+
+    def get_server(self, server_id):
+        """Server details, or None if the server is not listed anymore."""
+        if self._servers is None:
+            client = self._manager.servers_client
+            self._servers = dict((server['id'], server)
+                                 for server in waiters.iter_servers(client))
+        return self._servers.get(server_id)
+
+    def get_floating_ip(self, floating_ip_id):
+        """Floating ip details, or None if it is not listed anymore."""
+        if self._floating_ips is None:
+            _resp, body = self._manager.floating_ips_client.list_floating_ips()
+            self._floating_ips = dict((ip['id'], ip) for ip in body)
+        return self._floating_ips.get(floating_ip_id)
+
+
 class PendingAction(object):
     """
     Initialize and describe actions to verify that a Nova API call
@@ -37,6 +67,15 @@ class PendingAction(object):
         self._logger = logging.getLogger(self.__class__.__name__)
         self._start_time = time.time()
         self._timeout = timeout
+        self._snapshot = None
+
+    def use_snapshot(self, snapshot):
+        """
+        Have the next `retry` look resources up in `snapshot`, a
+        ClusterSnapshot shared with the other verifications of the cycle,
+        instead of calling the API for each one.
+        """
+        self._snapshot = snapshot
 
     def retry(self):
         """
@@ -75,12 +114,26 @@ class PendingServerAction(PendingAction):
         self._state = state
         self._target = target_server
 
+    def _get_server(self):
+        """
+        Current details of the target server, from the snapshot when one is
+        in use. Returns None if the server does not exist anymore.
+        """
+        server_id = self._target['id']
+        if self._snapshot is not None:
+            return self._snapshot.get_server(server_id)
+        try:
+            _resp, body = self._manager.servers_client.get_server(server_id)
+        except NotFound:
+            return None
+        return body
+
     def _check_for_status(self, state_string):
         """Check to see if the machine has transitioned states."""
         t = time.time()  # for debugging
         target = self._target
-        _resp, body = self._manager.servers_client.get_server(target['id'])
-        if body['status'] != state_string:
+        body = self._get_server()
+        if body is None or body['status'] != state_string:
             # grab the actual state as we think it is
             temp_obj = self._state.get_instances()[target['id']]
             self._logger.debug("machine %s in state %s" %
@@ -12,23 +12,35 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import random
+import threading
+
 
 class ClusterState(object):
     """A class to store the state of various persistent objects in the Nova
     cluster, e.g. instances, volumes.  Use methods to query to state which than
-    can be compared to the current state of the objects in Nova"""
+    can be compared to the current state of the objects in Nova
+
+    The state is shared by all the workers of a concurrent stress run, so
+    every method holds a lock and the getters return snapshots. Actions pick
+    their targets with `claim_instance` and `claim_change`, which select and
+    mark a resource in one step so no two workers act on it at once."""
 
     def __init__(self, **kwargs):
         self._max_vms = kwargs.get('max_vms', 32)
         self._instances = {}
+        self._pending_instances = 0
         self._floating_ips = []
         self._keypairs = []
         self._volumes = []
+        self._lock = threading.RLock()
 
     # instance state methods
     def get_instances(self):
-        """return the instances dictionary that we believe are in cluster."""
-        return self._instances
+        """return a copy of the instances dictionary that we believe are in
+        cluster."""
+        with self._lock:
+            return dict(self._instances)
 
     def get_max_instances(self):
         """return the maximum number of instances we can create."""
@@ -36,50 +48,109 @@ class ClusterState(object):
 
     def set_instance_state(self, key, val):
         """Store `val` in the dictionary indexed at `key`."""
-        self._instances[key] = val
+        with self._lock:
+            self._instances[key] = val
 
     def delete_instance_state(self, key):
         """Delete state indexed at `key`."""
-        del self._instances[key]
+        with self._lock:
+            del self._instances[key]
+
+    def reserve_instance(self):
+        """Reserve room for a new instance. Returns False if `max_vms`
+        instances exist or are being created already."""
+        with self._lock:
+            if len(self._instances) + self._pending_instances >= self._max_vms:
+                return False
+            self._pending_instances += 1
+            return True
+
+    def release_instance(self):
+        """Release a reservation made with `reserve_instance`, once the
+        instance is stored with `set_instance_state` or failed to create."""
+        with self._lock:
+            self._pending_instances -= 1
+
+    def claim_instance(self, from_states, to_state):
+        """Pick a random instance in one of `from_states` (any state but
+        TERMINATING if None) and move it to `to_state`. Returns the
+        (server, previous state) tuple, or None if no instance qualifies."""
+        with self._lock:
+            candidates = [v for v in self._instances.itervalues()
+                          if v and (v[1] in from_states if from_states
+                                    else v[1] != 'TERMINATING')]
+            if not candidates:
+                return None
+            server, previous = random.choice(candidates)
+            self._instances[server['id']] = (server, to_state)
+            return server, previous
+
+    def transition_instance(self, key, from_states, val):
+        """Store `val` at `key` only if the instance is still in one of
+        `from_states`. Returns whether the state was changed."""
+        with self._lock:
+            current = self._instances.get(key)
+            if current is None or current[1] not in from_states:
+                return False
+            self._instances[key] = val
+            return True
+
+    def claim_change(self, resource_state):
+        """Mark a ServerAssociatedState as having a change pending. Returns
+        False if another change on it is pending already."""
+        with self._lock:
+            if resource_state.change_pending:
+                return False
+            resource_state.change_pending = True
+            return True
 
     #floating_ip state methods
     def get_floating_ips(self):
         """return the floating ips list for the cluster."""
-        return self._floating_ips
+        with self._lock:
+            return list(self._floating_ips)
 
     def add_floating_ip(self, floating_ip_state):
         """Add floating ip."""
-        self._floating_ips.append(floating_ip_state)
+        with self._lock:
+            self._floating_ips.append(floating_ip_state)
 
     def remove_floating_ip(self, floating_ip_state):
         """Remove floating ip."""
-        self._floating_ips.remove(floating_ip_state)
+        with self._lock:
+            self._floating_ips.remove(floating_ip_state)
 
     # keypair methods
     def get_keypairs(self):
         """return the keypairs list for the cluster."""
-        return self._keypairs
+        with self._lock:
+            return list(self._keypairs)
 
     def add_keypair(self, keypair_state):
         """Add keypair."""
-        self._keypairs.append(keypair_state)
+        with self._lock:
+            self._keypairs.append(keypair_state)
 
     def remove_keypair(self, keypair_state):
         """Remove keypair."""
-        self._keypairs.remove(keypair_state)
+        with self._lock:
+            self._keypairs.remove(keypair_state)
 
     # volume methods
     def get_volumes(self):
         """return the volumes list for the cluster."""
-        return self._volumes
+        with self._lock:
+            return list(self._volumes)
 
     def add_volume(self, volume_state):
         """Add volume."""
-        self._volumes.append(volume_state)
+        with self._lock:
+            self._volumes.append(volume_state)
 
     def remove_volume(self, volume_state):
         """Remove volume."""
-        self._volumes.remove(volume_state)
+        with self._lock:
+            self._volumes.remove(volume_state)
 
 
 class ServerAssociatedState(object):
@@ -0,0 +1,151 @@
+# Copyright 2013 OpenStack, LLC
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+"""Collects the latency of every action and verification of a stress run,
+and reports them as per-action percentiles plus a per-second time series
+of throughput and errors."""
+
+import csv
+import json
+import math
+import threading
+import time
+
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram(object):
+    """Latency samples, in seconds, of one action or verification."""
+
+    def __init__(self):
+        self._samples = []
+        self.errors = 0
+
+    def add(self, duration):
+        self._samples.append(duration)
+
+    def percentile(self, percent):
+        """Nearest-rank percentile of the samples, None if there are none."""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        rank = int(math.ceil(percent / 100.0 * len(samples)))
+        return samples[max(rank, 1) - 1]
+
+    def summary(self):
+        samples = self._samples
+        summary = {
+            'count': len(samples),
+            'errors': self.errors,
+            'min': min(samples) if samples else None,
+            'mean': sum(samples) / len(samples) if samples else None,
+            'max': max(samples) if samples else None,
+        }
+        for percent in PERCENTILES:
+            summary['p%d' % percent] = self.percentile(percent)
+        return summary
+
+
+class StressStats(object):
+    """
+    Thread-safe collector shared by the driver and its workers.
+
+    Actions are the `StressTestCase.run` calls, timed from invocation to
+    return; verifications are the `PendingAction` objects, timed from their
+    creation until `retry` reported completion.
+    """
+
+    ACTION = 'action'
+    VERIFICATION = 'verification'
+    FIELDS = (('kind', 'name', 'count', 'errors', 'min', 'mean') +
+              tuple('p%d' % percent for percent in PERCENTILES) + ('max',))
+
+    def __init__(self):
+        self.start_time = time.time()
+        self._histograms = {}
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _record(self, kind, name, duration, error):
+        with self._lock:
+            histogram = self._histograms.setdefault((kind, name), Histogram())
+            if error:
+                histogram.errors += 1
+            else:
+                histogram.add(duration)
+            second = int(time.time() - self.start_time)
+            counts = self._series.setdefault(second, [0, 0, 0])
+            if error:
+                counts[2] += 1
+            elif kind == self.ACTION:
+                counts[0] += 1
+            else:
+                counts[1] += 1
+
+    def record_action(self, name, duration, error=False):
+        self._record(self.ACTION, name, duration, error)
+
+    def record_verification(self, name, duration, error=False):
+        self._record(self.VERIFICATION, name, duration, error)
+
+    def summaries(self):
+        """Returns one dict of FIELDS per action and verification name."""
+        with self._lock:
+            rows = []
+            for (kind, name), histogram in sorted(self._histograms.items()):
+                row = histogram.summary()
+                row.update(kind=kind, name=name)
+                rows.append(row)
+            return rows
+
+    def time_series(self):
+        """Returns per-second dicts of completed actions, verifications and
+        errors, counted from the start of the run."""
+        with self._lock:
+            last = max(self._series) if self._series else -1
+            series = []
+            for second in xrange(last + 1):
+                actions, verifications, errors = self._series.get(second,
+                                                                  (0, 0, 0))
+                series.append({'second': second,
+                               'actions': actions,
+                               'verifications': verifications,
+                               'errors': errors})
+            return series
+
+    def report(self, **info):
+        """Returns the whole report as a dict, `info` describes the run."""
+        report = dict(info)
+        report['start_time'] = self.start_time
+        report['duration'] = time.time() - self.start_time
+        report['summary'] = self.summaries()
+        report['time_series'] = self.time_series()
+        return report
+
+    def write_json(self, path, **info):
+        with open(path, 'w') as report_file:
+            json.dump(self.report(**info), report_file, indent=2,
+                      sort_keys=True)
+
+    def write_csv(self, path, series_path):
+        """Writes the per-action summary to `path` and the time series to
+        `series_path`."""
+        with open(path, 'wb') as report_file:
+            writer = csv.DictWriter(report_file, self.FIELDS)
+            writer.writerow(dict(zip(self.FIELDS, self.FIELDS)))
+            writer.writerows(self.summaries())
+        with open(series_path, 'wb') as series_file:
+            fields = ('second', 'actions', 'verifications', 'errors')
+            writer = csv.DictWriter(series_file, fields)
+            writer.writerow(dict(zip(fields, fields)))
+            writer.writerows(self.time_series())
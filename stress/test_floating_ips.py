@@ -32,9 +32,8 @@ class TestChangeFloatingIp(test_case.StressTestCase):
             vms = state.get_instances()
             self.server_ids = [k for k, v in vms.iteritems()]
         floating_ip = random.choice(state.get_floating_ips())
-        if floating_ip.change_pending:
+        if not state.claim_change(floating_ip):
             return None
-        floating_ip.change_pending = True
         timeout = int(kwargs.get('timeout', 60))
         cli = manager.floating_ips_client
         if floating_ip.server_id is None:
@@ -71,6 +70,12 @@ class VerifyChangeFloatingIp(pending_action.PendingAction):
         """
         Check to see that we can contact the server at its new address.
         """
+        if self._snapshot is not None:
+            # no point probing the address until nova reports the change
+            ip = self._snapshot.get_floating_ip(self.floating_ip.resource_id)
+            expected = self.floating_ip.server_id if self.add else None
+            if ip is not None and ip.get('instance_id') != expected:
+                return False
         try:
             conn = telnetlib.Telnet(self.floating_ip.address, 22, timeout=0.5)
             conn.close()
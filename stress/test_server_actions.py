@@ -42,34 +42,37 @@ class TestRebootVM(test_case.StressTestCase):
                        `type`    : reboot type [SOFT or HARD] (default is SOFT)
         """
 
-        vms = state.get_instances()
-        active_vms = [v for k, v in vms.iteritems() if v and v[1] == 'ACTIVE']
+        _reboot_arg = kwargs.get('type', 'SOFT')
+        if _reboot_arg == 'SOFT':
+            reboot_state = 'REBOOT'
+        else:
+            reboot_state = 'HARD_REBOOT'
+
+        # select active vm to reboot and then send request to nova controller
+        target = state.claim_instance(('ACTIVE',), reboot_state)
         # no active vms, so return null
-        if not active_vms:
+        if target is None:
             self._logger.info('no ACTIVE instances to reboot')
             return
 
-        _reboot_arg = kwargs.get('type', 'SOFT')
-
-        # select active vm to reboot and then send request to nova controller
-        target = random.choice(active_vms)
         reboot_target = target[0]
         # It seems that doing a reboot when in reboot is an error.
         try:
             response, body = manager.servers_client.reboot(reboot_target['id'],
                                                            _reboot_arg)
         except Duplicate:
+            state.transition_instance(reboot_target['id'], (reboot_state,),
+                                      target)
             return
+        except Exception:
+            state.transition_instance(reboot_target['id'], (reboot_state,),
+                                      target)
+            raise
 
         if (response.status != 202):
             self._logger.error("response: %s" % response)
             raise Exception
 
-        if _reboot_arg == 'SOFT':
-            reboot_state = 'REBOOT'
-        else:
-            reboot_state = 'HARD_REBOOT'
-
         self._logger.info('waiting for machine %s to change to %s' %
                           (reboot_target['id'], reboot_state))
 
@@ -112,8 +115,9 @@ class VerifyRebootVM(pending_action.PendingServerAction):
             if server_state == reboot_state:
                 self._logger.info('machine %s ACTIVE -> %s' %
                                   (self._target['id'], reboot_state))
-                self._state.set_instance_state(self._target['id'],
-                                               (self._target, reboot_state))
+                self._state.transition_instance(self._target['id'],
+                                                (reboot_state,),
+                                                (self._target, reboot_state))
                 self._retry_state = self.States.ACTIVE_CHECK
             elif server_state == 'ACTIVE':
                 # machine must have gone ACTIVE -> REBOOT ->ACTIVE
@@ -123,10 +127,10 @@ class VerifyRebootVM(pending_action.PendingServerAction):
             if not self._check_for_status('ACTIVE'):
                 return False
         target = self._target
-        self._logger.info('machine %s %s -> ACTIVE [%.1f secs elapsed]' %
-                          (target['id'], reboot_state, self.elapsed()))
-        self._state.set_instance_state(target['id'],
-                                      (target, 'ACTIVE'))
+        if self._state.transition_instance(target['id'], (reboot_state,),
+                                           (target, 'ACTIVE')):
+            self._logger.info('machine %s %s -> ACTIVE [%.1f secs elapsed]' %
+                              (target['id'], reboot_state, self.elapsed()))
 
         return True
 
@@ -17,8 +17,7 @@ API calls on the Nova cluster having to do with creating and deleting VMs.
 Each sub-class will have a corresponding PendingServerAction. These pending
 actions veriy that the API call was successful or not."""
 
-import random
-import time
+import itertools
 
 import pending_action
 import test_case
@@ -26,7 +25,7 @@ import test_case
 
 class TestCreateVM(test_case.StressTestCase):
     """Create a virtual machine in the Nova cluster."""
-    _vm_id = 0
+    _vm_ids = itertools.count()
 
     def run(self, manager, state, *pargs, **kwargs):
         """
@@ -46,11 +45,16 @@ class TestCreateVM(test_case.StressTestCase):
         """
 
         # restrict number of instances we can launch
-        if len(state.get_instances()) >= state.get_max_instances():
+        if not state.reserve_instance():
             self._logger.debug("maximum number of instances created: %d" %
                                state.get_max_instances())
             return None
+        try:
+            return self._create(manager, state, **kwargs)
+        finally:
+            state.release_instance()
 
+    def _create(self, manager, state, **kwargs):
         _key_name = kwargs.get('key_name', '')
         _timeout = int(kwargs.get('timeout',
                                   manager.config.compute.build_timeout))
@@ -59,7 +63,7 @@ class TestCreateVM(test_case.StressTestCase):
                                  manager.config.compute.flavor_ref)
 
         expected_server = {
-            'name': 'server' + str(TestCreateVM._vm_id),
+            'name': 'server' + str(next(TestCreateVM._vm_ids)),
             'metadata': {
                 'key1': 'value1',
                 'key2': 'value2',
@@ -69,7 +73,6 @@ class TestCreateVM(test_case.StressTestCase):
             'adminPass': 'testpwd',
             'key_name': _key_name,
         }
-        TestCreateVM._vm_id = TestCreateVM._vm_id + 1
         create_server = manager.servers_client.create_server
         response, body = create_server(expected_server['name'],
                                        _image_ref,
@@ -133,10 +136,12 @@ class VerifyCreateVM(pending_action.PendingServerAction):
         if self._check_for_status('ACTIVE') != 'ACTIVE':
             return False
 
-        self._logger.info('machine %s: BUILD -> ACTIVE [%.1f secs elapsed]' %
-                          (self._target['id'], self.elapsed()))
-        self._state.set_instance_state(self._target['id'],
-                                      (self._target, 'ACTIVE'))
+        # the machine may have been picked for deletion meanwhile
+        if self._state.transition_instance(self._target['id'], ('BUILD',),
+                                           (self._target, 'ACTIVE')):
+            self._logger.info('machine %s: BUILD -> ACTIVE '
+                              '[%.1f secs elapsed]' %
+                              (self._target['id'], self.elapsed()))
         return True
 
 
@@ -153,23 +158,20 @@ class TestKillActiveVM(test_case.StressTestCase):
         `kwargs`     : keyword arguments, which include:
                        `timeout` : how long to wait before issuing Exception
         """
-        # check for active instances
-        vms = state.get_instances()
-        active_vms = [v for k, v in vms.iteritems() if v and v[1] == 'ACTIVE']
+        # pick an active instance, marking it TERMINATING right away so
+        # no other worker acts on it
+        target = state.claim_instance(('ACTIVE',), 'TERMINATING')
         # no active vms, so return null
-        if not active_vms:
+        if target is None:
             self._logger.info('no ACTIVE instances to delete')
             return
 
         _timeout = kwargs.get('timeout', manager.config.compute.build_timeout)
 
-        target = random.choice(active_vms)
         killtarget = target[0]
         manager.servers_client.delete_server(killtarget['id'])
         self._logger.info('machine %s: ACTIVE -> TERMINATING' %
                           killtarget['id'])
-        state.set_instance_state(killtarget['id'],
-                                (killtarget, 'TERMINATING'))
         return VerifyKillActiveVM(manager, state,
                                   killtarget, timeout=_timeout)
 
@@ -189,9 +191,7 @@ class VerifyKillActiveVM(pending_action.PendingServerAction):
         if (not tid in self._state.get_instances().keys()):
             return False
 
-        try:
-            self._manager.servers_client.get_server(tid)
-        except Exception:
+        if self._get_server() is None:
             # if we get a 404 response, is the machine really gone?
             target = self._target
             self._logger.info('machine %s: DELETED [%.1f secs elapsed]' %
@@ -217,20 +217,17 @@ class TestKillAnyVM(test_case.StressTestCase):
                        `timeout` : how long to wait before issuing Exception
         """
 
-        vms = state.get_instances()
+        target = state.claim_instance(None, 'TERMINATING')
         # no vms, so return null
-        if not vms:
+        if target is None:
             self._logger.info('no active instances to delete')
             return
 
         _timeout = kwargs.get('timeout', manager.config.compute.build_timeout)
 
-        target = random.choice(vms)
         killtarget = target[0]
 
         manager.servers_client.delete_server(killtarget['id'])
-        self._state.set_instance_state(killtarget['id'],
-                                      (killtarget, 'TERMINATING'))
         # verify object will do the same thing as the active VM
         return VerifyKillAnyVM(manager, state, killtarget, timeout=_timeout)
 
@@ -252,23 +249,26 @@ class TestUpdateVMName(test_case.StressTestCase):
         """
 
         # select one machine from active ones
-        vms = state.get_instances()
-        active_vms = [v for k, v in vms.iteritems() if v and v[1] == 'ACTIVE']
+        target = state.claim_instance(('ACTIVE',), 'UPDATING_NAME')
         # no active vms, so return null
-        if not active_vms:
+        if target is None:
             self._logger.info('no active instances to update')
             return
 
         _timeout = kwargs.get('timeout', manager.config.compute.build_timeout)
 
-        target = random.choice(active_vms)
         update_target = target[0]
 
         # Update name by appending '_updated' to the name
         new_name = update_target['name'] + '_updated'
-        (response, body) = \
-            manager.servers_client.update_server(update_target['id'],
-                                                 name=new_name)
+        try:
+            (response, body) = \
+                manager.servers_client.update_server(update_target['id'],
+                                                     name=new_name)
+        except Exception:
+            state.transition_instance(update_target['id'], ('UPDATING_NAME',),
+                                      target)
+            raise
         if (response.status != 200):
             self._logger.error("response: %s " % response)
             self._logger.error("body: %s " % body)
@@ -278,8 +278,8 @@ class TestUpdateVMName(test_case.StressTestCase):
 
         self._logger.info('machine %s: ACTIVE -> UPDATING_NAME' %
                           body['id'])
-        state.set_instance_state(body['id'],
-                                (body, 'UPDATING_NAME'))
+        state.transition_instance(body['id'], ('UPDATING_NAME',),
+                                  (body, 'UPDATING_NAME'))
 
         return VerifyUpdateVMName(manager,
                                   state,
@@ -300,11 +300,9 @@ class VerifyUpdateVMName(pending_action.PendingServerAction):
             self._state.get_instances()[target_id][1] == 'TERMINATING'):
             return False
 
-        response, body = \
-            self._manager.serverse_client.get_server(self._target['id'])
-        if (response.status != 200):
-            self._logger.error("response: %s " % response)
-            self._logger.error("body: %s " % body)
+        body = self._get_server()
+        if body is None:
+            self._logger.error("machine %s not found" % self._target['id'])
             raise Exception
 
         if self._target['name'] != body['name']:
@@ -314,9 +312,9 @@ class VerifyUpdateVMName(pending_action.PendingServerAction):
             raise Exception
 
         # log the update
-        self._logger.info('machine %s: UPDATING_NAME -> ACTIVE' %
-                          self._target['id'])
-        self._state.set_instance_state(self._target['id'],
-                                      (body,
-                                       'ACTIVE'))
+        if self._state.transition_instance(self._target['id'],
+                                           ('UPDATING_NAME',),
+                                           (body, 'ACTIVE')):
+            self._logger.info('machine %s: UPDATING_NAME -> ACTIVE' %
+                              self._target['id'])
         return True
@@ -0,0 +1,64 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Helpers shared by the benchmarks: latency summaries and JSON reports
+"""
+
+import json
+import math
+import sys
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _percentile(samples, percent):
+    """Nearest-rank percentile of sorted samples."""
+    rank = int(math.ceil(percent / 100.0 * len(samples)))
+    return samples[max(rank, 1) - 1]
+
+
+def summarize(latencies, errors, elapsed, transferred=0):
+    """Reduces the latencies, in seconds, of one operation to a report."""
+    samples = sorted(latencies)
+    summary = {
+        'count': len(samples),
+        'errors': errors,
+        'elapsed': elapsed,
+        'ops_per_sec': len(samples) / elapsed if elapsed else None,
+        'mb_per_sec': (transferred / float(2 ** 20) / elapsed
+                       if elapsed and transferred else None),
+        'latency': None,
+    }
+    if samples:
+        latency = {'min': samples[0],
+                   'mean': sum(samples) / len(samples),
+                   'max': samples[-1]}
+        for percent in PERCENTILES:
+            latency['p%d' % percent] = _percentile(samples, percent)
+        summary['latency'] = latency
+    return summary
+
+
+def write_report(report, output):
+    """Writes a report as JSON to the `output` file, - for stdout."""
+    if output == '-':
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with open(output, 'w') as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
@@ -0,0 +1,202 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compute API client benchmark
+
+Creates `count` servers, then gets, lists with details, reboots and
+deletes them, at every concurrency level, and reports per operation the
+requests per second and latency percentiles as JSON. Against the local
+stand-in, which answers immediately and builds servers instantly, the
+figures are those of the client side alone: the REST client, the
+connection pool, JSON or XML (de)serialization and token handling.
+
+Against the local stand-in::
+
+    TEMPEST_CONFIG=tempest.conf.sample \\
+        python -m tempest.benchmarks.compute --local --count 500 \\
+        --concurrency 1,8 --interface json,xml
+
+or against the cloud described by the tempest configuration, where the
+servers of the configured image and flavor are actually booted::
+
+    python -m tempest.benchmarks.compute --count 10 --concurrency 1,4
+"""
+
+import argparse
+import sys
+import time
+
+from tempest.benchmarks import common
+from tempest.common import concurrency
+from tempest.common.utils.data_utils import rand_name
+from tempest.common import waiters
+from tempest import config
+from tempest.fakes import compute
+from tempest.services.compute.json.servers_client import ServersClientJSON
+from tempest.services.compute.xml.servers_client import ServersClientXML
+
+OPERATIONS = ('CREATE', 'GET', 'LIST', 'REBOOT', 'DELETE')
+CLIENTS = {'json': ServersClientJSON, 'xml': ServersClientXML}
+
+
+class ComputeBenchmark(object):
+
+    """
+    Times the server operations of one set of credentials
+
+    Servers are waited for, with a single listing per poll, between
+    their creation and the reboots and between the reboots and the
+    deletions; that time is not part of any operation.
+    """
+
+    def __init__(self, config, username, password, auth_url,
+                 tenant_name=None, interface='json', image_ref=None,
+                 flavor_ref=None):
+        self.client = CLIENTS[interface](config, username, password,
+                                         auth_url, tenant_name)
+        self.image_ref = image_ref or config.compute.image_ref
+        self.flavor_ref = flavor_ref or config.compute.flavor_ref
+
+    def _timed(self, operation):
+        def call(item):
+            start = time.time()
+            if operation == 'CREATE':
+                resp, body = self.client.create_server(item, self.image_ref,
+                                                       self.flavor_ref)
+                self._server_ids.append(body['id'])
+            elif operation == 'GET':
+                self.client.get_server(item)
+            elif operation == 'LIST':
+                self.client.list_servers_with_detail()
+            elif operation == 'REBOOT':
+                self.client.reboot(item, 'SOFT')
+            else:
+                self.client.delete_server(item)
+            return time.time() - start
+        return call
+
+    def run_operation(self, operation, items, concurrency_level):
+        start = time.time()
+        results = concurrency.run_concurrently(self._timed(operation), items,
+                                               concurrency_level)
+        elapsed = time.time() - start
+        latencies = [latency for latency, exc in results if exc is None]
+        failures = [exc for latency, exc in results if exc is not None]
+        summary = common.summarize(latencies, len(failures), elapsed)
+        if failures:
+            summary['first_error'] = repr(failures[0])
+        return summary
+
+    def run_case(self, concurrency_level, count):
+        self._server_ids = []
+        prefix = rand_name('benchmark-')
+        names = ['%s-%06d' % (prefix, index) for index in xrange(count)]
+        case = {'concurrency': concurrency_level, 'count': count,
+                'operations': {}}
+        operations = case['operations']
+        try:
+            operations['CREATE'] = self.run_operation('CREATE', names,
+                                                      concurrency_level)
+            waiters.wait_for_servers_status(self.client, self._server_ids,
+                                            'ACTIVE')
+            for operation in ('GET', 'LIST', 'REBOOT'):
+                operations[operation] = self.run_operation(
+                    operation, self._server_ids, concurrency_level)
+            waiters.wait_for_servers_status(self.client, self._server_ids,
+                                            'ACTIVE')
+            operations['DELETE'] = self.run_operation(
+                'DELETE', self._server_ids, concurrency_level)
+            self._server_ids = []
+            return case
+        finally:
+            for server_id in self._server_ids:
+                try:
+                    self.client.delete_server(server_id)
+                except Exception:
+                    pass
+
+    def run(self, concurrency_levels, count):
+        """Returns the report of every concurrency level."""
+        report = {'start_time': time.time(), 'results': []}
+        for concurrency_level in concurrency_levels:
+            report['results'].append(self.run_case(concurrency_level, count))
+        report['duration'] = time.time() - report['start_time']
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--concurrency', default='1,4,8',
+                        help="comma separated numbers of concurrent "
+                             "requests (default: %(default)s)")
+    parser.add_argument('--count', type=int, default=100,
+                        help="servers per concurrency level "
+                             "(default: %(default)s)")
+    parser.add_argument('--interface', default='json',
+                        help="comma separated client interfaces, json "
+                             "and/or xml (default: %(default)s)")
+    parser.add_argument('--output', default='-',
+                        help="JSON report file, - for stdout")
+    parser.add_argument('--local', action='store_true',
+                        help="run against an in-memory Nova stand-in "
+                             "instead of the configured cloud")
+    parser.add_argument('--latency', type=float, default=0,
+                        help="seconds added to every request of the "
+                             "stand-in (default: %(default)s)")
+    parser.add_argument('--build-time', type=float, default=0,
+                        help="seconds the servers of the stand-in take to "
+                             "become ACTIVE (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    conf = config.TempestConfig()
+    levels = [int(level) for level in args.concurrency.split(',')]
+    interfaces = args.interface.split(',')
+
+    fake = None
+    refs = {}
+    if args.local:
+        fake = compute.make_server(conf.compute.catalog_type,
+                                   conf.object_storage.catalog_type,
+                                   latency=args.latency,
+                                   build_time=args.build_time,
+                                   action_time=args.build_time).start()
+        credentials = ('benchmark', 'secret', fake.auth_url, 'benchmark')
+        refs = {'image_ref': compute.IMAGES[0][0],
+                'flavor_ref': compute.FLAVORS[0][0]}
+    else:
+        credentials = (conf.compute.username, conf.compute.password,
+                       conf.identity.auth_url, conf.compute.tenant_name)
+    report = {'local': args.local,
+              'http_pool_maxsize': conf.compute.http_pool_maxsize,
+              'interfaces': {}}
+    try:
+        for interface in interfaces:
+            benchmark = ComputeBenchmark(conf, *credentials,
+                                         interface=interface, **refs)
+            report['interfaces'][interface] = benchmark.run(levels,
+                                                            args.count)
+    finally:
+        if fake is not None:
+            fake.stop()
+
+    common.write_report(report, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
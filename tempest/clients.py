@@ -173,35 +173,52 @@ class Manager(object):
             client_args = (self.config, self.username, self.password,
                            self.auth_url)
 
-        try:
-            self.servers_client = SERVERS_CLIENTS[interface](*client_args)
-            self.limits_client = LIMITS_CLIENTS[interface](*client_args)
-            self.images_client = IMAGES_CLIENTS[interface](*client_args)
-            self.keypairs_client = KEYPAIRS_CLIENTS[interface](*client_args)
-            self.flavors_client = FLAVORS_CLIENTS[interface](*client_args)
-            ext_cli = EXTENSIONS_CLIENTS[interface](*client_args)
-            self.extensions_client = ext_cli
-            vol_ext_cli = VOLUMES_EXTENSIONS_CLIENTS[interface](*client_args)
-            self.volumes_extensions_client = vol_ext_cli
-            self.floating_ips_client = FLOAT_CLIENTS[interface](*client_args)
-            self.volumes_client = VOLUMES_CLIENTS[interface](*client_args)
-            self.admin_client = ADMIN_CLIENT[interface](*client_args)
-            self.token_client = TOKEN_CLIENT[interface](self.config)
-            self.security_groups_client = \
-                SECURITY_GROUPS_CLIENT[interface](*client_args)
-            self.console_outputs_client = \
-                CONSOLE_OUTPUT_CLIENT[interface](*client_args)
-        except KeyError:
+        if interface not in SERVERS_CLIENTS:
             msg = "Unsupported interface type `%s'" % interface
             raise exceptions.InvalidConfiguration(msg)
-        self.quotas_client = QuotasClient(*client_args)
-        self.network_client = NetworkClient(*client_args)
-        self.account_client = AccountClient(*client_args)
-        self.container_client = ContainerClient(*client_args)
-        self.object_client = ObjectClient(*client_args)
-        self.ec2api_client = APIClientEC2(*client_args)
-        self.s3_client = ObjectClientS3(*client_args)
-        self.custom_object_client = ObjectClientCustomizedHeader(*client_args)
+        self.interface = interface
+        self.client_args = client_args
+
+    # Clients are only built when a test first uses them, either from a
+    # per-interface mapping or from a single interface-agnostic class.
+    _clients = {
+        'servers_client': SERVERS_CLIENTS,
+        'limits_client': LIMITS_CLIENTS,
+        'images_client': IMAGES_CLIENTS,
+        'keypairs_client': KEYPAIRS_CLIENTS,
+        'flavors_client': FLAVORS_CLIENTS,
+        'extensions_client': EXTENSIONS_CLIENTS,
+        'volumes_extensions_client': VOLUMES_EXTENSIONS_CLIENTS,
+        'floating_ips_client': FLOAT_CLIENTS,
+        'volumes_client': VOLUMES_CLIENTS,
+        'admin_client': ADMIN_CLIENT,
+        'token_client': TOKEN_CLIENT,
+        'security_groups_client': SECURITY_GROUPS_CLIENT,
+        'console_outputs_client': CONSOLE_OUTPUT_CLIENT,
+        'quotas_client': QuotasClient,
+        'network_client': NetworkClient,
+        'account_client': AccountClient,
+        'container_client': ContainerClient,
+        'object_client': ObjectClient,
+        'ec2api_client': APIClientEC2,
+        's3_client': ObjectClientS3,
+        'custom_object_client': ObjectClientCustomizedHeader,
+    }
+
+    def __getattr__(self, name):
+        """Builds the requested client on first access and keeps it."""
+        try:
+            client_class = self._clients[name]
+        except KeyError:
+            raise AttributeError(name)
+        if isinstance(client_class, dict):
+            client_class = client_class[self.interface]
+        if name == 'token_client':
+            client = client_class(self.config)
+        else:
+            client = client_class(*self.client_args)
+        setattr(self, name, client)
+        return client
 
 
 class AltManager(Manager):
@@ -0,0 +1,266 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Per-test accounting of where the wall time of a test run goes
+
+Hooks in the transports charge the time of what they do, along with
+call and byte counts, to the test being run: HTTP requests by endpoint,
+waiters sleeping between status checks, requests held by the rate
+limiter and SSH commands by host. Whatever is left of the wall time of
+the test is reported as 'other', e.g. client CPU time.
+
+Time spent in the fixtures of a test class is charged to the class.
+Time spent by helper threads is charged to the test that started them,
+so a test running requests concurrently may account for more than its
+wall time.
+"""
+
+import argparse
+import contextlib
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+HTTP = 'http'
+POLL_SLEEP = 'poll_sleep'
+RATE_LIMIT = 'rate_limit'
+SSH = 'ssh'
+CATEGORIES = (HTTP, POLL_SLEEP, RATE_LIMIT, SSH)
+
+DEFAULT_REPORT = 'tempest-accounting.jsonl'
+RUN_ENVIRON = 'TEMPEST_ACCOUNTING_RUN'
+
+# accounts being charged, innermost last
+_accounts = []
+_lock = threading.Lock()
+
+
+class Account(object):
+
+    """Time, calls and bytes charged to a test or test class."""
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.start = time.time()
+        self.children_wall = 0.0
+        self.charges = {}
+
+    def charge(self, category, key, seconds, calls, sent, received):
+        totals = self.charges.setdefault((category, key), [0.0, 0, 0, 0])
+        totals[0] += seconds
+        totals[1] += calls
+        totals[2] += sent
+        totals[3] += received
+
+    def report(self, end):
+        """Returns the account as a JSON serializable dict."""
+        wall = end - self.start - self.children_wall
+        report = {'kind': self.kind, 'id': self.name, 'wall': wall}
+        charged = 0.0
+        for category in CATEGORIES:
+            report[category] = {'seconds': 0.0, 'calls': 0, 'sent': 0,
+                                'received': 0, 'by_key': {}}
+        for (category, key), totals in self.charges.items():
+            seconds, calls, sent, received = totals
+            total = report[category]
+            total['seconds'] += seconds
+            total['calls'] += calls
+            total['sent'] += sent
+            total['received'] += received
+            if key is not None:
+                total['by_key'][key] = {'seconds': seconds, 'calls': calls,
+                                        'sent': sent, 'received': received}
+            charged += seconds
+        report['other'] = max(wall - charged, 0.0)
+        return report
+
+
+def open_account(kind, name):
+    """Starts charging everything to a new account until it is closed."""
+    account = Account(kind, name)
+    with _lock:
+        _accounts.append(account)
+    return account
+
+
+def close_account(account):
+    """Stops charging an account, returns its report."""
+    end = time.time()
+    with _lock:
+        _accounts.remove(account)
+        if _accounts:
+            _accounts[-1].children_wall += end - account.start
+    return account.report(end)
+
+
+def charge(category, key, seconds, calls=1, sent=0, received=0):
+    """Charges the current account, if any, with some activity."""
+    if not _accounts:
+        return
+    with _lock:
+        if _accounts:
+            _accounts[-1].charge(category, key, seconds, calls, sent,
+                                 received)
+
+
+class _Charge(object):
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+
+
+@contextlib.contextmanager
+def timed(category, key=None):
+    """
+    Charges the time spent in the block to the current account
+
+    The block may set the `sent` and `received` byte counts of the
+    object it is given.
+    """
+    counts = _Charge()
+    start = time.time()
+    try:
+        yield counts
+    finally:
+        charge(category, key, time.time() - start, sent=counts.sent,
+               received=counts.received)
+
+
+class ApiAccountingPlugin(object):
+
+    """
+    Writes the accounting of every test and test class to a report
+
+    The report has a JSON object per line, so that the worker processes
+    of a parallel run can append to the same file. Every line carries the
+    id of the run; the file is truncated when a run starts. Enable with
+    --with-api-accounting or NOSE_WITH_API_ACCOUNTING=1.
+
+    Like trace.RequestTracePlugin, the plugin implements the nose plugin
+    interface without subclassing nose.plugins.Plugin, so that the
+    transports do not depend on nose.
+    """
+
+    name = 'api-accounting'
+    enabled = False
+    score = 100
+
+    def addOptions(self, parser, env=None):
+        if env is None:
+            env = os.environ
+        parser.add_option('--with-api-accounting', action='store_true',
+                          dest='with_api_accounting',
+                          default=env.get('NOSE_WITH_API_ACCOUNTING'),
+                          help="Enable plugin ApiAccountingPlugin: write "
+                               "where the time of every test goes to a "
+                               "report [NOSE_WITH_API_ACCOUNTING]")
+        parser.add_option('--api-accounting-file', action='store',
+                          dest='api_accounting_file',
+                          default=env.get('NOSE_API_ACCOUNTING_FILE',
+                                          DEFAULT_REPORT),
+                          help="File the accounting report is written to "
+                               "[NOSE_API_ACCOUNTING_FILE]")
+
+    def configure(self, options, conf):
+        self.enabled = bool(getattr(options, 'with_api_accounting', False))
+        if not self.enabled:
+            return
+        self.path = options.api_accounting_file
+        self._accounts = {}
+        # worker processes inherit the run id of the main process
+        self.run = os.environ.get(RUN_ENVIRON)
+        if self.run is None:
+            self.run = os.environ[RUN_ENVIRON] = str(uuid.uuid4())
+            open(self.path, 'w').close()
+
+    def _open(self, kind, name):
+        self._accounts[name] = open_account(kind, name)
+
+    def _close(self, name):
+        account = self._accounts.pop(name, None)
+        if account is None:
+            return
+        report = close_account(account)
+        report['run'] = self.run
+        report['pid'] = os.getpid()
+        with open(self.path, 'a') as output:
+            output.write(json.dumps(report, sort_keys=True) + '\n')
+
+    def startContext(self, context):
+        if inspect.isclass(context):
+            self._open('class', '%s.%s' % (context.__module__,
+                                           context.__name__))
+
+    def stopContext(self, context):
+        if inspect.isclass(context):
+            self._close('%s.%s' % (context.__module__, context.__name__))
+
+    def startTest(self, test):
+        self._open('test', test.id())
+
+    def stopTest(self, test):
+        self._close(test.id())
+
+
+def summarize(path, sort_by=POLL_SLEEP, top=20):
+    """Returns the lines of a table of the `top` tests of a report."""
+    reports = []
+    with open(path) as report_file:
+        for line in report_file:
+            if line.strip():
+                reports.append(json.loads(line))
+
+    def seconds(report, column):
+        if column in ('wall', 'other'):
+            return report[column]
+        return report[column]['seconds']
+
+    columns = ('wall',) + CATEGORIES + ('other',)
+    reports.sort(key=lambda report: seconds(report, sort_by), reverse=True)
+    lines = ['%12s' * len(columns) % columns + '  test']
+    for report in reports[:top]:
+        lines.append('%12.1f' * len(columns) %
+                     tuple(seconds(report, column) for column in columns) +
+                     '  ' + report['id'])
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Lists the tests of an accounting report spending the "
+                    "most time in a category")
+    parser.add_argument('report', nargs='?', default=DEFAULT_REPORT)
+    parser.add_argument('--sort', default=POLL_SLEEP,
+                        choices=('wall',) + CATEGORIES + ('other',),
+                        help="column to sort by (default: %(default)s)")
+    parser.add_argument('--top', type=int, default=20,
+                        help="number of tests listed (default: %(default)s)")
+    args = parser.parse_args(argv)
+    for line in summarize(args.report, args.sort, args.top):
+        print line
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
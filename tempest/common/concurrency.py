@@ -0,0 +1,110 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import Queue
+import threading
+
+
+def run_concurrently(func, items, concurrency, stop_on_error=False):
+    """
+    Calls `func(item)` for every item from a pool of `concurrency` threads.
+
+    `items` is only consumed as threads become free, so when it is a
+    generator no more than `concurrency` items are held at once. The
+    threads are started as items come and end with the call; unlike a
+    multiprocessing ThreadPool, whose teardown takes up to a tenth of a
+    second, they add no fixed cost to short calls.
+
+    :param stop_on_error: do not start any new call once one failed
+    :returns: list of (result, exception) tuples in the order of `items`,
+              exception being None for the calls which succeeded
+    """
+    concurrency = max(int(concurrency), 1)
+    slots = threading.BoundedSemaphore(concurrency)
+    failed = threading.Event()
+    tasks = Queue.Queue()
+    outcomes = []
+
+    def work():
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            index, item = task
+            try:
+                outcomes[index] = func(item), None
+            except Exception, exc:
+                failed.set()
+                outcomes[index] = None, exc
+            finally:
+                slots.release()
+
+    threads = []
+    try:
+        for item in items:
+            slots.acquire()
+            if stop_on_error and failed.is_set():
+                slots.release()
+                break
+            outcomes.append(None)
+            if len(threads) < concurrency:
+                thread = threading.Thread(target=work)
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+            tasks.put((len(outcomes) - 1, item))
+    finally:
+        for thread in threads:
+            tasks.put(None)
+        for thread in threads:
+            thread.join()
+    return outcomes
+
+
+def map_keyed(func, items, concurrency):
+    """
+    Calls `func(*args)` for every (key, args) tuple of `items` from a pool
+    of `concurrency` threads, see run_concurrently.
+
+    :returns: a (results, errors) tuple of dicts, mapping the key of every
+              call to its result or to the exception it raised
+    """
+    keys = []
+
+    def args_of():
+        for key, args in items:
+            keys.append(key)
+            yield args
+
+    results = {}
+    errors = {}
+    calls = run_concurrently(lambda args: func(*args), args_of(),
+                             concurrency)
+    for key, (result, exc) in zip(keys, calls):
+        if exc is None:
+            results[key] = result
+        else:
+            errors[key] = exc
+    return results, errors
+
+
+def raise_first_error(results):
+    """Returns the results of run_concurrently, raising its first error."""
+    for result, exc in results:
+        if exc is not None:
+            raise exc
+    return [result for result, exc in results]
@@ -0,0 +1,168 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import re
+
+# Lines asked for by the first incremental fetch, and the most ever asked
+# for before falling back to the whole log
+MIN_WINDOW = 50
+MAX_WINDOW = 5000
+
+# Characters of already scanned text searched again together with new
+# text, so that matches spanning two reads are found
+OVERLAP = 4096
+
+
+class ConsoleTail(object):
+
+    """
+    Incremental reader of a growing console log
+
+    `fetch(length)` returns the last `length` lines of the log, or the
+    whole log when `length` is None, like the os-getConsoleOutput action.
+    The first read fetches the whole log; later reads only ask for a
+    window of the last lines, sized after the growth seen so far, and
+    line it up with the tail of what was already read. When the window
+    does not reach back to known lines it is doubled, up to `max_window`
+    lines, after which the whole log is fetched again.
+
+    Lines are matched by content, so when the log keeps repeating the same
+    lines the new ones may be taken for lines already read; the text
+    returned would then lack repetitions, never contain duplicates.
+    """
+
+    def __init__(self, fetch, window=MIN_WINDOW, max_window=MAX_WINDOW):
+        self._fetch = fetch
+        self.min_window = window
+        self.window = window
+        self.max_window = max_window
+        # last complete lines read, to line up the next window with
+        self._seen = collections.deque(maxlen=max_window)
+        self._count = 0
+        # trailing text without a line end, already returned
+        self._partial = ''
+        self._started = False
+
+    @classmethod
+    def for_server(cls, client, server_id, **kwargs):
+        """Tails the console of a server through a console output client."""
+        def fetch(length):
+            resp, output = client.get_console_output(server_id, length)
+            return output
+        return cls(fetch, **kwargs)
+
+    def _reset(self):
+        self._seen.clear()
+        self._count = 0
+        self._partial = ''
+
+    def _overlap(self, lines):
+        """Number of leading `lines` matching the end of the lines already
+        read, None if the window does not reach back to them."""
+        seen = list(self._seen)
+        for size in xrange(min(len(lines), len(seen)), 0, -1):
+            if lines[:size] == seen[-size:]:
+                return size
+        return None
+
+    def _split(self, length):
+        text = self._fetch(length) or ''
+        lines = text.splitlines(True)
+        partial = ''
+        if lines and not lines[-1].endswith(('\n', '\r')):
+            partial = lines.pop()
+        return lines, partial
+
+    def read(self):
+        """Returns the text appended to the log since the previous read."""
+        length = self.window if self._started else None
+        self._started = True
+        while True:
+            lines, partial = self._split(length)
+            # Nova counts the empty string after a final line end as a line
+            if length is None or len(lines) + 1 < length:
+                if len(lines) < self._count:
+                    # the log was truncated, read it all over again
+                    self._reset()
+                new_lines = lines[self._count:]
+                break
+            overlap = self._overlap(lines)
+            if overlap is not None:
+                new_lines = lines[overlap:]
+                break
+            length = length * 2 if length < self.max_window else None
+
+        self._seen.extend(new_lines)
+        self._count += len(new_lines)
+        self.window = min(max(self.min_window, 2 * len(new_lines)),
+                          self.max_window)
+
+        text = ''.join(new_lines) + partial
+        # the start of the first new line may have been returned already
+        if self._partial and text.startswith(self._partial):
+            text = text[len(self._partial):]
+        self._partial = partial
+        return text
+
+
+class PatternScanner(object):
+
+    """
+    Searches a growing text for a pattern without rescanning all of it
+
+    Each search covers the new text and the last `overlap` characters of
+    the text already searched, which must be longer than any match.
+    """
+
+    def __init__(self, regexp, overlap=OVERLAP):
+        if isinstance(regexp, basestring):
+            regexp = re.compile(regexp)
+        self.pattern = regexp
+        self.overlap = overlap
+        self._tail = ''
+        self._length = 0
+
+    def feed(self, text):
+        """Searches the text appended since the previous call."""
+        window = self._tail + text
+        match = self.pattern.search(window)
+        self._tail = window[-self.overlap:] if self.overlap else ''
+        return match
+
+    def feed_full(self, text):
+        """
+        Searches the part of the whole `text` not searched yet.
+
+        The text may also be a sliding window over a longer log, which
+        drops its head as it grows; the search then resumes after the last
+        occurrence of the previously searched tail, or starts over if that
+        is gone.
+        """
+        seen = self._length
+        tail = self._tail
+        if seen <= len(text) and text[seen - len(tail):seen] == tail:
+            new_text = text[seen:]
+        else:
+            position = text.rfind(tail) if tail else -1
+            if position < 0:
+                self._tail = ''
+                new_text = text
+            else:
+                new_text = text[position + len(tail):]
+        self._length = len(text)
+        return self.feed(new_text)
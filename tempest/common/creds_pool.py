@@ -0,0 +1,342 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Pool of pre-provisioned isolated credentials
+
+Creating a tenant and a user for every test class, and deleting them
+again, puts several serial Keystone round-trips on the critical path of
+each class. The pool creates tenant/user pairs concurrently at the start
+of the run, leases one to each class, resets it in the background when
+the class gives it back and deletes them all in parallel at the end.
+
+A pair only goes back into the pool when the class left nothing behind in
+its tenant; otherwise the next class would not start from an empty tenant,
+and the tenant is deleted instead.
+
+Every process has a pool of its own: the workers of a parallel run
+(nosetests --processes) never lease the same credentials, and each of
+them deletes its credentials when it exits.
+"""
+
+import logging
+from multiprocessing.pool import ThreadPool
+from multiprocessing import util
+import os
+import threading
+
+from tempest import clients
+from tempest.common import concurrency
+from tempest.common import token_cache
+from tempest.common.utils.data_utils import rand_name
+from tempest import exceptions
+
+LOG = logging.getLogger(__name__)
+
+PASSWORD = 'pass'
+
+# Credential pools keyed by the id of the process they belong to
+_pools = {}
+_pool_lock = threading.Lock()
+
+
+class Credentials(object):
+
+    """A tenant/user pair of the pool, `user` and `tenant` being the
+    Keystone dicts they were created with."""
+
+    def __init__(self, user, tenant, password, roles):
+        self.user = user
+        self.tenant = tenant
+        self.password = password
+        # ids of the roles the user had on the tenant when created
+        self.roles = roles
+
+    @property
+    def username(self):
+        return self.user['name']
+
+    @property
+    def tenant_name(self):
+        return self.tenant['name']
+
+
+class CredentialPool(object):
+
+    """
+    Isolated tenant/user pairs shared by the test classes of a run
+
+    A class calls `lease` instead of creating its own tenant and user, and
+    `release` once done. Released credentials are reset - user and tenant
+    enabled again, the roles granted since their creation revoked, cached
+    tokens dropped - before they are leased again. Credentials whose
+    tenant still holds servers, key pairs, security groups, floating ips
+    or volumes, which cannot be reset, or which a class asks to `discard`
+    are deleted. The first `lease` fills the pool; when no credentials
+    are free, `lease` creates new ones.
+
+    :param admin_client_factory: returns an Identity admin client
+    :param size: tenant/user pairs created by `fill`
+    :param allow_reuse: take over the tenant and user of a pair `lease`
+                        creates for a test class when they already exist,
+                        e.g. left by a failed run, see allow_tenant_reuse
+    """
+
+    def __init__(self, admin_client_factory, size, auth_url=None,
+                 allow_reuse=False):
+        self._admin_client_factory = admin_client_factory
+        self._admin_client = None
+        self.size = size
+        self.auth_url = auth_url
+        self.allow_reuse = allow_reuse
+        self._free = []
+        self._filled = False
+        self._leased = set()
+        self._lock = threading.Lock()
+        self._workers = None
+        self._resets = []
+
+    def _admin(self):
+        if self._admin_client is None:
+            self._admin_client = self._admin_client_factory()
+        return self._admin_client
+
+    def _get_workers(self):
+        with self._lock:
+            if self._workers is None:
+                self._workers = ThreadPool(max(self.size, 1))
+            return self._workers
+
+    def _duplicate(self, kind, name):
+        msg = ('Unable to create isolated %s %s because it already '
+               'exists. If this is related to a previous test failure, '
+               'try using allow_tenant_reuse in tempest.conf') % (kind, name)
+        return exceptions.Duplicate(msg)
+
+    def _create(self, name_root=None):
+        """
+        Creates a tenant/user pair named after `name_root`, e.g. the test
+        class it is created for. Pairs created ahead of demand get random
+        names, which never collide.
+        """
+        admin = self._admin()
+        if name_root is None:
+            name_root = rand_name('tempest-')
+        username = name_root + '-user'
+        tenant_name = name_root + '-tenant'
+        created = False
+        try:
+            resp, tenant = admin.create_tenant(
+                name=tenant_name, description=tenant_name + '-desc')
+            created = True
+        except exceptions.Duplicate:
+            if not self.allow_reuse:
+                raise self._duplicate('tenant', tenant_name)
+            tenant = admin.get_tenant_by_name(tenant_name)
+            LOG.info('Re-using existing tenant %s' % tenant)
+        try:
+            try:
+                resp, user = admin.create_user(username, PASSWORD,
+                                               tenant['id'],
+                                               name_root + '@example.com')
+            except exceptions.Duplicate:
+                if not self.allow_reuse:
+                    raise self._duplicate('user', username)
+                user = admin.get_user_by_username(tenant['id'], username)
+                LOG.info('Re-using existing user %s' % user)
+            resp, roles = admin.list_user_roles(tenant['id'], user['id'])
+        except Exception:
+            if created:
+                admin.delete_tenant(tenant['id'])
+            raise
+        return Credentials(user, tenant, PASSWORD,
+                           set(role['id'] for role in roles))
+
+    def _delete(self, creds):
+        admin = self._admin()
+        self._forget_token(creds)
+        admin.delete_user(creds.user['id'])
+        admin.delete_tenant(creds.tenant['id'])
+
+    def _forget_token(self, creds):
+        token_cache.get_cache().invalidate((self.auth_url, creds.username,
+                                            creds.password,
+                                            creds.tenant_name))
+
+    def fill(self):
+        """Creates the missing free credentials concurrently."""
+        with self._lock:
+            self._filled = True
+            missing = self.size - len(self._free)
+        if missing <= 0:
+            return
+        results = concurrency.run_concurrently(lambda _index: self._create(),
+                                               xrange(missing), missing)
+        created = [creds for creds, exc in results if exc is None]
+        failures = [exc for creds, exc in results if exc is not None]
+        if failures:
+            LOG.warning("Failed to create %d of %d isolated credentials: %s",
+                        len(failures), missing, failures[0])
+        with self._lock:
+            self._free.extend(created)
+
+    def lease(self, name_root=None):
+        """
+        Returns free Credentials, creating new ones named after `name_root`
+        if there are none.
+        """
+        if not self._filled:
+            self.fill()
+        with self._lock:
+            creds = self._free.pop() if self._free else None
+        if creds is None:
+            creds = self._create(name_root)
+        with self._lock:
+            self._leased.add(creds)
+        return creds
+
+    def _leftovers(self, creds):
+        """
+        Lists the compute and volume resources left in the tenant of the
+        credentials, as seen by their user. Kinds of resources the cloud
+        does not have, such as a missing extension, are skipped.
+        """
+        manager = clients.Manager(creds.username, creds.password,
+                                  creds.tenant_name)
+
+        def servers():
+            resp, body = manager.servers_client.list_servers()
+            return ['server %s' % server['id'] for server in body['servers']]
+
+        def keypairs():
+            resp, body = manager.keypairs_client.list_keypairs()
+            return ['key pair %s' % keypair['keypair']['name']
+                    for keypair in body]
+
+        def security_groups():
+            resp, body = manager.security_groups_client.list_security_groups()
+            return ['security group %s' % group['name'] for group in body
+                    if group['name'] != 'default']
+
+        def floating_ips():
+            resp, body = manager.floating_ips_client.list_floating_ips()
+            return ['floating ip %s' % ip['ip'] for ip in body]
+
+        def volumes():
+            resp, body = manager.volumes_extensions_client.list_volumes()
+            return ['volume %s' % volume['id'] for volume in body]
+
+        found = []
+        for listing in (servers, keypairs, security_groups, floating_ips,
+                        volumes):
+            try:
+                found.extend(listing())
+            except (exceptions.NotFound, exceptions.EndpointNotFound):
+                continue
+        return found
+
+    def _reset(self, creds):
+        admin = self._admin()
+        tenant_id = creds.tenant['id']
+        user_id = creds.user['id']
+        try:
+            admin.enable_disable_user(user_id, True)
+            admin.update_tenant(tenant_id, name=creds.tenant_name,
+                                description=creds.tenant.get('description',
+                                                             ''),
+                                enabled=True)
+            leftovers = self._leftovers(creds)
+            if not leftovers:
+                resp, roles = admin.list_user_roles(tenant_id, user_id)
+                for role in roles:
+                    if role['id'] not in creds.roles:
+                        admin.remove_user_role(tenant_id, user_id,
+                                               role['id'])
+                self._forget_token(creds)
+        except Exception:
+            LOG.exception("Unable to reset isolated user %s, deleting it",
+                          creds.username)
+            self._delete(creds)
+            return
+        if leftovers:
+            LOG.warning("Isolated tenant %s is not empty, deleting it "
+                        "instead of reusing it: %s", creds.tenant_name,
+                        ', '.join(leftovers))
+            self._delete(creds)
+            return
+        with self._lock:
+            self._free.append(creds)
+
+    def release(self, creds):
+        """Gives leased Credentials back, resetting them in the background."""
+        with self._lock:
+            self._leased.discard(creds)
+        result = self._get_workers().apply_async(self._reset, (creds,))
+        with self._lock:
+            self._resets.append(result)
+
+    def discard(self, creds):
+        """Deletes leased Credentials instead of giving them back."""
+        with self._lock:
+            self._leased.discard(creds)
+        self._delete(creds)
+
+    def close(self):
+        """Deletes all credentials in parallel, the leased ones included.
+
+        The pool can still be used afterwards, it starts out empty again."""
+        with self._lock:
+            resets, self._resets = self._resets, []
+        for result in resets:
+            result.wait()
+        with self._lock:
+            doomed = self._free + list(self._leased)
+            self._free = []
+            self._filled = False
+            self._leased = set()
+            workers, self._workers = self._workers, None
+        if workers is not None:
+            workers.close()
+            workers.join()
+        results = concurrency.run_concurrently(self._delete, doomed,
+                                               max(self.size, 1))
+        for creds, (result, exc) in zip(doomed, results):
+            if exc is not None:
+                LOG.warning("Failed to delete isolated user %s: %s",
+                            creds.username, exc)
+
+
+def get_pool(config):
+    """
+    Returns the credential pool of the current process, which is closed
+    when the process exits.
+    """
+    pid = os.getpid()
+    with _pool_lock:
+        pool = _pools.get(pid)
+        if pool is None:
+            pool = CredentialPool(
+                lambda: clients.IdentityManager().admin_client,
+                config.compute.isolated_creds_pool_size,
+                config.identity.auth_url,
+                config.compute.allow_tenant_reuse)
+            _pools[pid] = pool
+            # Unlike atexit, multiprocessing finalizers also run when a
+            # worker process exits. The pool must close before the thread
+            # pools it waits on are terminated, at exit priority 15.
+            util.Finalize(None, pool.close, exitpriority=20)
+        return pool
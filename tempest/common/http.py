@@ -0,0 +1,487 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import httplib
+import logging
+import mmap
+import os
+import socket
+import ssl
+import stat
+import threading
+import time
+import urlparse
+
+import httplib2
+
+from tempest.common import accounting
+from tempest import exceptions
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# methods a request may safely be resent with after a stale connection
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+
+# size of the chunks streamed request and response bodies are sent and
+# read in
+CHUNK_SIZE = 64 * 1024
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# deadlines and read timeout of the requests of the current thread
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def deadline(timeout):
+    """
+    Bounds every request the current thread sends within the block
+
+    No pooled request started within the block blocks past `timeout`
+    seconds from now, whatever its connect and read timeouts; once the
+    deadline has passed, requests raise TimeoutException without being
+    sent. Nested deadlines never extend an enclosing one.
+    """
+    if not hasattr(_local, 'deadlines'):
+        _local.deadlines = []
+    _local.deadlines.append(time.time() + timeout)
+    try:
+        yield
+    finally:
+        _local.deadlines.pop()
+
+
+def time_left():
+    """Seconds until the deadline of the current thread, None if none."""
+    deadlines = getattr(_local, 'deadlines', None)
+    if not deadlines:
+        return None
+    return min(deadlines) - time.time()
+
+
+def _is_timeout(exc):
+    # SSL sockets of older Pythons report timeouts as plain SSLErrors
+    return isinstance(exc, socket.timeout) or (
+        isinstance(exc, ssl.SSLError) and 'timed out' in str(exc))
+
+
+class _HTTPConnection(httplib2.HTTPConnectionWithTimeout):
+
+    """Switches to the read timeout of the request once connected."""
+
+    def connect(self):
+        httplib2.HTTPConnectionWithTimeout.connect(self)
+        self.sock.settimeout(getattr(_local, 'read_timeout', None))
+
+
+class _HTTPSConnection(httplib2.HTTPSConnectionWithTimeout):
+
+    """Switches to the read timeout of the request once connected."""
+
+    def connect(self):
+        httplib2.HTTPSConnectionWithTimeout.connect(self)
+        self.sock.settimeout(getattr(_local, 'read_timeout', None))
+
+
+_CONNECTION_TYPES = {'http': _HTTPConnection, 'https': _HTTPSConnection}
+
+
+class ResponseStream(object):
+
+    """
+    Body of a streamed response, read from the socket on demand
+
+    Iterating yields chunks of `chunk_size` bytes (the last one may be
+    shorter), so memory use does not depend on the size of the body. The
+    connection is closed once the body is exhausted or `close` is called.
+    """
+
+    def __init__(self, conn, response, chunk_size=CHUNK_SIZE, endpoint=None):
+        self._conn = conn
+        self._response = response
+        self.chunk_size = chunk_size
+        self.endpoint = endpoint
+
+    def __iter__(self):
+        try:
+            while True:
+                start = time.time()
+                chunk = self._response.read(self.chunk_size)
+                # the request itself was counted when it was sent
+                accounting.charge(accounting.HTTP, self.endpoint,
+                                  time.time() - start, calls=0,
+                                  received=len(chunk))
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            self.close()
+
+    def read(self):
+        """Reads the whole remaining body, for small (e.g. error) bodies."""
+        return ''.join(self)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def body_length(body):
+    """Length of a request body, None if it is only known once sent."""
+    if body is None:
+        return 0
+    if isinstance(body, (str, buffer, mmap.mmap)):
+        return len(body)
+    if hasattr(body, 'fileno') and hasattr(body, 'tell'):
+        try:
+            st = os.fstat(body.fileno())
+            if stat.S_ISREG(st.st_mode):
+                return st.st_size - body.tell()
+        except (AttributeError, EnvironmentError, ValueError):
+            # not backed by an OS level file, e.g. a StringIO
+            pass
+    return None
+
+
+def _iter_body(body, chunk_size):
+    """
+    Yields a request body in chunks of about `chunk_size` bytes.
+
+    Strings, buffers and memory-mapped files are sliced with buffers rather
+    than copied; file objects are read, and any other iterable is yielded
+    as is.
+    """
+    if isinstance(body, (str, buffer, mmap.mmap)):
+        for offset in xrange(0, len(body), chunk_size):
+            yield buffer(body, offset, chunk_size)
+    elif hasattr(body, 'read'):
+        while True:
+            chunk = body.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for chunk in body:
+            if chunk:
+                yield chunk
+
+
+def _send_body(conn, body, chunked, chunk_size):
+    for chunk in _iter_body(body, chunk_size):
+        if chunked:
+            conn.send('%x\r\n' % len(chunk))
+            conn.send(chunk)
+            conn.send('\r\n')
+        else:
+            conn.send(chunk)
+    if chunked:
+        conn.send('0\r\n\r\n')
+
+
+def _encode_request(url, headers):
+    """
+    Encodes a unicode url and header values, as found in the service
+    catalog and tokens, so that httplib does not promote the request to
+    unicode and fail on binary bodies.
+    """
+    if isinstance(url, unicode):
+        url = url.encode('utf-8')
+    if headers:
+        headers = dict((name, value.encode('utf-8')
+                        if isinstance(value, unicode) else value)
+                       for name, value in headers.items())
+    return url, headers
+
+
+def _connect(parsed, disable_ssl_certificate_validation, timeout=None):
+    if parsed.scheme.lower() != 'https':
+        return httplib.HTTPConnection(parsed.hostname, parsed.port,
+                                      timeout=timeout)
+    kwargs = {'timeout': timeout}
+    # Python 2.7.9+ verifies certificates by default
+    if (disable_ssl_certificate_validation and
+            hasattr(ssl, '_create_unverified_context')):
+        kwargs['context'] = ssl._create_unverified_context()
+    return httplib.HTTPSConnection(parsed.hostname, parsed.port, **kwargs)
+
+
+class ConnectionPool(object):
+
+    """
+    Thread-safe pool of keep-alive httplib2.Http objects
+
+    Idle Http objects are kept per (scheme, host, port) endpoint so that
+    consecutive requests to the same API reuse an already established
+    TCP/TLS connection instead of doing a new handshake for every call.
+    At most `maxsize` requests are in flight against a single endpoint at
+    any time; idle connections unused for `idle_timeout` seconds are closed.
+
+    Establishing a connection may take up to `connect_timeout` seconds and
+    every later socket operation, e.g. waiting for the response, up to
+    `read_timeout` seconds, both being cut short by the deadline of the
+    calling thread. A request timing out raises TimeoutException.
+    """
+
+    def __init__(self, maxsize=10, idle_timeout=60, connect_timeout=None,
+                 read_timeout=None):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+
+    def _get_key(self, url, disable_ssl_certificate_validation):
+        parsed = urlparse.urlparse(url)
+        scheme = parsed.scheme.lower()
+        port = parsed.port or DEFAULT_PORTS.get(scheme)
+        return (scheme, parsed.hostname, port,
+                disable_ssl_certificate_validation)
+
+    def _get_slots(self, key):
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.maxsize)
+            return self._slots[key]
+
+    def _close(self, http_obj):
+        for conn in http_obj.connections.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        http_obj.connections.clear()
+
+    def _evict(self, now):
+        """Closes idle connections not used for `idle_timeout` seconds."""
+        expired = []
+        with self._lock:
+            for key, idle in self._idle.items():
+                fresh = [(used, h) for used, h in idle
+                         if now - used < self.idle_timeout]
+                expired.extend(h for used, h in idle
+                               if now - used >= self.idle_timeout)
+                self._idle[key] = fresh
+        for http_obj in expired:
+            self._close(http_obj)
+
+    def _checkout(self, key):
+        """Returns an (http_obj, reused) tuple for the given endpoint."""
+        self._evict(time.time())
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()[1], True
+        http_obj = httplib2.Http(disable_ssl_certificate_validation=key[3])
+        return http_obj, False
+
+    def _get_timeouts(self, url, method, connect_timeout=None,
+                      read_timeout=None):
+        """
+        Returns the (connect, read) timeouts of a request, shortened to
+        the deadline of the thread, which must not have passed yet.
+        """
+        if connect_timeout is None:
+            connect_timeout = self.connect_timeout
+        if read_timeout is None:
+            read_timeout = self.read_timeout
+        left = time_left()
+        if left is None:
+            return connect_timeout, read_timeout
+        if left <= 0:
+            raise exceptions.TimeoutException(
+                "Deadline passed before %s %s was sent" % (method, url))
+        return (min(connect_timeout or left, left),
+                min(read_timeout or left, left))
+
+    def _send(self, http_obj, url, method, body, headers, timeouts):
+        """Sends a request over http_obj with the given timeouts."""
+        connect_timeout, read_timeout = timeouts
+        _local.read_timeout = read_timeout
+        http_obj.timeout = connect_timeout
+        for conn in http_obj.connections.values():
+            conn.timeout = connect_timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(read_timeout)
+        parsed = urlparse.urlparse(url)
+        try:
+            with accounting.timed(accounting.HTTP, parsed.netloc) as counts:
+                counts.sent = body_length(body) or 0
+                resp, resp_body = http_obj.request(
+                    url, method, headers=headers, body=body,
+                    connection_type=_CONNECTION_TYPES.get(
+                        parsed.scheme.lower()))
+                counts.received = len(resp_body)
+            return resp, resp_body
+        except (socket.error, ssl.SSLError), exc:
+            if _is_timeout(exc):
+                raise exceptions.TimeoutException(
+                    "%s %s got no answer in time" % (method, url))
+            raise
+
+    def _checkin(self, key, http_obj):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append((time.time(), http_obj))
+                return
+        self._close(http_obj)
+
+    def request(self, url, method='GET', body=None, headers=None,
+                disable_ssl_certificate_validation=True,
+                connect_timeout=None, read_timeout=None):
+        """
+        Sends a request over a pooled connection to the url's endpoint.
+
+        A connection closed by the server while it was idle in the pool is
+        replaced by a fresh one and an idempotent request is sent again, so
+        callers never see errors caused by stale keep-alive sockets. Other
+        requests are never resent, the server may have acted on them already.
+        The timeouts default to those of the pool.
+        """
+        url, headers = _encode_request(url, headers)
+        key = self._get_key(url, disable_ssl_certificate_validation)
+        slots = self._get_slots(key)
+        slots.acquire()
+        try:
+            http_obj, reused = self._checkout(key)
+            try:
+                resp, resp_body = self._send(
+                    http_obj, url, method, body, headers,
+                    self._get_timeouts(url, method, connect_timeout,
+                                       read_timeout))
+            except exceptions.TimeoutException:
+                self._close(http_obj)
+                raise
+            except (socket.error, httplib.HTTPException):
+                self._close(http_obj)
+                # httplib2 already retries once on its own; a file or
+                # generator body may be partly consumed and a POST may
+                # have been acted upon, neither can be sent again
+                if (not reused or method not in IDEMPOTENT_METHODS or
+                        not isinstance(body, (type(None), str))):
+                    raise
+                LOG.debug("Stale pooled connection to %s:%s, reconnecting",
+                          key[1], key[2])
+                http_obj, reused = httplib2.Http(
+                    disable_ssl_certificate_validation=key[3]), False
+                try:
+                    resp, resp_body = self._send(
+                        http_obj, url, method, body, headers,
+                        self._get_timeouts(url, method, connect_timeout,
+                                           read_timeout))
+                except Exception:
+                    self._close(http_obj)
+                    raise
+            except Exception:
+                self._close(http_obj)
+                raise
+            self._checkin(key, http_obj)
+            return resp, resp_body
+        finally:
+            slots.release()
+
+    def open_stream(self, url, method='GET', body=None, headers=None,
+                    chunk_size=CHUNK_SIZE,
+                    disable_ssl_certificate_validation=True,
+                    connect_timeout=None, read_timeout=None):
+        """
+        Sends a request and returns as soon as the response headers arrive.
+
+        Besides a string, the body may be a memory-mapped file, a file object
+        or any iterable of strings; it is sent `chunk_size` bytes at a time
+        and never loaded into memory at once. Bodies of unknown length,
+        such as generators or pipes, are sent with chunked transfer encoding
+        unless the headers give a Content-Length.
+
+        Returns a (resp, ResponseStream) tuple, resp being a
+        httplib2.Response like the one `request` returns. The stream has a
+        dedicated connection, which is not returned to the pool.
+        """
+        parsed = urlparse.urlparse(url)
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        if isinstance(body, unicode):
+            body = body.encode('utf-8')
+        headers = headers or {}
+        names = dict((name.lower(), value) for name, value in headers.items())
+        chunked = names.get('transfer-encoding', '').lower() == 'chunked'
+        connect_timeout, read_timeout = self._get_timeouts(
+            url, method, connect_timeout, read_timeout)
+        conn = _connect(parsed, disable_ssl_certificate_validation,
+                        connect_timeout)
+        sent = body_length(body) or 0
+        start = time.time()
+        try:
+            conn.connect()
+            conn.sock.settimeout(read_timeout)
+            conn.putrequest(method, path)
+            for name, value in headers.items():
+                conn.putheader(name, value)
+            if body is not None and not chunked and (
+                    'content-length' not in names):
+                length = body_length(body)
+                if length is None:
+                    chunked = True
+                    conn.putheader('Transfer-Encoding', 'chunked')
+                else:
+                    conn.putheader('Content-Length', str(length))
+            conn.endheaders()
+            if body is not None:
+                _send_body(conn, body, chunked, chunk_size)
+            response = conn.getresponse()
+        except (socket.error, ssl.SSLError), exc:
+            conn.close()
+            if _is_timeout(exc):
+                raise exceptions.TimeoutException(
+                    "%s %s got no answer in time" % (method, url))
+            raise
+        except Exception:
+            conn.close()
+            raise
+        finally:
+            accounting.charge(accounting.HTTP, parsed.netloc,
+                              time.time() - start, sent=sent)
+        return (httplib2.Response(response),
+                ResponseStream(conn, response, chunk_size, parsed.netloc))
+
+    def close(self):
+        """Closes every idle connection held by the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for entries in idle.values():
+            for used, http_obj in entries:
+                self._close(http_obj)
+
+
+def get_pool(config):
+    """Returns the process-wide connection pool shared by all clients."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(config.compute.http_pool_maxsize,
+                                   config.compute.http_pool_idle_timeout,
+                                   config.compute.http_connect_timeout,
+                                   config.compute.http_read_timeout)
+        return _pool
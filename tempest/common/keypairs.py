@@ -0,0 +1,151 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Locally generated key pairs
+
+Having Nova generate the RSA key of every key pair is slow and keeps an
+API worker busy. Instead, keys are generated ahead of demand by a pool of
+worker processes and only their public half is imported, the private half
+staying in memory for RemoteClient.
+"""
+
+import collections
+from cStringIO import StringIO
+import multiprocessing
+import threading
+import warnings
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from paramiko import RSAKey
+
+KEY_BITS = 2048
+
+_key_pool = None
+_key_pool_lock = threading.Lock()
+
+
+def generate_key(bits=KEY_BITS):
+    """Returns the (public_key, private_key) strings of a new RSA key, in
+    OpenSSH and PEM format respectively."""
+    key = RSAKey.generate(bits)
+    private_key = StringIO()
+    key.write_private_key(private_key)
+    public_key = '%s %s Generated by Tempest' % (key.get_name(),
+                                                 key.get_base64())
+    return public_key, private_key.getvalue()
+
+
+def _init_worker():
+    # PyCrypto refuses to use its random pool in a forked child until it
+    # has been reseeded
+    try:
+        from Crypto import Random
+    except ImportError:
+        return
+    Random.atfork()
+
+
+class KeyPool(object):
+
+    """
+    RSA keys generated ahead of demand by background processes
+
+    Up to `size` keys are kept generated or being generated; every key
+    taken is replaced at once. The worker processes are only started by
+    the first `get` or an explicit `start`. A size of 0 generates every key
+    in the calling process when it is asked for.
+    """
+
+    def __init__(self, size, bits=KEY_BITS):
+        self.size = size
+        self.bits = bits
+        self._workers = None
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+
+    def _fill(self):
+        if self._workers is None:
+            self._workers = multiprocessing.Pool(
+                min(self.size, multiprocessing.cpu_count()), _init_worker)
+        while len(self._pending) < self.size:
+            self._pending.append(
+                self._workers.apply_async(generate_key, (self.bits,)))
+
+    def start(self):
+        """Starts generating keys before any is asked for."""
+        if self.size > 0:
+            with self._lock:
+                self._fill()
+
+    def get(self):
+        """Returns a (public_key, private_key) tuple, see generate_key."""
+        if self.size <= 0:
+            return generate_key(self.bits)
+        with self._lock:
+            self._fill()
+            result = self._pending.popleft()
+            self._fill()
+        return result.get()
+
+    def close(self):
+        """Stops the worker processes, dropping the keys not taken yet."""
+        with self._lock:
+            if self._workers is not None:
+                self._workers.terminate()
+                self._workers.join()
+                self._workers = None
+            self._pending.clear()
+
+
+def get_key_pool(config):
+    """Returns the process-wide key pool."""
+    global _key_pool
+    with _key_pool_lock:
+        if _key_pool is None:
+            _key_pool = KeyPool(config.compute.keypair_pool_size,
+                                config.compute.keypair_bits)
+        return _key_pool
+
+
+def close_key_pool():
+    """
+    Stops the worker processes of the process-wide key pool, e.g. at test
+    class teardown; they are started again if another key is asked for.
+    """
+    with _key_pool_lock:
+        pool = _key_pool
+    if pool is not None:
+        pool.close()
+
+
+def import_keypair(client, name, pool=None):
+    """
+    Creates a key pair from a locally generated key.
+
+    :param client: a JSON or XML keypairs client
+    :param pool: the KeyPool to take the key from, the process-wide one
+                 by default
+    :returns: the (resp, keypair) tuple of client.create_keypair, the
+              keypair including its private_key as if Nova generated it
+    """
+    pool = pool or get_key_pool(client.config)
+    public_key, private_key = pool.get()
+    resp, keypair = client.create_keypair(name, public_key)
+    keypair['private_key'] = private_key
+    return resp, keypair
@@ -0,0 +1,75 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+import threading
+
+
+class _PageFetch(threading.Thread):
+
+    """Fetches one page in the background, keeping its result or error."""
+
+    def __init__(self, fetch, marker):
+        super(_PageFetch, self).__init__()
+        self.daemon = True
+        self._fetch = fetch
+        self._marker = marker
+        self._page = None
+        self._exc_info = None
+
+    def run(self):
+        try:
+            self._page = self._fetch(self._marker)
+        except Exception:
+            self._exc_info = sys.exc_info()
+
+    def result(self):
+        self.join()
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._page
+
+
+def _get_marker(entry):
+    # pseudo-directories of delimited listings only have a 'subdir'
+    return entry.get('name', entry.get('subdir'))
+
+
+def iter_listing(fetch, page_size, marker=None, prefetch=True):
+    """
+    Yields the entries of a marker-paginated listing one at a time.
+
+    `fetch(marker)` returns the page of at most `page_size` entries after
+    `marker`, a page shorter than that being the last one. With `prefetch`
+    the next page is requested in a background thread while the caller
+    goes through the current one, so only two pages are ever in memory.
+    """
+    page = fetch(marker)
+    while page:
+        last = len(page) < page_size
+        next_page = None
+        if not last and prefetch:
+            next_page = _PageFetch(fetch, _get_marker(page[-1]))
+            next_page.start()
+        for entry in page:
+            yield entry
+        if last:
+            return
+        if next_page is not None:
+            page = next_page.result()
+        else:
+            page = fetch(_get_marker(page[-1]))
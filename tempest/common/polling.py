@@ -0,0 +1,126 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import random
+import time
+
+from tempest.common import accounting
+from tempest.common import http
+
+LOG = logging.getLogger(__name__)
+
+INITIAL_INTERVAL = 0.5
+BACKOFF_FACTOR = 2.0
+JITTER = 0.1
+# seconds the last check of a waiter, made once its timeout is reached,
+# is given to complete
+DEADLINE_GRACE = 10
+
+
+class BackoffPolicy(object):
+
+    """
+    Exponential backoff between status checks
+
+    The first check is done immediately, the next one after `initial`
+    seconds, and every following interval grows by `factor` until it
+    reaches `cap`. Each interval is shortened by a random fraction of up
+    to `jitter` so that parallel waiters do not poll in lockstep.
+    """
+
+    def __init__(self, initial=INITIAL_INTERVAL, factor=BACKOFF_FACTOR,
+                 cap=10, jitter=JITTER):
+        self.initial = min(initial, cap)
+        self.factor = factor
+        self.cap = cap
+        self.jitter = jitter
+
+    @classmethod
+    def from_config(cls, config, cap):
+        """Builds the configured policy, capped at the given interval."""
+        return cls(initial=config.compute.poll_initial_interval,
+                   factor=config.compute.poll_backoff_factor,
+                   cap=cap,
+                   jitter=config.compute.poll_jitter)
+
+    def intervals(self):
+        """Yields the successive sleep intervals, in seconds."""
+        interval = self.initial
+        while True:
+            yield interval * (1 - random.random() * self.jitter)
+            interval = min(interval * self.factor, self.cap)
+
+
+class Poller(object):
+
+    """
+    Paces a waiter loop according to a BackoffPolicy and a timeout
+
+    Either drive the loop explicitly::
+
+        poller = Poller(timeout, policy)
+        while not done():
+            if poller.expired():
+                raise exceptions.TimeoutException
+            poller.sleep()
+
+    or iterate over it; the body runs immediately, then after every
+    interval, and one last time when the timeout is reached::
+
+        for elapsed in Poller(timeout, policy):
+            if done():
+                break
+        else:
+            raise exceptions.TimeoutException
+    """
+
+    def __init__(self, timeout, policy=None):
+        self.timeout = timeout
+        self.policy = policy or BackoffPolicy()
+        self.start_time = time.time()
+        self._intervals = self.policy.intervals()
+
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def remaining(self):
+        return self.timeout - self.elapsed()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def deadline(self):
+        """
+        Returns a context manager bounding the requests sent within it by
+        the timeout of the poller, plus DEADLINE_GRACE; see http.deadline.
+        """
+        return http.deadline(max(self.remaining(), 0) + DEADLINE_GRACE)
+
+    def sleep(self):
+        """Sleeps for the next interval, never past the timeout."""
+        interval = min(next(self._intervals), max(self.remaining(), 0))
+        if interval > 0:
+            with accounting.timed(accounting.POLL_SLEEP):
+                time.sleep(interval)
+
+    def __iter__(self):
+        while True:
+            yield self.elapsed()
+            if self.expired():
+                return
+            self.sleep()
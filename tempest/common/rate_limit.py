@@ -0,0 +1,300 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+import re
+import threading
+import time
+
+from tempest.common import accounting
+from tempest import exceptions
+
+LOG = logging.getLogger(__name__)
+
+UNITS = {'SECOND': 1, 'MINUTE': 60, 'HOUR': 3600, 'DAY': 86400}
+# longest window of a published limit the client paces its requests by
+MAX_PACED_WINDOW = UNITS['MINUTE']
+
+# fraction of a published rate limit the client allows itself
+HEADROOM = 0.9
+# a bucket halves its rate on every 413, and every request that goes
+# through adds MIN_RATE back, up to the published rate if there is one
+DECREASE_FACTOR = 0.5
+MIN_RATE = 1.0 / 60
+# seconds of past requests the rate of an unpublished limit is guessed from
+OBSERVATION_WINDOW = 60
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+class TokenBucket(object):
+
+    """
+    Token bucket pacing the requests covered by one rate limit
+
+    The bucket holds up to `capacity` tokens and is refilled at `rate`
+    tokens per second, every request takes one. Tokens are reserved
+    rather than waited for under the lock, so a request short of a token
+    goes into debt and is told how long to sleep before it may go out.
+    """
+
+    def __init__(self, rate, capacity=1, tokens=None, ceiling=None):
+        self.rate = float(rate)
+        self.ceiling = ceiling
+        self.capacity = max(capacity, 1)
+        if tokens is None:
+            tokens = self.capacity
+        self.tokens = float(min(tokens, self.capacity))
+        self.updated = time.time()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # updated is in the future while the bucket is paused
+        if now > self.updated:
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self, now=None):
+        """Takes a token, returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.time() if now is None else now
+            self._refill(now)
+            self.tokens -= 1
+            return (max(self.updated - now, 0) +
+                    max(-self.tokens, 0) / self.rate)
+
+    def refund(self):
+        """Gives back the token of a request that did not go out."""
+        with self._lock:
+            self.tokens = min(self.tokens + 1, self.capacity)
+
+    def pause(self, seconds, now=None):
+        """Empties the bucket and holds its refill for `seconds`."""
+        with self._lock:
+            now = time.time() if now is None else now
+            self._refill(now)
+            self.tokens = min(self.tokens, 0)
+            self.updated = max(self.updated, now + seconds)
+
+    def decrease(self):
+        with self._lock:
+            self.rate = max(self.rate * DECREASE_FACTOR, MIN_RATE)
+
+    def increase(self):
+        with self._lock:
+            self.rate += MIN_RATE
+            if self.ceiling is not None:
+                self.rate = min(self.rate, self.ceiling)
+
+
+class RateLimiter(object):
+
+    """
+    Paces the requests of one set of credentials to one endpoint
+
+    Limits are learnt from the 'rate' section of the Compute /limits
+    resource, where each limit applies to the requests of an HTTP verb
+    whose path matches a regular expression. Requests are sent at up to
+    `headroom` times the published rates, in bursts of at most the
+    published number of requests. Limits over longer windows than a minute,
+    such as a daily number of server creations, are only advisory: the
+    cloud counts them per tenant, across all clients, and a client-side
+    bucket would fail requests the cloud would still have accepted.
+
+    When a request is answered by a 413 anyway, because the limits are
+    not published or because other processes use the same credentials,
+    the limits covering it are paused for the Retry-After of the answer
+    and their rate is halved; without any published limit for its verb,
+    a limit is made up from the rate of the recent requests of that verb.
+    Every request that goes through raises the rate of its limits again,
+    so the clients settle just under the limits of the cloud.
+    """
+
+    def __init__(self, headroom=HEADROOM):
+        self.headroom = headroom
+        self._published = []
+        self._adaptive = {}
+        self._history = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def set_rate_limits(self, rate_limits):
+        """
+        Replaces the published limits
+
+        :param rate_limits: the 'rate' list of the /limits resource, of
+                            dicts with a 'regex' and a 'limit' list of
+                            dicts with a 'verb', 'value', 'unit' and
+                            optionally 'remaining'
+        """
+        published = []
+        advisory = 0
+        for rate in rate_limits:
+            regex = re.compile(rate.get('regex') or '.*')
+            for limit in rate.get('limit', []):
+                value = int(limit['value'])
+                seconds = UNITS.get(str(limit['unit']).upper())
+                if not value or seconds is None:
+                    continue
+                if seconds > MAX_PACED_WINDOW:
+                    advisory += 1
+                    continue
+                ceiling = self.headroom * value / seconds
+                remaining = int(limit.get('remaining', value))
+                bucket = TokenBucket(ceiling, capacity=value,
+                                     tokens=remaining, ceiling=ceiling)
+                published.append((limit['verb'].upper(), regex, bucket))
+        with self._lock:
+            self._published = published
+            self._loaded = True
+        LOG.debug("Loaded %d published rate limits, ignored %d advisory "
+                  "ones", len(published), advisory)
+
+    def load_rate_limits(self, fetch):
+        """
+        Feeds the limiter, once, with the limits returned by `fetch`
+
+        `fetch` is only called by the first caller; it returns the 'rate'
+        list of the /limits resource, or None when there is none.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                rate_limits = fetch()
+            except Exception:
+                LOG.exception("Unable to fetch the published rate limits")
+                rate_limits = None
+            if rate_limits is not None:
+                self.set_rate_limits(rate_limits)
+            self._loaded = True
+
+    def _buckets(self, method, path):
+        buckets = [bucket for verb, regex, bucket in self._published
+                   if verb == method and regex.match(path)]
+        if method in self._adaptive:
+            buckets.append(self._adaptive[method])
+        return buckets
+
+    def acquire(self, method, path, max_wait=None):
+        """
+        Waits until the request may go out, returns the seconds waited.
+
+        Raises RateLimitExceeded instead of waiting longer than max_wait.
+        """
+        method = method.upper()
+        now = time.time()
+        with self._lock:
+            history = self._history.setdefault(method, collections.deque())
+            history.append(now)
+            while history[0] < now - OBSERVATION_WINDOW:
+                history.popleft()
+            buckets = self._buckets(method, path)
+        delay = 0
+        for bucket in buckets:
+            delay = max(delay, bucket.reserve(now))
+        if max_wait is not None and delay > max_wait:
+            for bucket in buckets:
+                bucket.refund()
+            raise exceptions.RateLimitExceeded(
+                message="%s %s is rate limited" % (method, path),
+                details="It may not be sent for %.0f seconds" % delay)
+        if delay > 0:
+            LOG.debug("Holding %s %s for %.2f seconds to stay under the "
+                      "rate limits", method, path, delay)
+            with accounting.timed(accounting.RATE_LIMIT, method):
+                time.sleep(delay)
+        return delay
+
+    def succeeded(self, method, path):
+        """Raises the rate of the limits a request went through."""
+        with self._lock:
+            buckets = self._buckets(method.upper(), path)
+        for bucket in buckets:
+            bucket.increase()
+
+    def over_limit(self, method, path, retry_after=None):
+        """
+        Adapts to a 413 answering a request
+
+        :param retry_after: seconds the API asked to wait, if it did;
+                            otherwise the time for the halved limits to
+                            let one request through
+        """
+        method = method.upper()
+        now = time.time()
+        with self._lock:
+            buckets = [bucket for verb, regex, bucket in self._published
+                       if verb == method and regex.match(path)]
+            if not buckets:
+                bucket = self._adaptive.get(method)
+                if bucket is None:
+                    history = self._history.get(method) or [now]
+                    span = max(now - history[0], 1.0)
+                    rate = max(len(history) / span, MIN_RATE)
+                    bucket = TokenBucket(rate)
+                    self._adaptive[method] = bucket
+                buckets = [bucket]
+        for bucket in buckets:
+            bucket.decrease()
+        if retry_after is None:
+            retry_after = max(1 / bucket.rate for bucket in buckets)
+        for bucket in buckets:
+            bucket.pause(retry_after, now)
+        LOG.warning("Rate limited on %s %s, pausing these requests for "
+                    "%.2f seconds", method, path, retry_after)
+        return retry_after
+
+
+class RateLimiterRegistry(object):
+
+    """The rate limiters of a process, one per endpoint and credentials."""
+
+    def __init__(self, headroom=HEADROOM):
+        self.headroom = headroom
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def get_limiter(self, key):
+        """
+        Returns the RateLimiter of the credentials and endpoint in key.
+
+        :param key: hashable tuple of the endpoint URL and credentials
+        """
+        with self._lock:
+            if key not in self._limiters:
+                self._limiters[key] = RateLimiter(self.headroom)
+            return self._limiters[key]
+
+    def clear(self):
+        with self._lock:
+            self._limiters.clear()
+
+
+def get_registry(config):
+    """Returns the rate limiters shared by all clients of the process."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = RateLimiterRegistry(config.compute.rate_limit_headroom)
+        return _registry
@@ -15,16 +15,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import httplib2
 import json
 import logging
 from lxml import etree
 import time
 
+from tempest.common import http
+from tempest.common import polling
+from tempest.common import rate_limit
+from tempest.common import token_cache
+from tempest.common import trace
 from tempest import exceptions
 from tempest.services.compute.xml.common import xml_to_json
 
-# redrive rate limited calls at most twice
+# redrive rate limited calls at most twice, once the rate limiter allows
 MAX_RECURSION_DEPTH = 2
 
 
@@ -51,6 +55,10 @@ class RestClient(object):
                         'Accept': 'application/%s' % self.TYPE}
         self.build_interval = config.compute.build_interval
         self.build_timeout = config.compute.build_timeout
+        self.http_pool = http.get_pool(config)
+        self.trace = trace.get_trace(config)
+        self._rate_limiter = None
+        self._rate_limiter_url = None
         self.general_header_lc = set(('cache-control', 'connection',
                                       'date', 'pragma', 'trailer',
                                       'transfer-encoding', 'via',
@@ -82,6 +90,11 @@ class RestClient(object):
         will fetch a new token and base_url
         """
 
+        if self.strategy == 'keystone' and self.token is not None:
+            token_cache.get_cache().invalidate((self.auth_url, self.user,
+                                                self.password,
+                                                self.tenant_name),
+                                               self.token)
         self.token = None
         self.base_url = None
 
@@ -94,6 +107,22 @@ class RestClient(object):
 
         return self.token
 
+    def get_private_auth(self):
+        """
+        Authenticates again, bypassing the token cache, and returns the new
+        token, which only this client uses. A test revoking the token of its
+        client takes this one, so that the other clients of the same
+        credentials keep their valid cached token.
+        """
+
+        self.get_auth()
+        if self.strategy == 'keystone':
+            self.token = self._keystone_authenticate(self.user,
+                                                     self.password,
+                                                     self.auth_url,
+                                                     self.tenant_name).id
+        return self.token
+
     def basic_auth(self, user, password, auth_url):
         """
         Provides authentication for the target API
@@ -103,8 +132,7 @@ class RestClient(object):
         params['headers'] = {'User-Agent': 'Test-Client', 'X-Auth-User': user,
                              'X-Auth-Key': password}
 
-        self.http_obj = httplib2.Http(disable_ssl_certificate_validation=True)
-        resp, body = self.http_obj.request(auth_url, 'GET', **params)
+        resp, body = self.http_pool.request(auth_url, 'GET', **params)
         try:
             return resp['x-auth-token'], resp['x-server-management-url']
         except Exception:
@@ -113,8 +141,31 @@ class RestClient(object):
     def keystone_auth(self, user, password, auth_url, service, tenant_name):
         """
         Provides authentication via Keystone
+
+        Tokens are shared through the process-wide token cache, so only the
+        first client authenticating with given credentials calls Keystone.
         """
 
+        key = (auth_url, user, password, tenant_name)
+        token = token_cache.get_cache().get_token(
+            key, lambda: self._keystone_authenticate(user, password,
+                                                     auth_url, tenant_name))
+
+        mgmt_url = token.catalog.get_endpoint(service,
+                                              self.region.get(service),
+                                              self.endpoint_url)
+
+        if service == 'network':
+            # Keystone does not return the correct endpoint for
+            # quantum. Handle this separately.
+            mgmt_url = (mgmt_url + self.config.network.api_version +
+                        "/tenants/" + token.tenant_id)
+
+        return token.id, mgmt_url
+
+    def _keystone_authenticate(self, user, password, auth_url, tenant_name):
+        """Requests a new token and service catalog from Keystone."""
+
         creds = {
             'auth': {
                 'passwordCredentials': {
@@ -125,47 +176,59 @@ class RestClient(object):
             }
         }
 
-        self.http_obj = httplib2.Http(disable_ssl_certificate_validation=True)
         headers = {'Content-Type': 'application/json'}
         body = json.dumps(creds)
-        resp, body = self.http_obj.request(auth_url, 'POST',
-                                           headers=headers, body=body)
+        resp, body = self.http_pool.request(auth_url, 'POST',
+                                            headers=headers, body=body)
 
         if resp.status == 200:
             try:
-                auth_data = json.loads(body)['access']
-                token = auth_data['token']['id']
+                return token_cache.Token(json.loads(body)['access'])
             except Exception, e:
                 print "Failed to obtain token for user: %s" % e
                 raise
 
-            mgmt_url = None
-            for ep in auth_data['serviceCatalog']:
-                if ep["type"] == service:
-                    for _ep in ep['endpoints']:
-                        if service in self.region and \
-                                _ep['region'] == self.region[service]:
-                            mgmt_url = _ep[self.endpoint_url]
-                    if not mgmt_url:
-                        mgmt_url = ep['endpoints'][0][self.endpoint_url]
-                    tenant_id = auth_data['token']['tenant']['id']
-                    break
-
-            if mgmt_url is None:
-                raise exceptions.EndpointNotFound(service)
-
-            if service == 'network':
-                # Keystone does not return the correct endpoint for
-                # quantum. Handle this separately.
-                mgmt_url = (mgmt_url + self.config.network.api_version +
-                            "/tenants/" + tenant_id)
-
-            return token, mgmt_url
-
         elif resp.status == 401:
             raise exceptions.AuthenticationFailure(user=user,
                                                    password=password)
 
+        raise exceptions.IdentityError(body)
+
+    def get_rate_limiter(self):
+        """
+        Returns the RateLimiter shared by the clients of the same
+        credentials and endpoint.
+
+        The rate limits published by the Compute API are fetched once,
+        when the first compute client of these credentials needs them.
+        """
+        if (self._rate_limiter is None or
+                self._rate_limiter_url != self.base_url):
+            registry = rate_limit.get_registry(self.config)
+            self._rate_limiter = registry.get_limiter((self.base_url,
+                                                       self.user,
+                                                       self.tenant_name))
+            self._rate_limiter_url = self.base_url
+            if self.service == self.config.compute.catalog_type:
+                self._rate_limiter.load_rate_limits(self._fetch_rate_limits)
+        return self._rate_limiter
+
+    def _fetch_rate_limits(self):
+        """Returns the 'rate' list of the /limits resource, if any."""
+        headers = {'X-Auth-Token': self.token, 'Accept': 'application/json'}
+        resp, body = self.http_pool.request("%s/limits" % self.base_url,
+                                            'GET', headers=headers)
+        if resp.status != 200:
+            return None
+        return json.loads(body)['limits'].get('rate', [])
+
+    def _max_wait(self):
+        """Longest time a request may be held before it is sent."""
+        left = http.time_left()
+        if left is None:
+            return self.build_timeout
+        return min(self.build_timeout, left)
+
     def post(self, url, body, headers):
         return self.request('POST', url, headers, body)
 
@@ -184,11 +247,28 @@ class RestClient(object):
     def copy(self, url, headers=None):
         return self.request('COPY', url, headers)
 
-    def _log(self, req_url, body, resp, resp_body):
-        self.log.error('Request URL: ' + req_url)
-        self.log.error('Request Body: ' + str(body))
-        self.log.error('Response Headers: ' + str(resp))
-        self.log.error('Response Body: ' + str(resp_body))
+    def _send(self, method, req_url, headers, body, **kwargs):
+        """Sends a request over the pool, recording it in the trace."""
+        start = time.time()
+        try:
+            resp, resp_body = self.http_pool.request(req_url, method,
+                                                     headers=headers,
+                                                     body=body, **kwargs)
+        except exceptions.TimeoutException:
+            self.trace.record(method, req_url, body, None, None,
+                              time.time() - start)
+            raise
+        self.trace.record(method, req_url, body, resp, resp_body,
+                          time.time() - start)
+        return resp, resp_body
+
+    def _log(self, method, req_url, resp):
+        """
+        Logs a one line summary of an error response, unless the request
+        trace is reported with test failures, see trace.RequestTracePlugin.
+        """
+        if not trace.is_reported():
+            self.log.error('%s %s -> %s', method, req_url, resp.status)
 
     def _parse_resp(self, body):
         return json.loads(body)
@@ -200,14 +280,14 @@ class RestClient(object):
         if (self.token is None) or (self.base_url is None):
             self._set_auth()
 
-        self.http_obj = httplib2.Http(disable_ssl_certificate_validation=True)
         if headers is None:
             headers = {}
         headers['X-Auth-Token'] = self.token
 
         req_url = "%s/%s" % (self.base_url, url)
-        resp, resp_body = self.http_obj.request(req_url, method,
-                                                headers=headers, body=body)
+        rate_limiter = self.get_rate_limiter()
+        rate_limiter.acquire(method, '/' + url, self._max_wait())
+        resp, resp_body = self._send(method, req_url, headers, body)
 
         #TODO(afazekas): Make sure we can validate all responses, and the
         #http library does not do any action automatically
@@ -240,44 +320,50 @@ class RestClient(object):
         if not body and resp.status >= 400:
             self.log.warning("status >= 400 response with empty body")
 
+        if resp.status >= 400 and not (resp.status == 404 and wait):
+            self._log(method, req_url, resp)
+
         if resp.status == 401 or resp.status == 403:
-            self._log(req_url, body, resp, resp_body)
+            if resp.status == 401:
+                # The token was revoked or has expired, do not let other
+                # clients pick it up from the cache again
+                self.clear_auth()
             raise exceptions.Unauthorized()
 
         if resp.status == 404:
-            if not wait:
-                self._log(req_url, body, resp, resp_body)
             raise exceptions.NotFound(resp_body)
 
         if resp.status == 400:
             resp_body = self._parse_resp(resp_body)
-            self._log(req_url, body, resp, resp_body)
             raise exceptions.BadRequest(resp_body)
 
         if resp.status == 409:
             resp_body = self._parse_resp(resp_body)
-            self._log(req_url, body, resp, resp_body)
             raise exceptions.Duplicate(resp_body)
 
         if resp.status == 413:
             resp_body = self._parse_resp(resp_body)
-            self._log(req_url, body, resp, resp_body)
             if 'overLimit' in resp_body:
                 raise exceptions.OverLimit(resp_body['overLimit']['message'])
-            elif 'exceeded' in resp_body['message']:
+            elif 'exceeded' in resp_body.get('message', ''):
                 raise exceptions.OverLimit(resp_body['message'])
-            elif depth < MAX_RECURSION_DEPTH:
-                delay = resp['Retry-After'] if 'Retry-After' in resp else 60
-                time.sleep(int(delay))
-                return self.request(method, url, headers, body, depth + 1)
-            else:
-                raise exceptions.RateLimitExceeded(
-                    message=resp_body['overLimitFault']['message'],
-                    details=resp_body['overLimitFault']['details'])
+            # The rate limiter pauses this kind of request for the
+            # Retry-After of the API, the retry waits for it to resume
+            # unless that would take longer than a build or the deadline
+            try:
+                retry_after = float(resp['retry-after'])
+            except (KeyError, ValueError):
+                retry_after = None
+            pause = rate_limiter.over_limit(method, '/' + url, retry_after)
+            if depth < MAX_RECURSION_DEPTH and pause <= self._max_wait():
+                return self.request(method, url, headers, body, depth + 1,
+                                    wait)
+            fault = resp_body.get('overLimitFault', resp_body)
+            raise exceptions.RateLimitExceeded(
+                message=fault.get('message'), details=fault.get('details'))
 
         if resp.status in (500, 501):
             resp_body = self._parse_resp(resp_body)
-            self._log(req_url, body, resp, resp_body)
             #I'm seeing both computeFault and cloudServersFault come back.
             #Will file a bug to fix, but leave as is for now.
 
@@ -296,21 +382,73 @@ class RestClient(object):
             raise exceptions.ComputeFault(message)
 
         if resp.status >= 400:
-            resp_body = self._parse_resp(resp_body)
-            self._log(req_url, body, resp, resp_body)
             raise exceptions.TempestException(str(resp.status))
 
+        rate_limiter.succeeded(method, '/' + url)
         return resp, resp_body
 
+    def request_stream(self, method, url, headers=None, body=None,
+                       chunk_size=http.CHUNK_SIZE):
+        """
+        Like request, but returns as soon as the response headers arrive.
+
+        The response body is returned as a ResponseStream yielding chunks
+        of `chunk_size` bytes, so that large bodies are never held in
+        memory at once. Error responses are read fully and raised as the
+        usual exceptions.
+        """
+
+        if (self.token is None) or (self.base_url is None):
+            self._set_auth()
+
+        if headers is None:
+            headers = {}
+        headers['X-Auth-Token'] = self.token
+
+        req_url = "%s/%s" % (self.base_url, url)
+        self.get_rate_limiter().acquire(method, '/' + url, self._max_wait())
+        start = time.time()
+        resp, stream = self.http_pool.open_stream(req_url, method,
+                                                  headers=headers, body=body,
+                                                  chunk_size=chunk_size)
+        if resp.status < 400:
+            self.trace.record(method, req_url, body, resp, None,
+                              time.time() - start)
+            return resp, stream
+
+        resp_body = stream.read()
+        self.trace.record(method, req_url, body, resp, resp_body,
+                          time.time() - start)
+        self._log(method, req_url, resp)
+        if resp.status == 401:
+            self.clear_auth()
+        if resp.status == 401 or resp.status == 403:
+            raise exceptions.Unauthorized()
+        if resp.status == 404:
+            raise exceptions.NotFound(resp_body)
+        raise exceptions.TempestException(str(resp.status), resp_body)
+
+    def get_poller(self, timeout=None):
+        """
+        Returns a Poller pacing a status check loop of this client.
+
+        Checks back off from a fast first probe up to build_interval, the
+        loop times out after build_timeout unless told otherwise.
+        """
+        if timeout is None:
+            timeout = self.build_timeout
+        policy = polling.BackoffPolicy.from_config(self.config,
+                                                   self.build_interval)
+        return polling.Poller(timeout, policy)
+
     def wait_for_resource_deletion(self, id):
         """Waits for a resource to be deleted."""
-        start_time = int(time.time())
-        while True:
-            if self.is_resource_deleted(id):
-                return
-            if int(time.time()) - start_time >= self.build_timeout:
-                raise exceptions.TimeoutException
-            time.sleep(self.build_interval)
+        poller = self.get_poller()
+        with poller.deadline():
+            for elapsed in poller:
+                if self.is_resource_deleted(id):
+                    return
+        raise exceptions.TimeoutException
 
     def is_resource_deleted(self, id):
         """
@@ -17,11 +17,14 @@
 
 
 from cStringIO import StringIO
+import logging
 import select
 import socket
+import threading
 import time
 import warnings
 
+from tempest.common import accounting
 from tempest import exceptions
 
 
@@ -30,9 +33,33 @@ with warnings.catch_warnings():
     import paramiko
     from paramiko import RSAKey
 
+LOG = logging.getLogger(__name__)
+
+# Authenticated connections shared by all the Clients of the process,
+# keyed by host and credentials
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def close_connections():
+    """Closes every cached ssh connection, e.g. at test class teardown."""
+    with _connections_lock:
+        connections = _connections.values()
+        _connections.clear()
+    for ssh in connections:
+        ssh.close()
+
 
 class Client(object):
 
+    """
+    Runs commands on a host over ssh
+
+    Connections are cached per host and credentials and shared by every
+    Client, so consecutive commands reuse one authenticated transport.
+    Call close_connections() once the host is no longer needed.
+    """
+
     def __init__(self, host, username, password=None, timeout=300, pkey=None,
                  channel_timeout=10, look_for_keys=False, key_filename=None):
         self.host = host
@@ -75,22 +102,78 @@ class Client(object):
                                         password=self.password)
         return ssh
 
+    def _get_key(self):
+        fingerprint = self.pkey.get_fingerprint() if self.pkey else None
+        return (self.host, self.username, self.password, fingerprint,
+                self.key_filename, self.look_for_keys)
+
+    def _is_healthy(self, ssh):
+        transport = ssh.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except (EOFError, paramiko.SSHException, socket.error):
+            return False
+        return True
+
+    def _get_cached_connection(self):
+        """
+        Returns the cached connection for this host and credentials if it
+        is still alive, or a new one which replaces it in the cache.
+        """
+        key = self._get_key()
+        with _connections_lock:
+            ssh = _connections.get(key)
+        if ssh is not None:
+            if self._is_healthy(ssh):
+                return ssh
+            self._discard(ssh)
+        ssh = self._get_ssh_connection()
+        with _connections_lock:
+            _connections[key] = ssh
+        return ssh
+
+    def _discard(self, ssh):
+        with _connections_lock:
+            if _connections.get(self._get_key()) is ssh:
+                del _connections[self._get_key()]
+        ssh.close()
+
+    def _open_session(self):
+        """
+        Opens a channel on the cached connection. A connection which died
+        since its last health check (e.g. the server rebooted) is replaced
+        by a new one.
+        """
+        ssh = self._get_cached_connection()
+        try:
+            return ssh.get_transport().open_session()
+        except (EOFError, paramiko.SSHException, socket.error):
+            LOG.debug("Cached ssh connection to %s@%s is dead, reconnecting",
+                      self.username, self.host)
+            self._discard(ssh)
+        return self._get_cached_connection().get_transport().open_session()
+
     def _is_timed_out(self, timeout, start_time):
         return (time.time() - timeout) > start_time
 
     def connect_until_closed(self):
         """Connect to the server and wait until connection is lost."""
-        try:
-            ssh = self._get_ssh_connection()
-            _transport = ssh.get_transport()
-            _start_time = time.time()
-            _timed_out = self._is_timed_out(self.timeout, _start_time)
-            while _transport.is_active() and not _timed_out:
-                time.sleep(5)
+        with accounting.timed(accounting.SSH, self.host):
+            try:
+                ssh = self._get_ssh_connection()
+                _transport = ssh.get_transport()
+                _start_time = time.time()
                 _timed_out = self._is_timed_out(self.timeout, _start_time)
-            ssh.close()
-        except (EOFError, paramiko.AuthenticationException, socket.error):
-            return
+                while _transport.is_active() and not _timed_out:
+                    time.sleep(5)
+                    _timed_out = self._is_timed_out(self.timeout,
+                                                    _start_time)
+                ssh.close()
+            except (EOFError, paramiko.AuthenticationException,
+                    socket.error):
+                return
 
     def exec_command(self, cmd):
         """
@@ -103,9 +186,13 @@ class Client(object):
         :raises: SSHExecCommandFailed if command returns nonzero
                  status. The exception contains command status stderr content.
         """
-        ssh = self._get_ssh_connection()
-        transport = ssh.get_transport()
-        channel = transport.open_session()
+        with accounting.timed(accounting.SSH, self.host) as counts:
+            output = self._exec_command(cmd)
+            counts.received = len(output)
+        return output
+
+    def _exec_command(self, cmd):
+        channel = self._open_session()
         channel.exec_command(cmd)
         channel.shutdown_write()
         out_data = []
@@ -137,11 +224,22 @@ class Client(object):
         return ''.join(out_data)
 
     def test_connection_auth(self):
-        """Returns true if ssh can connect to server."""
+        """
+        Returns true if ssh can connect to server. The credentials are
+        always checked on a new connection, never on a cached transport
+        which authenticated earlier.
+        """
         try:
-            connection = self._get_ssh_connection()
-            connection.close()
+            with accounting.timed(accounting.SSH, self.host):
+                self._get_ssh_connection().close()
         except paramiko.AuthenticationException:
             return False
 
         return True
+
+    def close(self):
+        """Closes the cached connection for this host and credentials."""
+        with _connections_lock:
+            ssh = _connections.pop(self._get_key(), None)
+        if ssh is not None:
+            ssh.close()
@@ -0,0 +1,252 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+"""
+Dependency-aware parallel resource cleanup
+
+Test classes used to delete their resources one at a time, in reverse
+order of creation, waiting for every deletion to complete before
+starting the next one. A CleanUpGraph instead only orders the cleanups
+that depend on each other - an instance before its volume, a floating IP
+before its server, a subnet before its router - and runs all the others
+concurrently, so that a teardown takes as long as its longest chain of
+dependent deletions rather than the sum of all of them.
+"""
+
+import collections
+import logging
+from multiprocessing.pool import ThreadPool
+import Queue
+import time
+
+from tempest.common import concurrency
+from tempest import exceptions
+
+LOG = logging.getLogger(__name__)
+
+THREADS = 8
+# How long, and how often, the completion of a deletion is checked
+CHECK_TIMEOUT = 60
+CHECK_INTERVAL = 1
+# Longest single wait for a cleanup to end: on Python 2 a Queue.get
+# without timeout cannot be interrupted, not even by Ctrl-C
+WAIT_SLICE = 1
+
+
+def _get(results, timeout=None):
+    """
+    Queue.get in slices of at most WAIT_SLICE seconds, so that it stays
+    interruptible. Raises Queue.Empty after `timeout` seconds, if not None.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        wait = WAIT_SLICE
+        if deadline is not None:
+            wait = min(wait, max(deadline - time.time(), 0))
+        try:
+            return results.get(timeout=wait)
+        except Queue.Empty:
+            if deadline is not None and time.time() >= deadline:
+                raise
+
+
+def _find_cycle(pending, done):
+    """
+    Returns the keys of a dependency cycle among the `pending` cleanups,
+    given that every one of them waits for another one.
+    """
+    key = next(reversed(pending))
+    path = []
+    while key not in path:
+        path.append(key)
+        key = next(iter(pending[key] - done))
+    return path[path.index(key):]
+
+
+class _CleanUp(object):
+
+    def __init__(self, key, function, args, kwargs, check):
+        self.key = key
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.check = check
+        # keys of the cleanups which have to be complete first
+        self.after = set()
+
+    def __str__(self):
+        return '%s (%s)' % (self.key, getattr(self.function, '__name__',
+                                              self.function))
+
+
+class CleanUpGraph(object):
+
+    """
+    Cleanup calls and the order they depend on
+
+    Every cleanup is a `function(*args, **kwargs)` call, optionally
+    followed by a `check()` telling whether the deletion it started has
+    completed. A cleanup only starts once every cleanup it was added
+    `after` has completed, including its check; cleanups without
+    dependencies between them run concurrently. The checks of all
+    deletions in progress are polled together, once per interval.
+
+    A cleanup which fails or times out does not hold back the ones
+    depending on it: teardown goes on as far as it can.
+    """
+
+    def __init__(self):
+        self._cleanups = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._cleanups)
+
+    def __contains__(self, key):
+        return key in self._cleanups
+
+    def add(self, key, function, args=(), kwargs=None, check=None,
+            after=(), before=()):
+        """
+        Adds a cleanup.
+
+        :param after: keys of the cleanups to complete before this one
+        :param before: keys of the cleanups to start only once this one
+                       completed
+        """
+        cleanup = _CleanUp(key, function, tuple(args), kwargs or {}, check)
+        cleanup.after.update(after)
+        self._cleanups[key] = cleanup
+        for other in before:
+            self.add_dependency(other, key)
+        return key
+
+    def add_dependency(self, key, after):
+        """Makes the cleanup `key` wait for the completion of `after`."""
+        self._cleanups[key].after.add(after)
+
+    def cancel(self, key):
+        """Removes a cleanup, the ones depending on it no longer wait."""
+        del self._cleanups[key]
+
+    def keys(self):
+        return self._cleanups.keys()
+
+    def run(self, threads=THREADS, check_timeout=CHECK_TIMEOUT,
+            check_interval=CHECK_INTERVAL):
+        """
+        Runs all the cleanups from a pool of `threads` threads, emptying
+        the graph.
+
+        Checks not reporting completion within `check_timeout` seconds are
+        given up on with a warning, like a failure they do not hold back
+        the cleanups depending on them.
+
+        :returns: a list of (key, exception) tuples for the failed cleanups
+        """
+        cleanups, self._cleanups = self._cleanups, collections.OrderedDict()
+        pending = collections.OrderedDict(
+            (key, cleanup.after & set(cleanups))
+            for key, cleanup in cleanups.items())
+        done = set()
+        failures = []
+        checking = {}
+        running = set()
+        results = Queue.Queue()
+        workers = ThreadPool(max(threads, 1))
+
+        def call(cleanup):
+            try:
+                LOG.debug("Cleaning up %s", cleanup)
+                cleanup.function(*cleanup.args, **cleanup.kwargs)
+            except BaseException as exc:
+                LOG.exception("Cleanup of %s failed", cleanup)
+                results.put((cleanup.key, exc))
+            else:
+                results.put((cleanup.key, None))
+
+        def finish(key, exc=None):
+            done.add(key)
+            if exc is not None:
+                failures.append((key, exc))
+
+        next_check = 0
+        try:
+            while pending or running or checking:
+                ready = [key for key, after in pending.items()
+                         if not after - done]
+                if not ready and not running and not checking:
+                    # a dependency cycle, start its latest added cleanup
+                    cycle = _find_cycle(pending, done)
+                    ready = [key for key in reversed(pending)
+                             if key in cycle][:1]
+                    LOG.warning("Cleanup dependency cycle among %s",
+                                ', '.join(map(str, cycle)))
+                for key in ready:
+                    del pending[key]
+                    running.add(key)
+                    workers.apply_async(call, (cleanups[key],))
+
+                try:
+                    timeout = None
+                    if checking:
+                        timeout = max(next_check - time.time(), 0)
+                    key, exc = _get(results, timeout)
+                except Queue.Empty:
+                    pass
+                else:
+                    running.discard(key)
+                    if exc is None and cleanups[key].check is not None:
+                        checking[key] = time.time() + check_timeout
+                        next_check = min(next_check or time.time(),
+                                         time.time() + check_interval)
+                    else:
+                        finish(key, exc)
+                    continue
+
+                keys = list(checking)
+                outcome = concurrency.run_concurrently(
+                    lambda key: cleanups[key].check(), keys, threads)
+                now = time.time()
+                for key, (complete, exc) in zip(keys, outcome):
+                    if exc is not None or complete:
+                        del checking[key]
+                        finish(key, exc)
+                    elif now >= checking[key]:
+                        del checking[key]
+                        LOG.warning("Deletion of %s not complete after %s "
+                                    "seconds, going on", cleanups[key],
+                                    check_timeout)
+                        finish(key)
+                next_check = now + check_interval
+        except BaseException:
+            # e.g. Ctrl-C, leave the cleanups in progress to the daemon
+            # threads of the pool instead of waiting for them
+            workers.close()
+            raise
+        workers.close()
+        workers.join()
+        return failures
+
+
+def raise_failures(failures):
+    """Raises TearDownException for a list of cleanup failures, the first
+    one alone is re-raised as is."""
+    if len(failures) == 1:
+        raise failures[0][1]
+    if failures:
+        raise exceptions.TearDownException(num=len(failures))
@@ -0,0 +1,159 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import calendar
+import logging
+import threading
+import time
+
+from tempest import exceptions
+
+LOG = logging.getLogger(__name__)
+
+# tokens this close to their expiry are treated as already expired
+EXPIRY_MARGIN = 60
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def parse_expiry(expires):
+    """Converts a Keystone 'expires' timestamp into seconds since epoch."""
+    if not expires:
+        return None
+    # Drop fractional seconds and the timezone suffix, Keystone always
+    # reports UTC, e.g. 2013-02-27T18:30:59.999999Z
+    expires = expires[:19]
+    try:
+        return calendar.timegm(time.strptime(expires, '%Y-%m-%dT%H:%M:%S'))
+    except ValueError:
+        LOG.warning("Unable to parse token expiry time %s", expires)
+        return None
+
+
+class ServiceCatalog(object):
+
+    """
+    Indexed copy of a Keystone v2 service catalog
+
+    Endpoints are grouped by service type once, and every resolved
+    (service, region, endpoint type) lookup is memoized.
+    """
+
+    def __init__(self, catalog):
+        self._services = {}
+        for service in catalog:
+            # The first entry of a given type wins, as it always has
+            self._services.setdefault(service['type'], service['endpoints'])
+        self._endpoints = {}
+
+    def get_endpoint(self, service, region=None, endpoint_type='publicURL'):
+        key = (service, region, endpoint_type)
+        if key not in self._endpoints:
+            endpoints = self._services.get(service)
+            if not endpoints:
+                raise exceptions.EndpointNotFound(service)
+            url = None
+            if region is not None:
+                for endpoint in endpoints:
+                    if endpoint.get('region') == region:
+                        url = endpoint[endpoint_type]
+            if not url:
+                url = endpoints[0][endpoint_type]
+            self._endpoints[key] = url
+        return self._endpoints[key]
+
+
+class Token(object):
+
+    """A Keystone token together with the catalog it was issued with."""
+
+    def __init__(self, access):
+        token = access['token']
+        self.id = token['id']
+        self.tenant_id = token.get('tenant', {}).get('id')
+        self.expires = parse_expiry(token.get('expires'))
+        self.catalog = ServiceCatalog(access.get('serviceCatalog', []))
+
+    def is_expired(self, margin=EXPIRY_MARGIN):
+        if self.expires is None:
+            return False
+        return time.time() + margin >= self.expires
+
+
+class TokenCache(object):
+
+    """
+    Process-wide, expiry-aware cache of Keystone tokens
+
+    Tokens are keyed by credentials, so every client built for the same
+    user and tenant shares a single authentication. Concurrent lookups of
+    the same credentials wait for one another instead of all calling
+    Keystone at once.
+    """
+
+    def __init__(self, expiry_margin=EXPIRY_MARGIN):
+        self.expiry_margin = expiry_margin
+        self._tokens = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _get_lock(self, key):
+        with self._lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def get_token(self, key, authenticate):
+        """
+        Returns a valid Token for the credentials in key.
+
+        :param key: hashable tuple identifying the credentials
+        :param authenticate: callable returning a new Token, only called
+                             when no unexpired token is cached for key
+        """
+        with self._get_lock(key):
+            token = self._tokens.get(key)
+            if token is None or token.is_expired(self.expiry_margin):
+                token = authenticate()
+                self._tokens[key] = token
+            return token
+
+    def invalidate(self, key, token_id=None):
+        """
+        Drops the cached token, the next lookup re-authenticates.
+
+        :param token_id: only drop the cached token if it is this one, and
+                         not a newer token another client already got
+        """
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is not None and token_id in (None, token.id):
+                del self._tokens[key]
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+def get_cache():
+    """Returns the token cache shared by all clients of the process."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TokenCache()
+        return _cache
@@ -0,0 +1,187 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import inspect
+import mmap
+import os
+import threading
+import time
+
+# number of recent requests kept, and bytes kept of each of their bodies
+SIZE = 32
+BODY_SIZE = 2048
+
+_trace = None
+_trace_lock = threading.Lock()
+
+# whether the test runner reports the trace with test errors and failures
+_reported = False
+
+
+def _cap(body, size):
+    """Returns the first `size` bytes of a body and its full length."""
+    if body is None:
+        return None, 0
+    if isinstance(body, (basestring, buffer, mmap.mmap)):
+        return body[:size], len(body)
+    # a file object or iterable streamed as the body, left untouched
+    return '<%s>' % type(body).__name__, None
+
+
+def _safe_str(value):
+    if isinstance(value, unicode):
+        return value.encode('utf-8', 'replace')
+    return str(value)
+
+
+class RequestTrace(object):
+
+    """
+    Ring buffer of the most recent API requests of the process
+
+    Recording a request only keeps the first `body_size` bytes of its
+    bodies, nothing is formatted until the trace is dumped, so tracing
+    every request costs next to nothing. The trace is meant to be dumped
+    when a test fails, see RequestTracePlugin; without the plugin the
+    clients log a one line summary of every error response instead.
+    """
+
+    def __init__(self, size=SIZE, body_size=BODY_SIZE):
+        self.body_size = body_size
+        self._records = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, method, url, body, resp, resp_body, elapsed):
+        """
+        Adds a request to the trace.
+
+        :param resp: the response, a dict of its headers with a status,
+                     None if there was none
+        :param resp_body: the response body as received, a string or None
+                          when it is streamed
+        """
+        entry = (time.time(), threading.current_thread().name, method, url,
+                 _cap(body, self.body_size), resp,
+                 _cap(resp_body, self.body_size), elapsed)
+        with self._lock:
+            self._records.append(entry)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def format(self):
+        """Returns the recorded requests as lines of text, oldest first."""
+        with self._lock:
+            records = list(self._records)
+        lines = []
+        for (timestamp, thread, method, url, body, resp, resp_body,
+             elapsed) in records:
+            lines.append('%s.%03d [%s] %s %s -> %s (%.3f s)' % (
+                time.strftime('%H:%M:%S', time.localtime(timestamp)),
+                timestamp % 1 * 1000, thread, method, url,
+                getattr(resp, 'status', '-'), elapsed))
+            lines.extend(self._format_body('Request body', body))
+            if resp is None:
+                lines.append('  No response')
+                continue
+            headers = dict((name, value) for name, value in resp.items()
+                           if name not in ('status', 'content-location'))
+            lines.append('  Response headers: %s' % headers)
+            lines.extend(self._format_body('Response body', resp_body))
+        return lines
+
+    def _format_body(self, title, capped):
+        body, length = capped
+        if body is None or length == 0:
+            return []
+        if length is not None and length > len(body):
+            title += ' (first %d of %d bytes)' % (len(body), length)
+        return ['  %s: %s' % (title, _safe_str(body))]
+
+
+def get_trace(config):
+    """Returns the request trace shared by all clients of the process."""
+    global _trace
+    with _trace_lock:
+        if _trace is None:
+            _trace = RequestTrace(config.compute.request_trace_size,
+                                  config.compute.request_trace_body_size)
+        return _trace
+
+
+def is_reported():
+    """
+    Returns whether the trace is reported along with test errors and
+    failures, i.e. whether the request-trace nose plugin is enabled.
+    """
+    return _reported
+
+
+class RequestTracePlugin(object):
+
+    """
+    Adds the trace of the recent API requests to the details of every
+    test error and failure
+
+    The trace is cleared whenever a test class starts, so it holds the
+    requests of the failing class, set up included, up to its size.
+    Enable with --with-request-trace or NOSE_WITH_REQUEST_TRACE=1.
+
+    The plugin implements the nose plugin interface without subclassing
+    nose.plugins.Plugin, so that the clients do not depend on nose.
+    """
+
+    name = 'request-trace'
+    enabled = False
+    score = 100
+
+    def addOptions(self, parser, env=None):
+        if env is None:
+            env = os.environ
+        parser.add_option('--with-request-trace', action='store_true',
+                          dest='with_request_trace',
+                          default=env.get('NOSE_WITH_REQUEST_TRACE'),
+                          help="Enable plugin RequestTracePlugin: report "
+                               "the recent API requests with test errors "
+                               "and failures [NOSE_WITH_REQUEST_TRACE]")
+
+    def configure(self, options, conf):
+        global _reported
+        self.enabled = bool(getattr(options, 'with_request_trace', False))
+        _reported = self.enabled
+
+    def startContext(self, context):
+        if _trace is not None and inspect.isclass(context):
+            _trace.clear()
+
+    def formatError(self, test, err):
+        from nose import util
+
+        if _trace is None:
+            return err
+        lines = _trace.format()
+        if not lines:
+            return err
+        ec, ev, tb = err
+        return (ec, '\n'.join([util.safe_str(ev),
+                               util.ln('>> begin request trace <<')] +
+                              lines +
+                              [util.ln('>> end request trace <<')]), tb)
+
+    formatFailure = formatError
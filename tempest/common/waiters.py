@@ -0,0 +1,133 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import functools
+import logging
+
+from tempest import exceptions
+
+LOG = logging.getLogger(__name__)
+
+# Largest page Nova returns by default (osapi_max_limit)
+SERVERS_PAGE_SIZE = 1000
+
+
+def with_deadline(func):
+    """
+    Decorates a waiter method of a REST client, so that no request it
+    sends blocks past the timeout of the client's poller.
+    """
+    @functools.wraps(func)
+    def wrapper(client, *args, **kwargs):
+        with client.get_poller().deadline():
+            return func(client, *args, **kwargs)
+    return wrapper
+
+
+def iter_servers(client, params=None, page_size=SERVERS_PAGE_SIZE):
+    """
+    Yields the servers of servers/detail, following the pagination.
+
+    Further pages are only requested as the iteration goes on, so callers
+    that stop early save the remaining requests.
+    """
+    params = dict(params or {})
+    params['limit'] = page_size
+    while True:
+        resp, body = client.list_servers_with_detail(params)
+        servers = [s for s in body['servers'] if s.get('id')]
+        for server in servers:
+            yield server
+        if len(servers) < page_size:
+            return
+        params['marker'] = servers[-1]['id']
+
+
+def _list_pending_servers(client, pending, params=None,
+                          page_size=SERVERS_PAGE_SIZE):
+    """
+    Pages through servers/detail until every pending server has been seen.
+
+    Returns a dict of server id to server details for the pending servers
+    present in the listing.
+    """
+    found = {}
+    for server in iter_servers(client, params, page_size):
+        if server['id'] in pending:
+            found[server['id']] = server
+            if len(found) == len(pending):
+                break
+    return found
+
+
+def wait_for_servers_status(client, server_ids, status, params=None):
+    """
+    Waits for all the given servers to reach a given status.
+
+    Every polling interval costs a single (paginated) servers/detail request
+    whatever the number of servers, and all servers share one timeout.
+
+    :param client: a JSON or XML servers client
+    :param server_ids: ids of the servers to wait for
+    :param status: the expected status, e.g. 'ACTIVE'
+    :param params: optional servers/detail filters narrowing the listing
+    :returns: dict of server id to the server details in the given status
+    :raises: BuildErrorException naming every server that went to ERROR,
+             TimeoutException naming every server still pending
+    """
+    pending = set(server_ids)
+    done = {}
+    errors = {}
+    statuses = {}
+    poller = client.get_poller()
+
+    with poller.deadline():
+        while True:
+            found = _list_pending_servers(client, pending, params)
+            for server_id, server in found.items():
+                statuses[server_id] = server['status']
+                if server['status'] == status:
+                    done[server_id] = server
+                    pending.discard(server_id)
+                elif server['status'] == 'ERROR':
+                    errors[server_id] = server
+                    pending.discard(server_id)
+
+            if not pending:
+                break
+
+            if poller.expired():
+                current = ', '.join(
+                    '%s: %s' % (server_id, statuses.get(server_id, 'UNKNOWN'))
+                    for server_id in sorted(pending))
+                message = ('Servers failed to reach %s status within the '
+                           'required time (%s s). Current status: %s.' %
+                           (status, client.build_timeout, current))
+                if errors:
+                    message += (' Servers in ERROR: %s.' %
+                                ', '.join(sorted(errors)))
+                raise exceptions.TimeoutException(message)
+
+            LOG.debug("Waiting for %d server(s) to reach %s status",
+                      len(pending), status)
+            poller.sleep()
+
+    if errors:
+        raise exceptions.BuildErrorException(
+            server_id=', '.join(sorted(errors)))
+    return done
+
@@ -114,6 +114,12 @@ ComputeGroup = [
                      "instead of failing because of the conflict. Note that "
                      "this would result in the tenant being deleted at the "
                      "end of a subsequent successful run."),
+    cfg.IntOpt('isolated_creds_pool_size',
+               default=4,
+               help="If allow_tenant_isolation is True, number of isolated "
+                    "tenant/user pairs created concurrently at the start "
+                    "of the run and leased to the test classes. More are "
+                    "created on demand if they run out."),
     cfg.StrOpt('username',
                default='demo',
                help="Username to use for Nova API requests."),
@@ -175,6 +181,20 @@ ComputeGroup = [
     cfg.IntOpt('build_timeout',
                default=300,
                help="Timeout in seconds to wait for an instance to build."),
+    cfg.FloatOpt('poll_initial_interval',
+                 default=0.5,
+                 help="Time in seconds before the second status check of a "
+                      "waiter. Later checks back off exponentially up to "
+                      "the build_interval of the waiting client."),
+    cfg.FloatOpt('poll_backoff_factor',
+                 default=2.0,
+                 help="Factor by which the interval between two status "
+                      "checks grows."),
+    cfg.FloatOpt('poll_jitter',
+                 default=0.1,
+                 help="Fraction of each status check interval randomly "
+                      "removed so that parallel waiters do not poll in "
+                      "lockstep."),
     cfg.BoolOpt('run_ssh',
                 default=False,
                 help="Does the test environment support snapshots?"),
@@ -197,6 +217,43 @@ ComputeGroup = [
     cfg.StrOpt('log_level',
                default="ERROR",
                help="Level for logging compute API calls."),
+    cfg.IntOpt('http_pool_maxsize',
+               default=10,
+               help="Maximum number of concurrent keep-alive connections "
+                    "kept open to a single API endpoint."),
+    cfg.IntOpt('http_pool_idle_timeout',
+               default=60,
+               help="Time in seconds after which an unused pooled API "
+                    "connection is closed."),
+    cfg.FloatOpt('http_connect_timeout',
+                 default=10,
+                 help="Time in seconds after which establishing a "
+                      "connection to an API endpoint times out."),
+    cfg.FloatOpt('http_read_timeout',
+                 default=120,
+                 help="Time in seconds after which waiting for an API "
+                      "response, or for the next part of it, times out."),
+    cfg.IntOpt('request_trace_size',
+               default=32,
+               help="Number of recent API requests reported with a test "
+                    "error or failure."),
+    cfg.IntOpt('request_trace_body_size',
+               default=2048,
+               help="Number of bytes of every request and response body "
+                    "kept in the request trace."),
+    cfg.FloatOpt('rate_limit_headroom',
+                 default=0.9,
+                 help="Fraction of the rate limits published by the "
+                      "Compute API at which Tempest paces the requests of "
+                      "one user."),
+    cfg.IntOpt('keypair_pool_size',
+               default=4,
+               help="Number of RSA keys generated ahead of demand, in "
+                    "background processes, for the key pairs Tempest "
+                    "imports. 0 generates them only when needed."),
+    cfg.IntOpt('keypair_bits',
+               default=2048,
+               help="Size in bits of the locally generated RSA keys."),
     cfg.BoolOpt('whitebox_enabled',
                 default=False,
                 help="Does the test environment support whitebox tests for "
@@ -392,6 +449,15 @@ ObjectStoreConfig = [
     cfg.StrOpt('region',
                default=None,
                help='The object-store region name to use.'),
+    cfg.IntOpt('segment_size',
+               default=10 * 1024 * 1024,
+               help="Size in bytes of the segments large objects are "
+                    "uploaded in, and of the ranges they are downloaded "
+                    "in."),
+    cfg.IntOpt('concurrency',
+               default=8,
+               help="Number of concurrent requests of the segmented and "
+                    "bulk object storage operations."),
 ]
 
 
@@ -78,6 +78,11 @@ class VolumeBuildErrorException(TempestException):
     message = "Volume %(volume_id)s failed to build and is in ERROR status"
 
 
+class ChecksumMismatch(TempestException):
+    message = ("Checksum of %(url)s is %(actual)s, "
+               "expected %(expected)s")
+
+
 class BadRequest(TempestException):
     message = "Bad request"
 
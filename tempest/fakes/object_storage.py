@@ -0,0 +1,389 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+In-memory stand-in for the Swift API
+
+Covers what the object storage clients use: account, container and object
+metadata, JSON and plain text listings with marker, end_marker, limit,
+prefix and delimiter, ranged GETs, server side copies and
+X-Object-Manifest large objects. Every tenant gets its own account; data
+is lost when the application goes away.
+"""
+
+import email.utils
+import hashlib
+import json
+import re
+import threading
+import time
+import urllib
+import urlparse
+
+from tempest.fakes import server
+
+LISTING_LIMIT = 10000
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _meta_headers(environ, prefix):
+    """Returns the `prefix` headers of a request, as sent."""
+    env_prefix = 'HTTP_' + prefix.upper().replace('-', '_')
+    headers = {}
+    for key, value in environ.items():
+        if key.startswith(env_prefix):
+            name = key[len(env_prefix):].replace('_', '-').lower()
+            headers[name] = value
+    return headers
+
+
+def _update_meta(meta, environ, kind):
+    meta.update(_meta_headers(environ, 'X-%s-Meta-' % kind))
+    for name in _meta_headers(environ, 'X-Remove-%s-Meta-' % kind):
+        meta.pop(name, None)
+    for name, value in meta.items():
+        if not value:
+            del meta[name]
+
+
+def _meta_response(meta, kind):
+    return dict(('X-%s-Meta-%s' % (kind, name.title()), value)
+                for name, value in meta.items())
+
+
+class _Object(object):
+
+    def __init__(self, data, content_type, meta, manifest=None):
+        self.data = data
+        self.etag = hashlib.md5(data).hexdigest()
+        self.content_type = content_type
+        self.meta = meta
+        self.manifest = manifest
+        self.timestamp = time.time()
+
+    def listing(self, name):
+        return {'name': name,
+                'hash': self.etag,
+                'bytes': len(self.data),
+                'content_type': self.content_type,
+                'last_modified': time.strftime(
+                    '%Y-%m-%dT%H:%M:%S', time.gmtime(self.timestamp))}
+
+
+class _Container(object):
+
+    def __init__(self):
+        self.meta = {}
+        self.objects = {}
+
+    def usage(self):
+        return sum(len(obj.data) for obj in self.objects.values())
+
+
+class _Account(object):
+
+    def __init__(self):
+        self.meta = {}
+        self.containers = {}
+
+
+def _list(names, params):
+    """Applies the listing query parameters to the sorted `names`, returns
+    the (name, is_subdir) tuples of the page."""
+    prefix = params.get('prefix', '')
+    delimiter = params.get('delimiter')
+    marker = params.get('marker', '')
+    end_marker = params.get('end_marker')
+    limit = min(int(params.get('limit', LISTING_LIMIT)), LISTING_LIMIT)
+    page = []
+    for name in sorted(names):
+        if len(page) >= limit:
+            break
+        if name <= marker or not name.startswith(prefix):
+            continue
+        if end_marker and name >= end_marker:
+            break
+        if delimiter:
+            index = name.find(delimiter, len(prefix))
+            if index >= 0:
+                subdir = name[:index + len(delimiter)]
+                if subdir > marker and (not page or page[-1][0] != subdir):
+                    page.append((subdir, True))
+                continue
+        page.append((name, False))
+    return page
+
+
+class FakeObjectStorage(object):
+
+    """
+    WSGI application of the fake object storage service
+
+    Mount it on an endpoint of the form /v1/AUTH_%(tenant_id)s; every
+    request is delayed by `latency` seconds to mimic a remote cluster.
+    """
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self._accounts = {}
+        self._lock = threading.RLock()
+
+    def __call__(self, environ, start_response):
+        if self.latency:
+            time.sleep(self.latency)
+        if not environ.get('HTTP_X_AUTH_TOKEN'):
+            return server.respond(start_response, 401)
+        path = urllib.unquote(environ['PATH_INFO'])
+        parts = path.lstrip('/').split('/', 2)
+        if not parts[0]:
+            return server.respond(start_response, 404)
+        method = environ['REQUEST_METHOD']
+        params = dict(urlparse.parse_qsl(environ.get('QUERY_STRING', '')))
+        with self._lock:
+            account = self._accounts.setdefault(parts[0], _Account())
+        if len(parts) == 1 or not parts[1]:
+            handler = getattr(self, '_account_%s' % method, None)
+            args = (account,)
+        elif len(parts) == 2 or not parts[2]:
+            handler = getattr(self, '_container_%s' % method, None)
+            args = (account, parts[1])
+        else:
+            handler = getattr(self, '_object_%s' % method, None)
+            args = (account, parts[1], parts[2])
+        if handler is None:
+            return server.respond(start_response, 405)
+        status, body, headers = handler(environ, params, *args)
+        if method == 'HEAD':
+            return server.respond(start_response, status, '', headers,
+                                  content_length=len(body))
+        return server.respond(start_response, status, body, headers)
+
+    def _listing(self, params, entries, names, headers):
+        page = _list(names, params)
+        if not page:
+            return 204, '', headers
+        if params.get('format') == 'json':
+            body = [{'subdir': name} if is_subdir else entries(name)
+                    for name, is_subdir in page]
+            headers['Content-Type'] = 'application/json; charset=utf-8'
+            return 200, json.dumps(body), headers
+        headers['Content-Type'] = 'text/plain; charset=utf-8'
+        return 200, ''.join(name + '\n' for name, is_subdir in page), headers
+
+    # Accounts
+
+    def _account_headers(self, account):
+        headers = _meta_response(account.meta, 'Account')
+        containers = account.containers.values()
+        headers['X-Account-Container-Count'] = str(len(containers))
+        headers['X-Account-Object-Count'] = str(
+            sum(len(container.objects) for container in containers))
+        headers['X-Account-Bytes-Used'] = str(
+            sum(container.usage() for container in containers))
+        return headers
+
+    def _account_GET(self, environ, params, account):
+        with self._lock:
+            headers = self._account_headers(account)
+
+            def entries(name):
+                container = account.containers[name]
+                return {'name': name,
+                        'count': len(container.objects),
+                        'bytes': container.usage()}
+
+            return self._listing(params, entries, account.containers,
+                                 headers)
+
+    def _account_HEAD(self, environ, params, account):
+        with self._lock:
+            return 204, '', self._account_headers(account)
+
+    def _account_POST(self, environ, params, account):
+        with self._lock:
+            _update_meta(account.meta, environ, 'Account')
+        return 204, '', {}
+
+    # Containers
+
+    def _container_headers(self, container):
+        headers = _meta_response(container.meta, 'Container')
+        headers['X-Container-Object-Count'] = str(len(container.objects))
+        headers['X-Container-Bytes-Used'] = str(container.usage())
+        return headers
+
+    def _container_PUT(self, environ, params, account, name):
+        with self._lock:
+            status = 202 if name in account.containers else 201
+            container = account.containers.setdefault(name, _Container())
+            _update_meta(container.meta, environ, 'Container')
+        return status, '', {}
+
+    def _container_DELETE(self, environ, params, account, name):
+        with self._lock:
+            container = account.containers.get(name)
+            if container is None:
+                return 404, '', {}
+            if container.objects:
+                return 409, 'There was a conflict when trying to complete ' \
+                            'your request.', {}
+            del account.containers[name]
+        return 204, '', {}
+
+    def _container_HEAD(self, environ, params, account, name):
+        with self._lock:
+            container = account.containers.get(name)
+            if container is None:
+                return 404, '', {}
+            return 204, '', self._container_headers(container)
+
+    def _container_GET(self, environ, params, account, name):
+        with self._lock:
+            container = account.containers.get(name)
+            if container is None:
+                return 404, '', {}
+            if 'path' in params:
+                params = dict(params, prefix=params['path'].rstrip('/') + '/',
+                              delimiter='/')
+
+            def entries(name):
+                return container.objects[name].listing(name)
+
+            return self._listing(params, entries, container.objects,
+                                 self._container_headers(container))
+
+    def _container_POST(self, environ, params, account, name):
+        with self._lock:
+            container = account.containers.get(name)
+            if container is None:
+                return 404, '', {}
+            _update_meta(container.meta, environ, 'Container')
+        return 204, '', {}
+
+    # Objects
+
+    def _get(self, account, container_name, name):
+        container = account.containers.get(container_name)
+        if container is None:
+            return None
+        return container.objects.get(name)
+
+    def _store(self, account, container_name, name, obj):
+        container = account.containers.get(container_name)
+        if container is None:
+            return 404, '', {}
+        container.objects[name] = obj
+        return 201, '', {'Etag': obj.etag}
+
+    def _copy(self, environ, account, source, container_name, name):
+        src_container, _sep, src_name = urllib.unquote(
+            source).lstrip('/').partition('/')
+        with self._lock:
+            src = self._get(account, src_container, src_name)
+            if src is None:
+                return 404, '', {}
+            meta = dict(src.meta)
+            meta.update(_meta_headers(environ, 'X-Object-Meta-'))
+            content_type = environ.get('CONTENT_TYPE') or src.content_type
+            obj = _Object(self._read(account, src), content_type, meta)
+            return self._store(account, container_name, name, obj)
+
+    def _object_PUT(self, environ, params, account, container_name, name):
+        data = server.read_body(environ)
+        if 'HTTP_X_COPY_FROM' in environ:
+            return self._copy(environ, account, environ['HTTP_X_COPY_FROM'],
+                              container_name, name)
+        content_type = (environ.get('CONTENT_TYPE') or
+                        'application/octet-stream')
+        obj = _Object(data, content_type,
+                      _meta_headers(environ, 'X-Object-Meta-'),
+                      environ.get('HTTP_X_OBJECT_MANIFEST'))
+        with self._lock:
+            return self._store(account, container_name, name, obj)
+
+    def _object_COPY(self, environ, params, account, container_name, name):
+        destination = environ.get('HTTP_DESTINATION')
+        if not destination:
+            return 412, '', {}
+        dst_container, _sep, dst_name = urllib.unquote(
+            destination).lstrip('/').partition('/')
+        return self._copy(environ, account, container_name + '/' + name,
+                          dst_container, dst_name)
+
+    def _object_DELETE(self, environ, params, account, container_name, name):
+        with self._lock:
+            container = account.containers.get(container_name)
+            if container is None or container.objects.pop(name,
+                                                          None) is None:
+                return 404, '', {}
+        return 204, '', {}
+
+    def _object_POST(self, environ, params, account, container_name, name):
+        with self._lock:
+            obj = self._get(account, container_name, name)
+            if obj is None:
+                return 404, '', {}
+            obj.meta = _meta_headers(environ, 'X-Object-Meta-')
+        return 202, '', {}
+
+    def _read(self, account, obj):
+        """The data of an object, the concatenated segments of a manifest."""
+        if obj.manifest is None:
+            return obj.data
+        container_name, _sep, prefix = obj.manifest.partition('/')
+        container = account.containers.get(container_name)
+        if container is None:
+            return ''
+        return ''.join(container.objects[name].data
+                       for name in sorted(container.objects)
+                       if name.startswith(prefix))
+
+    def _object_GET(self, environ, params, account, container_name, name):
+        with self._lock:
+            obj = self._get(account, container_name, name)
+            if obj is None:
+                return 404, '', {}
+            data = self._read(account, obj)
+        headers = _meta_response(obj.meta, 'Object')
+        headers.update({
+            'Content-Type': obj.content_type,
+            'Accept-Ranges': 'bytes',
+            'Last-Modified': email.utils.formatdate(obj.timestamp,
+                                                    usegmt=True),
+            'X-Timestamp': '%.5f' % obj.timestamp,
+        })
+        if obj.manifest is None:
+            headers['Etag'] = obj.etag
+        else:
+            headers['X-Object-Manifest'] = obj.manifest
+            headers['Etag'] = '"%s"' % hashlib.md5(data).hexdigest()
+        match = _RANGE.match(environ.get('HTTP_RANGE', ''))
+        if match is None:
+            return 200, data, headers
+        start, end = match.groups()
+        if not start:
+            start, end = max(len(data) - int(end or 0), 0), len(data) - 1
+        else:
+            start = int(start)
+            end = min(int(end), len(data) - 1) if end else len(data) - 1
+        if start >= len(data) or start > end:
+            return 416, '', {}
+        headers['Content-Range'] = 'bytes %d-%d/%d' % (start, end, len(data))
+        return 206, data[start:end + 1], headers
+
+    _object_HEAD = _object_GET
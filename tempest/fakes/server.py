@@ -0,0 +1,602 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+A local HTTP server hosting fake OpenStack services
+
+The services are plain WSGI applications mounted under the path of their
+endpoint. An identity service is always mounted at /v2.0, handing out a
+token and a service catalog pointing back to the server for any
+credentials and serving the Keystone admin API, so the regular tempest
+clients work against it unchanged::
+
+    server = server.FakeServer({
+        'object-store': ('/v1/AUTH_%(tenant_id)s',
+                         object_storage.FakeObjectStorage()),
+    })
+    server.start()
+    client = ObjectClient(config, 'user', 'pass', server.auth_url, 'demo')
+    ...
+    server.stop()
+"""
+
+from cStringIO import StringIO
+import datetime
+import json
+import logging
+import socket
+import SocketServer
+import threading
+import time
+import uuid
+from wsgiref import simple_server
+
+LOG = logging.getLogger(__name__)
+
+STATUS = {
+    200: '200 OK',
+    201: '201 Created',
+    202: '202 Accepted',
+    204: '204 No Content',
+    206: '206 Partial Content',
+    400: '400 Bad Request',
+    401: '401 Unauthorized',
+    404: '404 Not Found',
+    405: '405 Method Not Allowed',
+    409: '409 Conflict',
+    412: '412 Precondition Failed',
+    413: '413 Request Entity Too Large',
+    416: '416 Requested Range Not Satisfiable',
+}
+
+
+def respond(start_response, status, body='', headers=None,
+            content_length=None):
+    """
+    Starts a WSGI response and returns its body iterable.
+
+    `content_length` overrides the length of `body`, as needed by HEAD.
+    """
+    headers = list((headers or {}).items())
+    if content_length is None:
+        content_length = len(body)
+    headers.append(('Content-Length', str(content_length)))
+    start_response(STATUS[status], headers)
+    return [body]
+
+
+def json_response(start_response, status, body, headers=None):
+    headers = dict(headers or {})
+    headers['Content-Type'] = 'application/json'
+    return respond(start_response, status, json.dumps(body), headers)
+
+
+def read_body(environ):
+    """Reads the request body, decoding chunked transfer encoding."""
+    stream = environ['wsgi.input']
+    if environ.get('HTTP_TRANSFER_ENCODING', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int(stream.readline().split(';')[0].strip(), 16)
+            if not size:
+                # skip the (empty) trailer
+                while stream.readline().strip():
+                    pass
+                break
+            chunks.append(stream.read(size))
+            stream.readline()
+        return ''.join(chunks)
+    length = environ.get('CONTENT_LENGTH')
+    if not length:
+        return ''
+    return stream.read(int(length))
+
+
+def split_path(path):
+    return [segment for segment in path.split('/') if segment]
+
+
+def match(routes, method, segments):
+    """
+    Finds the handler of a request in a routing table.
+
+    `routes` maps (method, pattern) tuples to handlers, a pattern being a
+    tuple of path segments where None matches any segment.
+
+    :returns: a (handler, args) tuple, args being the segments matched by
+              None, or (None, None)
+    """
+    for (route_method, pattern), handler in routes.items():
+        if route_method != method or len(pattern) != len(segments):
+            continue
+        args = []
+        for expected, segment in zip(pattern, segments):
+            if expected is None:
+                args.append(segment)
+            elif expected != segment:
+                break
+        else:
+            return handler, args
+    return None, None
+
+
+class _NotFound(Exception):
+    pass
+
+
+class FakeIdentity(object):
+
+    """
+    Keystone v2.0 token issuer and admin API
+
+    Tokens are issued for any credentials, except for the users created
+    through the admin API which have to give their password and must be
+    enabled. The tenant id is the id of the tenant of that name if one
+    was created, the requested tenant name otherwise, so the same
+    credentials always map to the same tenant of the fake services.
+    """
+
+    def __init__(self, services):
+        self.services = services
+        self.tokens = {}
+        self.tenants = {}
+        self.users = {}
+        self.roles = {}
+        self.services_by_id = {}
+        # (tenant id, user id) to the set of role ids assigned
+        self.grants = {}
+        self._lock = threading.Lock()
+        self._routes = {
+            ('POST', ('tokens',)): self._create_token,
+            ('DELETE', ('tokens', None)): self._delete_token,
+            ('GET', ('tenants',)): self._list_tenants,
+            ('POST', ('tenants',)): self._create_tenant,
+            ('GET', ('tenants', None)): self._get_tenant,
+            ('POST', ('tenants', None)): self._update_tenant,
+            ('DELETE', ('tenants', None)): self._delete_tenant,
+            ('GET', ('tenants', None, 'users')): self._list_tenant_users,
+            ('GET', ('tenants', None, 'users', None, 'roles')):
+                self._list_user_roles,
+            ('PUT', ('tenants', None, 'users', None, 'roles', 'OS-KSADM',
+                     None)): self._grant_role,
+            ('DELETE', ('tenants', None, 'users', None, 'roles',
+                        'OS-KSADM', None)): self._revoke_role,
+            ('GET', ('users',)): self._list_users,
+            ('POST', ('users',)): self._create_user,
+            ('GET', ('users', None)): self._get_user,
+            ('DELETE', ('users', None)): self._delete_user,
+            ('PUT', ('users', None, 'enabled')): self._enable_user,
+            ('GET', ('OS-KSADM', 'roles')): self._list_roles,
+            ('POST', ('OS-KSADM', 'roles')): self._create_role,
+            ('DELETE', ('OS-KSADM', 'roles', None)): self._delete_role,
+            ('POST', ('OS-KSADM', 'services')): self._create_service,
+            ('GET', ('OS-KSADM', 'services', None)): self._get_service,
+            ('DELETE', ('OS-KSADM', 'services', None)):
+                self._delete_service,
+        }
+
+    def _endpoint(self, base, tenant_id, template):
+        url = base + template % {'tenant_id': tenant_id}
+        return {'region': 'RegionOne',
+                'publicURL': url,
+                'internalURL': url,
+                'adminURL': url}
+
+    def __call__(self, environ, start_response):
+        handler, args = match(self._routes, environ['REQUEST_METHOD'],
+                              split_path(environ['PATH_INFO']))
+        if handler is None:
+            return self._error(start_response, 404, 'Not Found')
+        body = read_body(environ)
+        try:
+            body = json.loads(body) if body else {}
+        except ValueError:
+            return self._error(start_response, 400, 'Malformed request')
+        try:
+            with self._lock:
+                status, body = handler(environ, body, *args)
+        except _NotFound:
+            return self._error(start_response, 404, 'Not Found')
+        except (KeyError, TypeError):
+            return self._error(start_response, 400, 'Malformed request')
+        if body is None:
+            return respond(start_response, status)
+        return json_response(start_response, status, body)
+
+    def _error(self, start_response, status, message):
+        return json_response(start_response, status, {
+            'error': {'code': status, 'title': STATUS[status][4:],
+                      'message': message}})
+
+    def _get(self, collection, key):
+        if key not in collection:
+            raise _NotFound()
+        return collection[key]
+
+    # Tokens
+
+    def _create_token(self, environ, body):
+        auth = body['auth']
+        credentials = auth.get('passwordCredentials', {})
+        username = credentials.get('username')
+        for user in self.users.values():
+            if user['name'] == username:
+                if (user['password'] != credentials.get('password') or
+                        not user['enabled']):
+                    return 401, {'error': {'code': 401,
+                                           'title': 'Not Authorized',
+                                           'message': 'Invalid user / '
+                                                      'password'}}
+                user_id = user['id']
+                break
+        else:
+            user_id = uuid.uuid4().hex
+        tenant_id = auth.get('tenantName') or 'tenant'
+        for tenant in self.tenants.values():
+            if tenant['name'] == tenant_id:
+                tenant_id = tenant['id']
+                break
+        token_id = uuid.uuid4().hex
+        self.tokens[token_id] = tenant_id
+        expires = datetime.datetime.utcnow() + datetime.timedelta(days=1)
+        base = '%s://%s' % (environ['wsgi.url_scheme'], environ['HTTP_HOST'])
+        catalog = [{'type': service_type,
+                    'name': service_type,
+                    'endpoints': [self._endpoint(base, tenant_id, template)]}
+                   for service_type, template in sorted(self.services.items())]
+        access = {
+            'token': {'id': token_id,
+                      'expires': expires.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                      'tenant': {'id': tenant_id,
+                                 'name': auth.get('tenantName') or tenant_id}},
+            'user': {'id': user_id, 'name': username},
+            'serviceCatalog': catalog,
+        }
+        return 200, {'access': access}
+
+    def _delete_token(self, environ, body, token_id):
+        self._get(self.tokens, token_id)
+        del self.tokens[token_id]
+        return 204, None
+
+    # Tenants
+
+    def _list_tenants(self, environ, body):
+        return 200, {'tenants': self.tenants.values()}
+
+    def _create_tenant(self, environ, body):
+        tenant = body['tenant']
+        if any(other['name'] == tenant['name']
+               for other in self.tenants.values()):
+            return 409, {'error': {'code': 409, 'title': 'Conflict',
+                                   'message': 'Duplicate tenant name'}}
+        tenant = {'id': uuid.uuid4().hex,
+                  'name': tenant['name'],
+                  'description': tenant.get('description', ''),
+                  'enabled': tenant.get('enabled', True) in (True, 'true')}
+        self.tenants[tenant['id']] = tenant
+        return 200, {'tenant': tenant}
+
+    def _get_tenant(self, environ, body, tenant_id):
+        return 200, {'tenant': self._get(self.tenants, tenant_id)}
+
+    def _update_tenant(self, environ, body, tenant_id):
+        tenant = self._get(self.tenants, tenant_id)
+        for key in ('name', 'description', 'enabled'):
+            if key in body['tenant']:
+                tenant[key] = body['tenant'][key]
+        return 200, {'tenant': tenant}
+
+    def _delete_tenant(self, environ, body, tenant_id):
+        self._get(self.tenants, tenant_id)
+        del self.tenants[tenant_id]
+        for grant in [grant for grant in self.grants if
+                      grant[0] == tenant_id]:
+            del self.grants[grant]
+        return 204, None
+
+    def _list_tenant_users(self, environ, body, tenant_id):
+        self._get(self.tenants, tenant_id)
+        users = [self._user(user) for user in self.users.values()
+                 if user['tenantId'] == tenant_id or
+                 (tenant_id, user['id']) in self.grants]
+        return 200, {'users': users}
+
+    # Users
+
+    def _user(self, user):
+        user = dict(user)
+        del user['password']
+        return user
+
+    def _list_users(self, environ, body):
+        return 200, {'users': [self._user(user)
+                               for user in self.users.values()]}
+
+    def _create_user(self, environ, body):
+        user = body['user']
+        if any(other['name'] == user['name']
+               for other in self.users.values()):
+            return 409, {'error': {'code': 409, 'title': 'Conflict',
+                                   'message': 'Duplicate user name'}}
+        user = {'id': uuid.uuid4().hex,
+                'name': user['name'],
+                'password': user.get('password'),
+                'tenantId': user.get('tenantId'),
+                'email': user.get('email'),
+                'enabled': user.get('enabled', True)}
+        self.users[user['id']] = user
+        return 200, {'user': self._user(user)}
+
+    def _get_user(self, environ, body, user_id):
+        return 200, {'user': self._user(self._get(self.users, user_id))}
+
+    def _delete_user(self, environ, body, user_id):
+        self._get(self.users, user_id)
+        del self.users[user_id]
+        for grant in [grant for grant in self.grants if
+                      grant[1] == user_id]:
+            del self.grants[grant]
+        return 204, None
+
+    def _enable_user(self, environ, body, user_id):
+        user = self._get(self.users, user_id)
+        user['enabled'] = body['user']['enabled']
+        return 200, {'user': self._user(user)}
+
+    # Roles
+
+    def _list_roles(self, environ, body):
+        return 200, {'roles': self.roles.values()}
+
+    def _create_role(self, environ, body):
+        name = body['role']['name']
+        if any(role['name'] == name for role in self.roles.values()):
+            return 409, {'error': {'code': 409, 'title': 'Conflict',
+                                   'message': 'Duplicate role name'}}
+        role = {'id': uuid.uuid4().hex, 'name': name}
+        self.roles[role['id']] = role
+        return 200, {'role': role}
+
+    def _delete_role(self, environ, body, role_id):
+        self._get(self.roles, role_id)
+        del self.roles[role_id]
+        for role_ids in self.grants.values():
+            role_ids.discard(role_id)
+        return 204, None
+
+    def _list_user_roles(self, environ, body, tenant_id, user_id):
+        self._get(self.tenants, tenant_id)
+        self._get(self.users, user_id)
+        role_ids = self.grants.get((tenant_id, user_id), ())
+        return 200, {'roles': [self.roles[role_id] for role_id in role_ids]}
+
+    def _grant_role(self, environ, body, tenant_id, user_id, role_id):
+        self._get(self.tenants, tenant_id)
+        self._get(self.users, user_id)
+        role = self._get(self.roles, role_id)
+        role_ids = self.grants.setdefault((tenant_id, user_id), set())
+        if role_id in role_ids:
+            return 409, {'error': {'code': 409, 'title': 'Conflict',
+                                   'message': 'Role already granted'}}
+        role_ids.add(role_id)
+        return 200, {'role': role}
+
+    def _revoke_role(self, environ, body, tenant_id, user_id, role_id):
+        role_ids = self.grants.get((tenant_id, user_id), set())
+        if role_id not in role_ids:
+            raise _NotFound()
+        role_ids.remove(role_id)
+        return 204, None
+
+    # Services
+
+    def _create_service(self, environ, body):
+        service = dict(body['OS-KSADM:service'], id=uuid.uuid4().hex)
+        self.services_by_id[service['id']] = service
+        return 200, {'OS-KSADM:service': service}
+
+    def _get_service(self, environ, body, service_id):
+        return 200, {'OS-KSADM:service': self._get(self.services_by_id,
+                                                   service_id)}
+
+    def _delete_service(self, environ, body, service_id):
+        self._get(self.services_by_id, service_id)
+        del self.services_by_id[service_id]
+        return 204, None
+
+
+class _ServerHandler(simple_server.ServerHandler):
+
+    http_version = '1.1'
+
+    def cleanup_headers(self):
+        simple_server.ServerHandler.cleanup_headers(self)
+        # without a length the end of the body is the end of the connection
+        if 'Content-Length' not in self.headers:
+            self.headers['Connection'] = 'close'
+            self.request_handler.close_connection = True
+
+
+class _QuietHandler(simple_server.WSGIRequestHandler):
+
+    """
+    Serves the requests of a keep-alive connection one after the other
+
+    wsgiref answers a single HTTP/1.0 request per connection, which would
+    keep the connection pool of the clients from ever reusing a
+    connection.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # wsgiref writes the headers and the body of a response separately
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            self.handle_one_request()
+
+    def handle_one_request(self):
+        self.raw_requestline = self.rfile.readline(65537)
+        if len(self.raw_requestline) > 65536:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(414)
+            return
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        if not self.parse_request():
+            return
+        environ = self.get_environ()
+        stdin = self.rfile
+        if environ.get('HTTP_TRANSFER_ENCODING', '').lower() == 'chunked':
+            # the application may stop reading anywhere in the chunks
+            self.close_connection = True
+        else:
+            # read the body up front, so that the next request starts
+            # where it ends whatever the application reads of it
+            stdin = StringIO(
+                self.rfile.read(int(environ.get('CONTENT_LENGTH') or 0)))
+        handler = _ServerHandler(stdin, self.wfile, self.get_stderr(),
+                                 environ)
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        LOG.debug(format, *args)
+
+
+class _ThreadingWSGIServer(SocketServer.ThreadingMixIn,
+                           simple_server.WSGIServer):
+    daemon_threads = True
+    # the default of 5 overflows, and connections are refused and retried
+    # by the client, as soon as a few more threads connect at once
+    request_queue_size = 128
+
+    def __init__(self, *args, **kwargs):
+        simple_server.WSGIServer.__init__(self, *args, **kwargs)
+        self._connections = set()
+        self._connections_closed = threading.Condition()
+
+    def process_request(self, request, client_address):
+        with self._connections_closed:
+            self._connections.add(request)
+        SocketServer.ThreadingMixIn.process_request(self, request,
+                                                    client_address)
+
+    def close_request(self, request):
+        simple_server.WSGIServer.close_request(self, request)
+        with self._connections_closed:
+            self._connections.discard(request)
+            self._connections_closed.notify_all()
+
+    def close_connections(self, timeout=5):
+        """
+        Ends the keep-alive connections the clients left open, waiting up
+        to `timeout` seconds for their threads to be done with them.
+        """
+        with self._connections_closed:
+            connections = list(self._connections)
+        for request in connections:
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+        deadline = time.time() + timeout
+        with self._connections_closed:
+            while self._connections and time.time() < deadline:
+                self._connections_closed.wait(deadline - time.time())
+
+
+def _mount_point(template):
+    """The static leading path segments of an endpoint path template."""
+    segments = split_path(template)
+    for index, segment in enumerate(segments):
+        if '%(' in segment:
+            segments = segments[:index]
+            break
+    return '/' + '/'.join(segments)
+
+
+class FakeServer(object):
+
+    """
+    Serves WSGI applications of fake services on a local port
+
+    `services` maps the catalog type of every service to a tuple of the
+    path template of its endpoint, relative to the server and formatted
+    with the tenant_id, and its WSGI application. Requests are dispatched
+    to the application with the longest matching mount point, its
+    PATH_INFO being the rest of the path; each request runs in its own
+    thread.
+    """
+
+    IDENTITY_PATH = '/v2.0'
+
+    def __init__(self, services, host='127.0.0.1', port=0):
+        templates = dict((service_type, template) for service_type,
+                         (template, app) in services.items())
+        templates['identity'] = self.IDENTITY_PATH
+        self.identity = FakeIdentity(templates)
+        self._mounts = [(self.IDENTITY_PATH, self.identity)]
+        for template, app in services.values():
+            self._mounts.append((_mount_point(template), app))
+        self._mounts.sort(key=lambda mount: len(mount[0]), reverse=True)
+        self._host = host
+        self._port = port
+        self._server = None
+        self._thread = None
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        for mount_point, app in self._mounts:
+            if path == mount_point or path.startswith(mount_point + '/'):
+                environ['SCRIPT_NAME'] = mount_point
+                environ['PATH_INFO'] = path[len(mount_point):]
+                return app(environ, start_response)
+        return respond(start_response, 404)
+
+    @property
+    def url(self):
+        return 'http://%s:%d' % self._server.server_address[:2]
+
+    @property
+    def auth_url(self):
+        return self.url + self.IDENTITY_PATH + '/tokens'
+
+    def start(self):
+        self._server = simple_server.make_server(
+            self._host, self._port, self, server_class=_ThreadingWSGIServer,
+            handler_class=_QuietHandler)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        LOG.info("Fake services listening on %s", self.url)
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server.close_connections()
+            self._thread.join()
+            self._server = None
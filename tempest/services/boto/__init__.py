@@ -22,6 +22,7 @@ from types import MethodType
 
 import boto
 
+from tempest.common import accounting
 from tempest.exceptions import InvalidConfiguration
 from tempest.exceptions import NotFound
 
@@ -76,8 +77,10 @@ class BotoClientBase(object):
         """Automatically creates methods for the allowed methods set."""
         if name in self.ALLOWED_METHODS:
             def func(self, *args, **kwargs):
-                with closing(self.get_connection()) as conn:
-                    return getattr(conn, name)(*args, **kwargs)
+                endpoint = '%(host)s:%(port)s' % self.connection_data
+                with accounting.timed(accounting.HTTP, endpoint):
+                    with closing(self.get_connection()) as conn:
+                        return getattr(conn, name)(*args, **kwargs)
 
             func.__name__ = name
             setattr(self, name, MethodType(func, self, self.__class__))
@@ -16,10 +16,10 @@
 #    under the License.
 
 import json
-import time
 import urllib
 
 from tempest.common.rest_client import RestClient
+from tempest.common import waiters
 from tempest import exceptions
 
 
@@ -79,34 +79,36 @@ class ImagesClientJSON(RestClient):
         """Deletes the provided image."""
         return self.delete("images/%s" % str(image_id))
 
+    @waiters.with_deadline
     def wait_for_image_resp_code(self, image_id, code):
         """
         Waits until the HTTP response code for the request matches the
         expected value
         """
         resp, body = self.get("images/%s" % str(image_id))
-        start = int(time.time())
+        poller = self.get_poller()
 
         while resp.status != code:
-            time.sleep(self.build_interval)
+            poller.sleep()
             resp, body = self.get("images/%s" % str(image_id))
 
-            if int(time.time()) - start >= self.build_timeout:
+            if poller.expired():
                 raise exceptions.TimeoutException
 
+    @waiters.with_deadline
     def wait_for_image_status(self, image_id, status):
         """Waits for an image to reach a given status."""
         resp, image = self.get_image(image_id)
-        start = int(time.time())
+        poller = self.get_poller()
 
         while image['status'] != status:
-            time.sleep(self.build_interval)
+            poller.sleep()
             resp, image = self.get_image(image_id)
 
             if image['status'] == 'ERROR':
                 raise exceptions.AddImageException(image_id=image_id)
 
-            if int(time.time()) - start >= self.build_timeout:
+            if poller.expired():
                 raise exceptions.TimeoutException
 
     def list_image_metadata(self, image_id):
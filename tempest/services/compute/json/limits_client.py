@@ -38,3 +38,11 @@ class LimitsClientJSON(RestClient):
             return None
         else:
             return body['limits']['absolute'][absolute_limit]
+
+    def get_rate_limits(self):
+        """Returns the rate limits, with which this client is paced."""
+        resp, body = self.get("limits")
+        body = json.loads(body)
+        rate_limits = body['limits']['rate']
+        self.get_rate_limiter().set_rate_limits(rate_limits)
+        return resp, rate_limits
@@ -16,10 +16,10 @@
 #    under the License.
 
 import json
-import time
 import urllib
 
 from tempest.common.rest_client import RestClient
+from tempest.common import waiters
 from tempest import exceptions
 
 
@@ -141,21 +141,22 @@ class ServersClientJSON(RestClient):
         body = json.loads(body)
         return resp, body
 
+    @waiters.with_deadline
     def wait_for_server_status(self, server_id, status):
         """Waits for a server to reach a given status."""
+        poller = self.get_poller()
         resp, body = self.get_server(server_id)
         server_status = body['status']
-        start = int(time.time())
 
         while(server_status != status):
-            time.sleep(self.build_interval)
+            poller.sleep()
             resp, body = self.get_server(server_id)
             server_status = body['status']
 
             if server_status == 'ERROR':
                 raise exceptions.BuildErrorException(server_id=server_id)
 
-            timed_out = int(time.time()) - start >= self.build_timeout
+            timed_out = poller.expired()
 
             if server_status != status and timed_out:
                 message = ('Server %s failed to reach %s status within the '
@@ -164,9 +165,14 @@ class ServersClientJSON(RestClient):
                 message += ' Current status: %s.' % server_status
                 raise exceptions.TimeoutException(message)
 
+    def wait_for_servers_status(self, server_ids, status):
+        """Waits for several servers to reach a given status together."""
+        return waiters.wait_for_servers_status(self, server_ids, status)
+
+    @waiters.with_deadline
     def wait_for_server_termination(self, server_id, ignore_error=False):
         """Waits for server to reach termination."""
-        start_time = int(time.time())
+        poller = self.get_poller()
         while True:
             try:
                 resp, body = self.get_server(server_id)
@@ -177,10 +183,10 @@ class ServersClientJSON(RestClient):
             if server_status == 'ERROR' and not ignore_error:
                 raise exceptions.BuildErrorException(server_id=server_id)
 
-            if int(time.time()) - start_time >= self.build_timeout:
+            if poller.expired():
                 raise exceptions.TimeoutException
 
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def list_addresses(self, server_id):
         """Lists all addresses for a server."""
@@ -16,10 +16,10 @@
 #    under the License.
 
 import json
-import time
 import urllib
 
 from tempest.common.rest_client import RestClient
+from tempest.common import waiters
 from tempest import exceptions
 
 
@@ -83,21 +83,22 @@ class VolumesExtensionsClientJSON(RestClient):
         """Deletes the Specified Volume."""
         return self.delete("os-volumes/%s" % str(volume_id))
 
+    @waiters.with_deadline
     def wait_for_volume_status(self, volume_id, status):
         """Waits for a Volume to reach a given status."""
         resp, body = self.get_volume(volume_id)
         volume_name = body['displayName']
         volume_status = body['status']
-        start = int(time.time())
+        poller = self.get_poller()
 
         while volume_status != status:
-            time.sleep(self.build_interval)
+            poller.sleep()
             resp, body = self.get_volume(volume_id)
             volume_status = body['status']
             if volume_status == 'error':
                 raise exceptions.VolumeBuildErrorException(volume_id=volume_id)
 
-            if int(time.time()) - start >= self.build_timeout:
+            if poller.expired():
                 message = ('Volume %s failed to reach %s status within '
                            'the required time (%s s).' %
                            (volume_name, status, self.build_timeout))
@@ -33,7 +33,10 @@ class ConsoleOutputsClientXML(RestClientXML):
         self.service = self.config.compute.catalog_type
 
     def get_console_output(self, server_id, length):
-        post_body = Element("os-getConsoleOutput", length=length)
+        post_body = Element("os-getConsoleOutput")
+        # without a length the whole log is returned
+        if length is not None:
+            post_body.add_attr('length', length)
         resp, body = self.post("/servers/%s/action" % server_id,
                                headers=self.headers,
                                body=str(Document(post_body)))
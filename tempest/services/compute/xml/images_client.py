@@ -15,12 +15,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import time
 import urllib
 
 from lxml import etree
 
 from tempest.common.rest_client import RestClientXML
+from tempest.common import waiters
 from tempest import exceptions
 from tempest.services.compute.xml.common import Document
 from tempest.services.compute.xml.common import Element
@@ -117,33 +117,35 @@ class ImagesClientXML(RestClientXML):
         """Deletes the provided image."""
         return self.delete("images/%s" % str(image_id), self.headers)
 
+    @waiters.with_deadline
     def wait_for_image_resp_code(self, image_id, code):
         """
         Waits until the HTTP response code for the request matches the
         expected value
         """
         resp, body = self.get("images/%s" % str(image_id), self.headers)
-        start = int(time.time())
+        poller = self.get_poller()
 
         while resp.status != code:
-            time.sleep(self.build_interval)
+            poller.sleep()
             resp, body = self.get("images/%s" % str(image_id), self.headers)
 
-            if int(time.time()) - start >= self.build_timeout:
+            if poller.expired():
                 raise exceptions.TimeoutException
 
+    @waiters.with_deadline
     def wait_for_image_status(self, image_id, status):
         """Waits for an image to reach a given status."""
         resp, image = self.get_image(image_id)
-        start = int(time.time())
+        poller = self.get_poller()
 
         while image['status'] != status:
-            time.sleep(self.build_interval)
+            poller.sleep()
             resp, image = self.get_image(image_id)
             if image['status'] == 'ERROR':
                 raise exceptions.AddImageException(image_id=image_id)
 
-            if int(time.time()) - start >= self.build_timeout:
+            if poller.expired():
                 raise exceptions.TimeoutException
 
     def list_image_metadata(self, image_id):
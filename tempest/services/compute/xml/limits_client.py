@@ -54,3 +54,18 @@ class LimitsClientXML(RestClientXML):
             return None
         else:
             return ret[absolute_limit]
+
+    def get_rate_limits(self):
+        """Returns the rate limits, with which this client is paced."""
+        resp, body = self.get("limits", self.headers)
+        body = objectify.fromstring(body)
+        rate_limits = []
+
+        for rate in body[NS + 'rates'].iterchildren():
+            rate_limits.append({
+                'uri': rate.attrib.get('uri'),
+                'regex': rate.attrib.get('regex'),
+                'limit': [dict(limit.attrib) for limit in
+                          rate.iterchildren()]})
+        self.get_rate_limiter().set_rate_limits(rate_limits)
+        return resp, rate_limits
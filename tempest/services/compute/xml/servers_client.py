@@ -16,12 +16,12 @@
 #    under the License.
 
 import logging
-import time
 import urllib
 
 from lxml import etree
 
 from tempest.common.rest_client import RestClientXML
+from tempest.common import waiters
 from tempest import exceptions
 from tempest.services.compute.xml.common import Document
 from tempest.services.compute.xml.common import Element
@@ -241,21 +241,22 @@ class ServersClientXML(RestClientXML):
         server = self._parse_server(etree.fromstring(body))
         return resp, server
 
+    @waiters.with_deadline
     def wait_for_server_status(self, server_id, status):
         """Waits for a server to reach a given status."""
+        poller = self.get_poller()
         resp, body = self.get_server(server_id)
         server_status = body['status']
-        start = int(time.time())
 
         while(server_status != status):
-            time.sleep(self.build_interval)
+            poller.sleep()
             resp, body = self.get_server(server_id)
             server_status = body['status']
 
             if server_status == 'ERROR':
                 raise exceptions.BuildErrorException(server_id=server_id)
 
-            timed_out = int(time.time()) - start >= self.build_timeout
+            timed_out = poller.expired()
 
             if server_status != status and timed_out:
                 message = ('Server %s failed to reach %s status within the '
@@ -264,9 +265,14 @@ class ServersClientXML(RestClientXML):
                 message += ' Current status: %s.' % server_status
                 raise exceptions.TimeoutException(message)
 
+    def wait_for_servers_status(self, server_ids, status):
+        """Waits for several servers to reach a given status together."""
+        return waiters.wait_for_servers_status(self, server_ids, status)
+
+    @waiters.with_deadline
     def wait_for_server_termination(self, server_id, ignore_error=False):
         """Waits for server to reach termination."""
-        start_time = int(time.time())
+        poller = self.get_poller()
         while True:
             try:
                 resp, body = self.get_server(server_id)
@@ -277,10 +283,10 @@ class ServersClientXML(RestClientXML):
             if server_status == 'ERROR' and not ignore_error:
                 raise exceptions.BuildErrorException
 
-            if int(time.time()) - start_time >= self.build_timeout:
+            if poller.expired():
                 raise exceptions.TimeoutException
 
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def _parse_network(self, node):
         addrs = []
@@ -1,6 +1,6 @@
-import httplib2
 import json
 
+from tempest.common import http
 from tempest.common.rest_client import RestClient
 from tempest import exceptions
 
@@ -206,7 +206,9 @@ class AdminClientJSON(RestClient):
 class TokenClientJSON(RestClient):
 
     def __init__(self, config):
+        self.config = config
         self.auth_url = config.identity.auth_url
+        self.http_pool = http.get_pool(config)
 
     def auth(self, user, password, tenant):
         creds = {
@@ -225,12 +227,12 @@ class TokenClientJSON(RestClient):
 
     def request(self, method, url, headers=None, body=None):
         """A simple HTTP request interface."""
-        self.http_obj = httplib2.Http()
         if headers is None:
             headers = {}
 
-        resp, resp_body = self.http_obj.request(url, method,
-                                                headers=headers, body=body)
+        resp, resp_body = self.http_pool.request(
+            url, method, headers=headers, body=body,
+            disable_ssl_certificate_validation=False)
 
         if resp.status in (401, 403):
             resp_body = json.loads(resp_body)
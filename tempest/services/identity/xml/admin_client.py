@@ -15,12 +15,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import httplib2
 import json
 import logging
 
 from lxml import etree
 
+from tempest.common import http
 from tempest.common.rest_client import RestClient
 from tempest.common.rest_client import RestClientXML
 from tempest import exceptions
@@ -228,7 +228,9 @@ class AdminClientXML(RestClientXML):
 class TokenClientXML(RestClientXML):
 
     def __init__(self, config):
+        self.config = config
         self.auth_url = config.identity.auth_url
+        self.http_pool = http.get_pool(config)
 
     def auth(self, user, password, tenant):
         passwordCreds = Element("passwordCredentials",
@@ -243,12 +245,12 @@ class TokenClientXML(RestClientXML):
 
     def request(self, method, url, headers=None, body=None):
         """A simple HTTP request interface."""
-        self.http_obj = httplib2.Http()
         if headers is None:
             headers = {}
 
-        resp, resp_body = self.http_obj.request(url, method,
-                                                headers=headers, body=body)
+        resp, resp_body = self.http_pool.request(
+            url, method, headers=headers, body=body,
+            disable_ssl_certificate_validation=False)
 
         if resp.status in (401, 403):
             resp_body = json.loads(resp_body)
@@ -18,7 +18,9 @@
 import json
 import urllib
 
+from tempest.common import paging
 from tempest.common.rest_client import RestClient
+from tempest.services.object_storage.container_client import LISTING_LIMIT
 
 
 class AccountClient(RestClient):
@@ -34,7 +36,7 @@ class AccountClient(RestClient):
         Returns all account metadata headers
         """
 
-        headers = {"X-Storage-Token": self.token}
+        headers = {"X-Storage-Token": self.get_auth()}
         resp, body = self.head('', headers=headers)
         return resp, body
 
@@ -54,7 +56,7 @@ class AccountClient(RestClient):
         Deletes an account metadata entry.
         """
 
-        headers = {"X-Storage-Token": self.token}
+        headers = {"X-Storage-Token": self.get_auth()}
         for item in metadata:
             headers[metadata_prefix + item] = 'x'
         resp, body = self.post('', headers=headers, body=None)
@@ -84,8 +86,32 @@ class AccountClient(RestClient):
 
         url = '?format=%s' % self.format
         if params:
-            url += '&%s' + urllib.urlencode(params)
+            url += '&%s' % urllib.urlencode(params)
 
         resp, body = self.get(url)
         body = json.loads(body)
         return resp, body
+
+    def iter_account_containers(self, params=None, page_size=LISTING_LIMIT,
+                                prefetch=True):
+        """
+        Yields the containers of the account one at a time.
+
+        The listing is paged through with `limit` and `marker`, the next
+        page being fetched in the background while the current one is
+        consumed. `params` may hold marker, end_marker and prefix.
+        """
+        params = dict(params or {})
+        marker = params.pop('marker', None)
+
+        def fetch(marker):
+            page_params = dict(params, limit=page_size)
+            if marker is not None:
+                page_params['marker'] = marker
+            resp, body = self.get('?format=json&%s' %
+                                  urllib.urlencode(page_params))
+            if not body:
+                return []
+            return json.loads(body)
+
+        return paging.iter_listing(fetch, page_size, marker, prefetch)
@@ -18,7 +18,13 @@
 import json
 import urllib
 
+from tempest.common import concurrency
+from tempest.common import paging
 from tempest.common.rest_client import RestClient
+from tempest import exceptions
+
+# Largest number of entries Swift returns in one listing
+LISTING_LIMIT = 10000
 
 
 class ContainerClient(RestClient):
@@ -66,6 +72,32 @@ class ContainerClient(RestClient):
         resp, body = self.post(url, body=None, headers=headers)
         return resp, body
 
+    def delete_container_objects(self, container_name, params=None,
+                                 concurrency_level=None):
+        """
+        Deletes every object of the container, concurrently.
+
+        The listing is walked with iter_container_objects while the objects
+        are deleted, `params` may restrict it e.g. to a prefix. Objects
+        already gone, such as expired ones, count as deleted.
+
+        Returns a (responses, errors) tuple of dicts keyed by object name.
+        """
+        def delete(name):
+            url = '%s/%s' % (container_name,
+                             urllib.quote(name.encode('utf-8')))
+            try:
+                resp, body = self.delete(url)
+            except exceptions.NotFound:
+                return None
+            return resp
+
+        objects = self.iter_container_objects(container_name, params)
+        return concurrency.map_keyed(
+            delete, ((obj['name'], (obj['name'],)) for obj in objects
+                     if 'name' in obj),
+            concurrency_level or self.config.object_storage.concurrency)
+
     def delete_container_metadata(self, container_name, metadata,
                                   metadata_prefix='X-Remove-Container-Meta-'):
         """Deletes arbitrary metadata on container."""
@@ -94,38 +126,36 @@ class ContainerClient(RestClient):
             item count is beyond 10,000 item listing limit.
             Does not require any paramaters aside from container name.
         """
-        #TODO(dwalleck):  Rewite using json format to avoid newlines at end of
-        #obj names. Set limit to API limit - 1 (max returned items = 9999)
-        limit = 9999
-        marker = None
-        if params is not None:
-            if 'limit' in params:
-                limit = params['limit']
-
-            if 'marker' in params:
-                limit = params['marker']
-
-        resp, objlist = self.list_container_contents(container,
-                                                     params={'limit': limit})
-        return objlist
-        """tmp = []
-        for obj in objlist:
-            tmp.append(obj['name'])
-        objlist = tmp
-
-        if len(objlist) >= limit:
-
-            #Increment marker
-            marker = objlist[len(objlist) - 1]
-
-            #Get the next chunk of the list
-            objlist.extend(_list_all_container_objects(container,
-                                                      params={'marker': marker,
-                                                              'limit': limit}))
-            return objlist
-        else:
-            #Return final, complete list
-            return objlist"""
+        return list(self.iter_container_objects(container, params))
+
+    def iter_container_objects(self, container, params=None,
+                               page_size=LISTING_LIMIT, prefetch=True):
+        """
+        Yields the objects of a container one at a time.
+
+        The listing is paged through with `limit` and `marker`, the next
+        page being fetched in the background while the current one is
+        consumed, so containers of any size are walked in constant memory.
+        `params` may hold marker, end_marker, prefix, delimiter and path.
+        """
+        params = dict(params or {})
+        marker = params.pop('marker', None)
+        url = '%s?format=json' % container
+
+        def fetch(marker):
+            return self._list_page(url, params, marker, page_size)
+
+        return paging.iter_listing(fetch, page_size, marker, prefetch)
+
+    def _list_page(self, url, params, marker, page_size):
+        page_params = dict(params, limit=page_size)
+        if marker is not None:
+            page_params['marker'] = marker
+        resp, body = self.get('%s&%s' % (url, urllib.urlencode(page_params)))
+        # empty listings may come back as 204 No Content
+        if not body:
+            return []
+        return json.loads(body)
 
     def list_container_contents(self, container, params=None):
         """
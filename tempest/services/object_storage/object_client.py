@@ -15,13 +15,124 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import httplib2
+import hashlib
 import json
+import mmap
 import re
+import threading
+import time
+
+from tempest.common import concurrency
+from tempest.common import http
 from tempest.common.rest_client import RestClient
 from tempest import exceptions
 
 
+class ObjectStream(object):
+
+    """
+    Data of a streamed object download, checked against its Etag
+
+    Iterating yields the object in fixed-size chunks while their MD5 is
+    computed; once the last chunk was read the checksum is compared with
+    the Etag header and ChecksumMismatch is raised if they differ. Manifest
+    and partial (ranged) responses have no comparable Etag and are not
+    checked.
+    """
+
+    def __init__(self, url, resp, stream):
+        self.url = url
+        self.etag = None
+        if resp.status == 200 and 'x-object-manifest' not in resp:
+            self.etag = resp.get('etag', '').strip('"') or None
+        self._stream = stream
+        self._md5 = hashlib.md5()
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._md5.update(chunk)
+            yield chunk
+        checksum = self._md5.hexdigest()
+        if self.etag is not None and checksum != self.etag:
+            raise exceptions.ChecksumMismatch(url=self.url, actual=checksum,
+                                              expected=self.etag)
+
+    def close(self):
+        self._stream.close()
+
+
+def is_streamed(data):
+    """Whether object data has to be uploaded through request_stream."""
+    return data is not None and not isinstance(data, basestring)
+
+
+class _FileSegment(object):
+    """Reads `length` bytes at `offset` of a file shared with the other
+    segments, each read seeking under the file's lock."""
+
+    def __init__(self, source, lock, offset, length):
+        self._source = source
+        self._lock = lock
+        self._offset = offset
+        self._length = length
+        self._read = 0
+
+    def read(self, size):
+        size = min(size, self._length - self._read)
+        if size <= 0:
+            return ''
+        with self._lock:
+            self._source.seek(self._offset + self._read)
+            chunk = self._source.read(size)
+        self._read += len(chunk)
+        return chunk
+
+
+def _join_chunks(chunks, size):
+    """Regroups an iterable of strings into strings of `size` bytes."""
+    parts = []
+    buffered = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        buffered += len(chunk)
+        while buffered >= size:
+            data = ''.join(parts)
+            yield data[:size]
+            parts = [data[size:]]
+            buffered -= size
+    if buffered:
+        yield ''.join(parts)
+
+
+def iter_segments(data, segment_size):
+    """
+    Splits object data into (body, length) segments of `segment_size`
+    bytes, which are read lazily.
+
+    Strings and memory-mapped files are sliced with buffers, regular files
+    are read at each segment's offset. Other file objects and iterables can
+    only be read in order, each segment is read into memory in turn.
+    """
+    if isinstance(data, unicode):
+        data = data.encode('utf-8')
+    length = http.body_length(data)
+    if isinstance(data, (str, buffer, mmap.mmap)):
+        for offset in xrange(0, length, segment_size):
+            body = buffer(data, offset, segment_size)
+            yield body, len(body)
+    elif length is not None and hasattr(data, 'seek'):
+        lock = threading.Lock()
+        start = data.tell()
+        for offset in xrange(0, length, segment_size):
+            size = min(segment_size, length - offset)
+            yield _FileSegment(data, lock, start + offset, size), size
+    else:
+        if hasattr(data, 'read'):
+            data = iter(lambda: data.read(segment_size), '')
+        for body in _join_chunks(data, segment_size):
+            yield body, len(body)
+
+
 class ObjectClient(RestClient):
     def __init__(self, config, username, password, auth_url, tenant_name=None):
         super(ObjectClient, self).__init__(config, username, password,
@@ -29,16 +140,27 @@ class ObjectClient(RestClient):
 
         self.service = self.config.object_storage.catalog_type
 
-    def create_object(self, container, object_name, data):
-        """Create storage object."""
+    def create_object(self, container, object_name, data,
+                      chunk_size=http.CHUNK_SIZE):
+        """
+        Create storage object.
+
+        `data` may be a string, or a file object, a memory-mapped file or
+        any iterable of strings, which are streamed `chunk_size` bytes at a
+        time instead of being loaded into memory.
+        """
 
         url = "%s/%s" % (str(container), str(object_name))
+        if is_streamed(data):
+            resp, body = self.request_stream('PUT', url, dict(self.headers),
+                                             data, chunk_size=chunk_size)
+            return resp, body.read()
         resp, body = self.put(url, data, self.headers)
         return resp, body
 
     def update_object(self, container, object_name, data):
         """Upload data to replace current storage object."""
-        return create_object(container, object_name, data)
+        return self.create_object(container, object_name, data)
 
     def delete_object(self, container, object_name):
         """Delete storage object."""
@@ -65,10 +187,20 @@ class ObjectClient(RestClient):
         resp, body = self.head(url)
         return resp, body
 
-    def get_object(self, container, object_name):
-        """Retrieve object's data."""
+    def get_object(self, container, object_name, stream=False,
+                   chunk_size=http.CHUNK_SIZE):
+        """
+        Retrieve object's data.
+
+        With stream=True the data is not read before returning; the body
+        returned is an ObjectStream yielding it in chunks of `chunk_size`.
+        """
 
         url = "{0}/{1}".format(container, object_name)
+        if stream:
+            resp, body = self.request_stream('GET', url,
+                                             chunk_size=chunk_size)
+            return resp, ObjectStream(url, resp, body)
         resp, body = self.get(url)
         return resp, body
 
@@ -120,6 +252,142 @@ class ObjectClient(RestClient):
         resp, body = self.copy(url, headers=headers)
         return resp, body
 
+    def create_segmented_object(self, container, object_name, data,
+                                segment_size=None, segment_container=None,
+                                concurrency_level=None):
+        """
+        Uploads a large object as concurrently uploaded segments.
+
+        `data`, anything create_object accepts, is split into segments of
+        `segment_size` bytes stored as '<object_name>/<index>' in
+        `segment_container` (default: `container`). At most
+        `concurrency_level` segments are uploaded, and held in memory, at
+        once. A manifest object pointing at the segments is then created.
+
+        Returns the response of the manifest creation.
+        """
+        os_config = self.config.object_storage
+        segment_size = segment_size or os_config.segment_size
+        concurrency_level = concurrency_level or os_config.concurrency
+        segment_container = segment_container or container
+        prefix = '%s/' % object_name
+
+        def upload(segment):
+            index, (body, length) = segment
+            url = '%s/%s%08d' % (segment_container, prefix, index)
+            headers = dict(self.headers)
+            headers['Content-Length'] = str(length)
+            resp, resp_body = self.request_stream('PUT', url, headers, body)
+            resp_body.read()
+            return resp
+
+        concurrency.raise_first_error(concurrency.run_concurrently(
+            upload, enumerate(iter_segments(data, segment_size)),
+            concurrency_level, stop_on_error=True))
+
+        url = '%s/%s' % (container, object_name)
+        headers = {'X-Object-Manifest': '%s/%s' % (segment_container,
+                                                   prefix)}
+        resp, body = self.put(url, '', headers)
+        return resp, body
+
+    def create_objects(self, container, objects, concurrency_level=None):
+        """
+        Creates many objects concurrently.
+
+        `objects` is a dict, or an iterable of (name, data) tuples, data
+        being anything create_object accepts.
+
+        Returns a (responses, errors) tuple of dicts keyed by object name.
+        """
+        if hasattr(objects, 'iteritems'):
+            objects = objects.iteritems()
+        return concurrency.map_keyed(
+            lambda name, data: self.create_object(container, name, data)[0],
+            ((name, (name, data)) for name, data in objects),
+            concurrency_level or self.config.object_storage.concurrency)
+
+    def delete_objects(self, container, object_names,
+                       concurrency_level=None):
+        """
+        Deletes many objects concurrently.
+
+        Returns a (responses, errors) tuple of dicts keyed by object name.
+        """
+        return concurrency.map_keyed(
+            lambda name: self.delete_object(container, name)[0],
+            ((name, (name,)) for name in object_names),
+            concurrency_level or self.config.object_storage.concurrency)
+
+    def copy_objects(self, src_container, dst_container, object_names,
+                     metadata=None, concurrency_level=None):
+        """
+        Copies many objects concurrently.
+
+        `object_names` holds names, copied under the same name, or
+        (source name, destination name) tuples.
+
+        Returns a (responses, errors) tuple of dicts keyed by destination
+        object name.
+        """
+        def copy(src_name, dst_name):
+            resp, body = self.copy_object_across_containers(
+                src_container, src_name, dst_container, dst_name, metadata)
+            return resp
+
+        def pairs():
+            for name in object_names:
+                if isinstance(name, basestring):
+                    name = (name, name)
+                yield name[1], name
+
+        return concurrency.map_keyed(
+            copy, pairs(),
+            concurrency_level or self.config.object_storage.concurrency)
+
+    def get_object_ranges(self, container, object_name, dest=None,
+                          range_size=None, concurrency_level=None):
+        """
+        Downloads an object with concurrent ranged GETs.
+
+        The object is fetched in ranges of `range_size` bytes, at most
+        `concurrency_level` at once. Each range is written at its offset in
+        `dest`, a seekable file object, as soon as it arrives; without
+        `dest` the ranges are joined into a string.
+
+        Returns the HEAD response of the object and `dest` or the data.
+        """
+        os_config = self.config.object_storage
+        range_size = range_size or os_config.segment_size
+        concurrency_level = concurrency_level or os_config.concurrency
+        url = '%s/%s' % (container, object_name)
+        resp, _body = self.head(url)
+        size = int(resp['content-length'])
+        start = dest.tell() if dest is not None else 0
+        lock = threading.Lock()
+
+        def fetch(offset):
+            last = min(offset + range_size, size) - 1
+            headers = {'Range': 'bytes=%d-%d' % (offset, last)}
+            _resp, body = self.get(url, headers=headers)
+            if len(body) != last - offset + 1:
+                raise exceptions.TempestException(
+                    'Range %d-%d of %s returned %d bytes' %
+                    (offset, last, url, len(body)))
+            if dest is None:
+                return body
+            with lock:
+                dest.seek(start + offset)
+                dest.write(body)
+
+        chunks = concurrency.raise_first_error(concurrency.run_concurrently(
+            fetch, xrange(0, size, range_size), concurrency_level,
+            stop_on_error=True))
+        if dest is None:
+            return resp, ''.join(chunks)
+        dest.seek(start + size)
+        return resp, dest
+
 
 class ObjectClientCustomizedHeader(RestClient):
 
@@ -133,35 +401,62 @@ class ObjectClientCustomizedHeader(RestClient):
 
     def request(self, method, url, headers=None, body=None, wait=None):
         """A simple HTTP request interface."""
-        self.http_obj = httplib2.Http()
         if headers is None:
             headers = {}
         if self.base_url is None:
             self._set_auth()
 
         req_url = "%s/%s" % (self.base_url, url)
-        resp, resp_body = self.http_obj.request(req_url, method,
-                                                headers=headers, body=body)
+        resp, resp_body = self._send(method, req_url, headers, body,
+                                     disable_ssl_certificate_validation=False)
 
         if resp.status == 401 or resp.status == 403:
-            self._log(req_url, body, resp, resp_body)
             raise exceptions.Unauthorized()
 
         return resp, resp_body
 
-    def get_object(self, container, object_name, metadata=None):
-        """Retrieve object's data."""
+    def request_stream(self, method, url, headers=None, body=None,
+                       chunk_size=http.CHUNK_SIZE):
+        """A simple HTTP request interface returning a ResponseStream."""
+        if headers is None:
+            headers = {}
+        if self.base_url is None:
+            self._set_auth()
+
+        req_url = "%s/%s" % (self.base_url, url)
+        start = time.time()
+        resp, stream = self.http_pool.open_stream(
+            req_url, method, headers=headers, body=body,
+            chunk_size=chunk_size, disable_ssl_certificate_validation=False)
+
+        if resp.status == 401 or resp.status == 403:
+            self.trace.record(method, req_url, body, resp, stream.read(),
+                              time.time() - start)
+            raise exceptions.Unauthorized()
+
+        self.trace.record(method, req_url, body, resp, None,
+                          time.time() - start)
+        return resp, stream
+
+    def get_object(self, container, object_name, metadata=None, stream=False,
+                   chunk_size=http.CHUNK_SIZE):
+        """Retrieve object's data, as an ObjectStream if stream is True."""
         headers = {}
         if metadata:
             for key in metadata:
                 headers[str(key)] = metadata[key]
 
         url = "{0}/{1}".format(container, object_name)
+        if stream:
+            resp, body = self.request_stream('GET', url, headers=headers,
+                                             chunk_size=chunk_size)
+            return resp, ObjectStream(url, resp, body)
         resp, body = self.get(url, headers=headers)
         return resp, body
 
-    def create_object(self, container, object_name, data, metadata=None):
-        """Create storage object."""
+    def create_object(self, container, object_name, data, metadata=None,
+                      chunk_size=http.CHUNK_SIZE):
+        """Create storage object, streaming `data` unless it is a string."""
 
         headers = {}
         if metadata:
@@ -169,6 +464,10 @@ class ObjectClientCustomizedHeader(RestClient):
                 headers[str(key)] = metadata[key]
 
         url = "%s/%s" % (str(container), str(object_name))
+        if is_streamed(data):
+            resp, body = self.request_stream('PUT', url, headers, data,
+                                             chunk_size=chunk_size)
+            return resp, body.read()
         resp, body = self.put(url, data, headers=headers)
         return resp, body
 
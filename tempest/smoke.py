@@ -17,6 +17,7 @@
 
 import logging
 
+from tempest.common import teardown
 from tempest import test
 
 LOG = logging.getLogger(__name__)
@@ -49,37 +50,37 @@ class DefaultClientSmokeTest(test.DefaultClientTest, SmokeTest):
     def tearDownClass(cls):
         # NOTE(jaypipes): Because smoke tests are typically run in a specific
         # order, and because test methods in smoke tests generally create
-        # resources in a particular order, we destroy resources in the reverse
-        # order in which resources are added to the smoke test class object
-        while cls.resources:
-            thing = cls.resources.pop()
+        # resources in a particular order, the resources declared with
+        # set_resource which ones have to be deleted before them; the ones
+        # independent of each other are deleted concurrently.
+        def delete(thing):
             LOG.debug("Deleting %r from shared resources of %s" %
                       (thing, cls.__name__))
-
             try:
                 # OpenStack resources are assumed to have a delete()
                 # method which destroys the resource...
                 thing.delete()
             except Exception as e:
                 # If the resource is already missing, mission accomplished.
-                if e.__class__.__name__ == 'NotFound':
-                    continue
-                raise
+                if e.__class__.__name__ != 'NotFound':
+                    raise
 
-            def is_deletion_complete():
-                # Deletion testing is only required for objects whose
-                # existence cannot be checked via retrieval.
-                if isinstance(thing, dict):
+        def is_deletion_complete(thing):
+            # Deletion testing is only required for objects whose
+            # existence cannot be checked via retrieval.
+            if isinstance(thing, dict):
+                return True
+            try:
+                thing.get()
+            except Exception as e:
+                # Clients are expected to return an exception
+                # called 'NotFound' if retrieval fails.
+                if e.__class__.__name__ == 'NotFound':
                     return True
-                try:
-                    thing.get()
-                except Exception as e:
-                    # Clients are expected to return an exception
-                    # called 'NotFound' if retrieval fails.
-                    if e.__class__.__name__ == 'NotFound':
-                        return True
-                    raise
-                return False
+                raise
+            return False
 
-            # Block until resource deletion has completed or timed-out
-            test.call_until_true(is_deletion_complete, 10, 1)
+        graph = cls.resource_cleanups(delete, is_deletion_complete)
+        del cls.resources[:]
+        # Deletions still in progress after 10 seconds are not waited for
+        teardown.raise_failures(graph.run(check_timeout=10))
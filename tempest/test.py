@@ -16,10 +16,11 @@
 #    under the License.
 
 import logging
-import time
 
 import unittest2 as unittest
 
+from tempest.common import polling
+from tempest.common import teardown
 from tempest import manager
 
 LOG = logging.getLogger(__name__)
@@ -46,12 +47,32 @@ class TestCase(unittest.TestCase):
             setattr(cls, attr_name, client)
         cls.resource_keys = {}
         cls.resources = []
+        # Maps a resource key to the keys of the resources which have to
+        # be deleted before it
+        cls.resource_dependencies = {}
 
-    def set_resource(self, key, thing):
+    def set_resource(self, key, thing, delete_before=()):
+        """
+        Adds a shared resource, deleted when the test class is torn down.
+
+        Setting a key again replaces the resource it referred to.
+
+        :param delete_before: keys of the resources which can only be
+                              deleted once this one is, e.g. the network
+                              of a server
+        """
         LOG.debug("Adding %r to shared resources of %s" %
                   (thing, self.__class__.__name__))
+        if key in self.resource_keys:
+            self.resources.remove(self.resource_keys[key])
         self.resource_keys[key] = thing
         self.resources.append(thing)
+        for other in delete_before:
+            self.add_resource_dependency(key, other)
+
+    def add_resource_dependency(self, key, delete_before):
+        """Deletes the resource `delete_before` only once `key` is."""
+        self.resource_dependencies.setdefault(delete_before, set()).add(key)
 
     def get_resource(self, key):
         return self.resource_keys[key]
@@ -60,6 +81,27 @@ class TestCase(unittest.TestCase):
         thing = self.resource_keys[key]
         self.resources.remove(thing)
         del self.resource_keys[key]
+        self.resource_dependencies.pop(key, None)
+
+    @classmethod
+    def resource_cleanups(cls, delete, check=None):
+        """
+        Returns a teardown.CleanUpGraph deleting the shared resources,
+        concurrently but for the dependencies declared with set_resource.
+
+        :param delete: called with every resource to delete
+        :param check: optional, called with every deleted resource until it
+                      returns True, meaning the deletion completed
+        """
+        graph = teardown.CleanUpGraph()
+        keys = dict((id(thing), key)
+                    for key, thing in cls.resource_keys.items())
+        for thing in cls.resources:
+            key = keys.get(id(thing), id(thing))
+            graph.add(key, delete, (thing,),
+                      check=check and (lambda thing=thing: check(thing)),
+                      after=cls.resource_dependencies.get(key, ()))
+        return graph
 
 
 def call_until_true(func, duration, sleep_for):
@@ -71,17 +113,15 @@ def call_until_true(func, duration, sleep_for):
     :param func: A zero argument callable that returns True on success.
     :param duration: The number of seconds for which to attempt a successful
                      call of the function.
-    :param sleep_for: The number of seconds to sleep after an unsuccessful
-                      invocation of the function.
+    :param sleep_for: The longest number of seconds to sleep after an
+                      unsuccessful invocation of the function; the first
+                      retries come sooner.
     """
-    now = time.time()
-    timeout = now + duration
-    while now < timeout:
+    poller = polling.Poller(duration, polling.BackoffPolicy(cap=sleep_for))
+    for elapsed in poller:
         if func():
             return True
-        LOG.debug("Sleeping for %d seconds", sleep_for)
-        time.sleep(sleep_for)
-        now = time.time()
+        LOG.debug("Condition not met after %.1f seconds", elapsed)
     return False
 
 
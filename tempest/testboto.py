@@ -27,6 +27,9 @@ from boto.s3.key import Key
 import nose
 import unittest2 as unittest
 
+from tempest.common import keypairs
+from tempest.common import ssh
+from tempest.common import teardown
 from tempest.exceptions import TearDownException
 import tempest.tests.boto
 from tempest.tests.boto.utils.wait import re_search_wait
@@ -128,6 +131,8 @@ class BotoTestCase(unittest.TestCase):
         # The trash contains cleanup functions and paramaters in tuples
         # (function, *args, **kwargs)
         cls._resource_trash_bin = {}
+        # Maps a trash key to the keys which have to be cleaned up first
+        cls._resource_dependencies = {}
         cls._sequence = -1
         if (hasattr(cls, "EC2") and
             tempest.tests.boto.EC2_CAN_CONNECT_ERROR is not None):
@@ -146,10 +151,18 @@ class BotoTestCase(unittest.TestCase):
         cls._resource_trash_bin[cls._sequence] = (function, args, kwargs)
         return cls._sequence
 
+    @classmethod
+    def addResourceCleanUpDependency(cls, key, depends_on):
+        """The CleanUp `key` starts only after `depends_on` completed,
+        e.g. a volume is deleted after the instance it is attached to.
+        CleanUps without dependencies between them run concurrently."""
+        cls._resource_dependencies.setdefault(key, set()).add(depends_on)
+
     @classmethod
     def cancelResourceCleanUp(cls, key):
         """Cancel Clean up request."""
         del cls._resource_trash_bin[key]
+        cls._resource_dependencies.pop(key, None)
 
     #TODO(afazekas): Add "with" context handling
     def assertBotoError(self, excMatcher, callableObj,
@@ -170,24 +183,26 @@ class BotoTestCase(unittest.TestCase):
 
     @classmethod
     def tearDownClass(cls):
-        """ Calls the callables added by addResourceCleanUp,
+        """ Calls the callables added by addResourceCleanUp, concurrently
+        but in the order given by addResourceCleanUpDependency,
         when you overwire this function dont't forget to call this too"""
-        fail_count = 0
-        trash_keys = sorted(cls._resource_trash_bin, reverse=True)
-        for key in trash_keys:
-            (function, pos_args, kw_args) = cls._resource_trash_bin[key]
-            try:
-                LOG.debug("Cleaning up: %s" %
-                          friendly_function_call_str(function, *pos_args,
-                                                     **kw_args))
-                function(*pos_args, **kw_args)
-            except BaseException as exc:
-                fail_count += 1
-                LOG.exception(exc)
-            finally:
-                del cls._resource_trash_bin[key]
-        if fail_count:
-            raise TearDownException(num=fail_count)
+        graph = teardown.CleanUpGraph()
+        for key, (function, pos_args, kw_args) in \
+                cls._resource_trash_bin.items():
+            LOG.debug("Scheduling clean up: %s" %
+                      friendly_function_call_str(function, *pos_args,
+                                                 **kw_args))
+            graph.add(key, function, pos_args, kw_args,
+                      after=cls._resource_dependencies.get(key, ()))
+        try:
+            failures = graph.run()
+        finally:
+            cls._resource_trash_bin.clear()
+            cls._resource_dependencies.clear()
+            ssh.close_connections()
+            keypairs.close_key_pool()
+        if failures:
+            raise TearDownException(num=len(failures))
 
     ec2_error_code = BotoExceptionMatcher()
     # InsufficientInstanceCapacity can be both server and client error
@@ -31,6 +31,10 @@ A_I_IMAGES_READY = False  # ari,ami,aki
 S3_CAN_CONNECT_ERROR = "Unknown Error"
 EC2_CAN_CONNECT_ERROR = "Unknown Error"
 
+# The tests work in the configured demo tenant rather than in isolated
+# tenants. The package fixture makes parallel runs (nosetests --processes)
+# hand the whole package to a single worker, so they never race.
+
 
 def setup_package():
     global A_I_IMAGES_READY
@@ -24,6 +24,7 @@ from nose.plugins.attrib import attr
 import unittest2 as unittest
 
 from tempest import clients
+from tempest.common import keypairs
 from tempest.common.utils.data_utils import rand_name
 from tempest.common.utils.linux.remote_client import RemoteClient
 from tempest.exceptions import EC2RegisterImageException
@@ -57,13 +58,17 @@ class InstanceRunTest(BotoTestCase):
         cls.instance_type = config.boto.instance_type
         cls.bucket_name = rand_name("s3bucket-")
         cls.keypair_name = rand_name("keypair-")
-        cls.keypair = cls.ec2_client.create_key_pair(cls.keypair_name)
+        public_key, private_key = keypairs.get_key_pool(config).get()
+        cls.keypair = cls.ec2_client.import_key_pair(cls.keypair_name,
+                                                     public_key)
+        # imported key pairs come back without their private key
+        cls.keypair.material = private_key
         cls.addResourceCleanUp(cls.ec2_client.delete_key_pair,
                                cls.keypair_name)
         bucket = cls.s3_client.create_bucket(cls.bucket_name)
-        cls.addResourceCleanUp(cls.destroy_bucket,
-                               cls.s3_client.connection_data,
-                               cls.bucket_name)
+        bucket_cleanup = cls.addResourceCleanUp(cls.destroy_bucket,
+                                                cls.s3_client.connection_data,
+                                                cls.bucket_name)
         s3_upload_dir(bucket, cls.materials_path)
         cls.images = {"ami":
                       {"name": rand_name("ami-name-"),
@@ -78,8 +83,9 @@ class InstanceRunTest(BotoTestCase):
             image["image_id"] = cls.ec2_client.register_image(
                                 name=image["name"],
                                 image_location=image["location"])
-            cls.addResourceCleanUp(cls.ec2_client.deregister_image,
-                                   image["image_id"])
+            image_cleanup = cls.addResourceCleanUp(
+                cls.ec2_client.deregister_image, image["image_id"])
+            cls.addResourceCleanUpDependency(bucket_cleanup, image_cleanup)
 
         for image in cls.images.itervalues():
             def _state():
@@ -145,8 +151,8 @@ class InstanceRunTest(BotoTestCase):
         group_desc = sec_group_name + " security group description "
         security_group = self.ec2_client.create_security_group(sec_group_name,
                                                                group_desc)
-        self.addResourceCleanUp(self.destroy_security_group_wait,
-                                security_group)
+        group_cleanup = self.addResourceCleanUp(
+            self.destroy_security_group_wait, security_group)
         self.ec2_client.authorize_security_group(sec_group_name,
                                                  ip_protocol="icmp",
                                                  cidr_ip="0.0.0.0/0",
@@ -162,10 +168,13 @@ class InstanceRunTest(BotoTestCase):
                                     instance_type=self.instance_type,
                                     key_name=self.keypair_name,
                                     security_groups=(sec_group_name,))
-        self.addResourceCleanUp(self.destroy_reservation,
-                                reservation)
+        reservation_cleanup = self.addResourceCleanUp(
+            self.destroy_reservation, reservation)
+        self.addResourceCleanUpDependency(group_cleanup, reservation_cleanup)
         volume = self.ec2_client.create_volume(1, self.zone)
-        self.addResourceCleanUp(self.destroy_volume_wait, volume)
+        volume_cleanup = self.addResourceCleanUp(self.destroy_volume_wait,
+                                                 volume)
+        self.addResourceCleanUpDependency(volume_cleanup, reservation_cleanup)
         instance = reservation.instances[0]
 
         def _instance_state():
@@ -182,9 +191,11 @@ class InstanceRunTest(BotoTestCase):
 
         address = self.ec2_client.allocate_address()
         rcuk_a = self.addResourceCleanUp(address.delete)
+        self.addResourceCleanUpDependency(reservation_cleanup, rcuk_a)
         address.associate(instance.id)
 
         rcuk_da = self.addResourceCleanUp(address.disassociate)
+        self.addResourceCleanUpDependency(rcuk_a, rcuk_da)
         #TODO(afazekas): ping test. dependecy/permission ?
 
         self.assertVolumeStatusWait(_volume_state, "available")
@@ -65,7 +65,8 @@ class EC2VolumesTest(BotoTestCase):
     def test_create_volme_from_snapshot(self):
         # EC2 Create volume from snapshot
         volume = self.client.create_volume(1, self.zone)
-        self.addResourceCleanUp(self.client.delete_volume, volume.id)
+        volume_cleanup = self.addResourceCleanUp(self.client.delete_volume,
+                                                 volume.id)
 
         def _status():
             volume.update(validate=True)
@@ -73,7 +74,9 @@ class EC2VolumesTest(BotoTestCase):
 
         self.assertVolumeStatusWait(_status, "available")
         snap = self.client.create_snapshot(volume.id)
-        self.addResourceCleanUp(self.destroy_snapshot_wait, snap)
+        snap_cleanup = self.addResourceCleanUp(self.destroy_snapshot_wait,
+                                               snap)
+        self.addResourceCleanUpDependency(volume_cleanup, snap_cleanup)
 
         def _snap_status():
             snap.update(validate=True)
@@ -83,6 +86,7 @@ class EC2VolumesTest(BotoTestCase):
 
         svol = self.client.create_volume(1, self.zone, snapshot=snap)
         cuk = self.addResourceCleanUp(svol.delete)
+        self.addResourceCleanUpDependency(snap_cleanup, cuk)
 
         def _snap_vol_status():
             svol.update(validate=True)
@@ -53,9 +53,9 @@ class S3ImagesTest(BotoTestCase):
         cls.ari_path = cls.materials_path + os.sep + cls.ari_manifest
         cls.bucket_name = rand_name("bucket-")
         bucket = cls.s3_client.create_bucket(cls.bucket_name)
-        cls.addResourceCleanUp(cls.destroy_bucket,
-                               cls.s3_client.connection_data,
-                               cls.bucket_name)
+        cls.bucket_cleanup = cls.addResourceCleanUp(
+            cls.destroy_bucket, cls.s3_client.connection_data,
+            cls.bucket_name)
         s3_upload_dir(bucket, cls.materials_path)
 
     #Note(afazekas): Without the normal status change test!
@@ -73,6 +73,8 @@ class S3ImagesTest(BotoTestCase):
         image["cleanUp"] = self.addResourceCleanUp(
                                 self.images_client.deregister_image,
                                 image["image_id"])
+        self.addResourceCleanUpDependency(self.bucket_cleanup,
+                                          image["cleanUp"])
         self.assertEqual(image["image_id"][0:3], image["type"])
         retrieved_image = self.images_client.get_image(image["image_id"])
         self.assertTrue(retrieved_image.name == image["name"])
@@ -100,6 +102,8 @@ class S3ImagesTest(BotoTestCase):
         image["cleanUp"] = self.addResourceCleanUp(
                                 self.images_client.deregister_image,
                                 image["image_id"])
+        self.addResourceCleanUpDependency(self.bucket_cleanup,
+                                          image["cleanUp"])
         self.assertEqual(image["image_id"][0:3], image["type"])
         retrieved_image = self.images_client.get_image(image["image_id"])
         self.assertTrue(retrieved_image.name == image["name"])
@@ -128,6 +132,8 @@ class S3ImagesTest(BotoTestCase):
         image["cleanUp"] = self.addResourceCleanUp(
                                 self.images_client.deregister_image,
                                 image["image_id"])
+        self.addResourceCleanUpDependency(self.bucket_cleanup,
+                                          image["cleanUp"])
         self.assertEqual(image["image_id"][0:3], image["type"])
         retrieved_image = self.images_client.get_image(image["image_id"])
         self.assertIn(retrieved_image.state, self.valid_image_state)
@@ -16,22 +16,30 @@
 #    under the License.
 
 import logging
-import re
-import time
 
 from boto.exception import BotoServerError
 from unittest2 import TestCase
 
+from tempest.common import console
+from tempest.common import polling
 import tempest.config
 
 LOG = logging.getLogger(__name__)
 
-_boto_config = tempest.config.TempestConfig().boto
+_config = tempest.config.TempestConfig()
+
+_boto_config = _config.boto
 
 default_timeout = _boto_config.build_timeout
 
 default_check_interval = _boto_config.build_interval
 
+_policy = polling.BackoffPolicy.from_config(_config, default_check_interval)
+
+
+def _get_poller():
+    return polling.Poller(default_timeout, _policy)
+
 
 def state_wait(lfunction, final_set=set(), valid_set=None):
     #TODO(afazekas): evaluate using ABC here
@@ -39,53 +47,59 @@ def state_wait(lfunction, final_set=set(), valid_set=None):
         final_set = set((final_set,))
     if not isinstance(valid_set, set) and valid_set is not None:
         valid_set = set((valid_set,))
-    start_time = time.time()
+    poller = _get_poller()
     old_status = status = lfunction()
     while True:
         if status != old_status:
             LOG.info('State transition "%s" ==> "%s" %d second', old_status,
-                     status, time.time() - start_time)
+                     status, poller.elapsed())
         if status in final_set:
             return status
         if valid_set is not None and status not in valid_set:
             return status
-        dtime = time.time() - start_time
-        if dtime > default_timeout:
+        dtime = poller.elapsed()
+        if poller.expired():
             raise TestCase.failureException("State change timeout exceeded!"
                                             '(%ds) While waiting'
                                             'for %s at "%s"' %
                                             (dtime,
                                             final_set, status))
-        time.sleep(default_check_interval)
+        poller.sleep()
         old_status = status
         status = lfunction()
 
 
 def re_search_wait(lfunction, regexp):
-    """Stops waiting on success."""
-    start_time = time.time()
+    """
+    Stops waiting on success.
+
+    `lfunction` returns the whole, usually growing, text every time, but
+    only the part appended since the previous call is searched again.
+    """
+    poller = _get_poller()
+    scanner = console.PatternScanner(regexp)
     while True:
         text = lfunction()
-        result = re.search(regexp, text)
+        result = scanner.feed_full(text)
         if result is not None:
             LOG.info('Pattern "%s" found in %d second in "%s"',
                      regexp,
-                     time.time() - start_time,
+                     poller.elapsed(),
                      text)
             return result
-        dtime = time.time() - start_time
-        if dtime > default_timeout:
+        dtime = poller.elapsed()
+        if poller.expired():
             raise TestCase.failureException('Pattern find timeout exceeded!'
                                             '(%ds) While waiting for'
                                             '"%s" pattern in "%s"' %
                                             (dtime,
                                             regexp, text))
-        time.sleep(default_check_interval)
+        poller.sleep()
 
 
 def wait_no_exception(lfunction, exc_class=None, exc_matcher=None):
     """Stops waiting on success."""
-    start_time = time.time()
+    poller = _get_poller()
     if exc_matcher is not None:
         exc_class = BotoServerError
 
@@ -96,7 +110,7 @@ def wait_no_exception(lfunction, exc_class=None, exc_matcher=None):
         try:
             result = lfunction()
             LOG.info('No Exception in %d second',
-                     time.time() - start_time)
+                     poller.elapsed())
             return result
         except exc_class as exc:
             if exc_matcher is not None:
@@ -105,28 +119,28 @@ def wait_no_exception(lfunction, exc_class=None, exc_matcher=None):
                     LOG.info(res)
                     raise exc
         # Let the other exceptions propagate
-        dtime = time.time() - start_time
-        if dtime > default_timeout:
+        dtime = poller.elapsed()
+        if poller.expired():
             raise TestCase.failureException("Wait timeout exceeded! (%ds)" %
                                             dtime)
-        time.sleep(default_check_interval)
+        poller.sleep()
 
 
 #NOTE(afazekas): EC2/boto normally raise exception instead of empty list
 def wait_exception(lfunction):
     """Returns with the exception or raises one."""
-    start_time = time.time()
+    poller = _get_poller()
     while True:
         try:
             lfunction()
         except BaseException as exc:
             LOG.info('Exception in %d second',
-                     time.time() - start_time)
+                     poller.elapsed())
             return exc
-        dtime = time.time() - start_time
-        if dtime > default_timeout:
+        dtime = poller.elapsed()
+        if poller.expired():
             raise TestCase.failureException("Wait timeout exceeded! (%ds)" %
                                             dtime)
-        time.sleep(default_check_interval)
+        poller.sleep()
 
 #TODO(afazekas): consider strategy design pattern..
@@ -0,0 +1,113 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+import Queue
+import uuid
+
+from nose.plugins.attrib import attr
+import unittest2 as unittest
+
+from tempest.common import creds_pool
+
+POOL_SIZE = 2
+
+
+class Section(object):
+
+    def __init__(self, **options):
+        self.__dict__.update(options)
+
+
+class FakeConfig(object):
+
+    compute = Section(isolated_creds_pool_size=POOL_SIZE,
+                      allow_tenant_reuse=False)
+    identity = Section(auth_url='http://127.0.0.1:5000/v2.0/')
+
+
+class FakeAdminClient(object):
+
+    """Identity admin client which reports the tenants it deletes."""
+
+    def __init__(self, deleted):
+        self.deleted = deleted
+
+    def create_tenant(self, name, description):
+        return {}, {'id': uuid.uuid4().hex, 'name': name,
+                    'description': description}
+
+    def create_user(self, name, password, tenant_id, email):
+        return {}, {'id': uuid.uuid4().hex, 'name': name}
+
+    def list_user_roles(self, tenant_id, user_id):
+        return {}, []
+
+    def delete_user(self, user_id):
+        pass
+
+    def delete_tenant(self, tenant_id):
+        self.deleted.put(tenant_id)
+
+
+def _lease_all(deleted, leased):
+    pool = creds_pool.get_pool(FakeConfig)
+    pool._admin_client_factory = lambda: FakeAdminClient(deleted)
+    for index in range(POOL_SIZE):
+        leased.put(pool.lease().tenant['id'])
+
+
+def _drain(queue):
+    items = set()
+    while True:
+        try:
+            items.add(queue.get(timeout=0.5))
+        except Queue.Empty:
+            return items
+
+
+class CredentialPoolProcessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(setattr, creds_pool, '_pools', creds_pool._pools)
+        creds_pool._pools = {}
+
+    @attr(type='positive')
+    def test_processes_never_lease_the_same_tenant(self):
+        deleted = multiprocessing.Queue()
+        leased = multiprocessing.Queue()
+        pool = creds_pool.get_pool(FakeConfig)
+        pool._admin_client_factory = lambda: FakeAdminClient(deleted)
+        # filled before the fork, like a package fixture of the main
+        # process would
+        pool.fill()
+        ours = set(creds.tenant['id'] for creds in pool._free)
+        self.addCleanup(pool.close)
+
+        worker = multiprocessing.Process(target=_lease_all,
+                                         args=(deleted, leased))
+        worker.start()
+        worker.join(30)
+        self.assertEqual(0, worker.exitcode)
+
+        theirs = _drain(leased)
+        self.assertEqual(POOL_SIZE, len(theirs))
+        self.assertFalse(ours & theirs)
+        # the worker deleted its own credentials when it exited
+        self.assertEqual(theirs, _drain(deleted))
+        self.assertEqual(ours, set(creds.tenant['id']
+                                   for creds in pool._free))
@@ -0,0 +1,62 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from nose.plugins.attrib import attr
+import unittest2 as unittest
+
+from tempest.common import rate_limit
+from tempest import exceptions
+
+
+def _rate(regex, verb, value, unit):
+    return {'regex': regex,
+            'limit': [{'verb': verb, 'value': value, 'unit': unit,
+                       'remaining': value}]}
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = rate_limit.RateLimiter()
+
+    @attr(type='positive')
+    def test_day_limit_is_advisory(self):
+        self.limiter.set_rate_limits([_rate('^/servers', 'POST', 2, 'DAY')])
+        for index in range(5):
+            self.assertEqual(0, self.limiter.acquire('POST', '/servers',
+                                                     max_wait=0))
+
+    @attr(type='positive')
+    def test_hour_limit_is_advisory(self):
+        self.limiter.set_rate_limits([_rate('.*', 'GET', 1, 'HOUR')])
+        for index in range(3):
+            self.assertEqual(0, self.limiter.acquire('GET', '/flavors',
+                                                     max_wait=0))
+
+    @attr(type='negative')
+    def test_minute_limit_is_paced(self):
+        self.limiter.set_rate_limits([_rate('^/servers', 'POST', 2, 'DAY'),
+                                      _rate('.*', 'POST', 2, 'MINUTE')])
+        for index in range(2):
+            self.assertEqual(0, self.limiter.acquire('POST', '/servers',
+                                                     max_wait=0))
+        self.assertRaises(exceptions.RateLimitExceeded,
+                          self.limiter.acquire, 'POST', '/servers',
+                          max_wait=0)
+        # other verbs are not covered by the limit
+        self.assertEqual(0, self.limiter.acquire('GET', '/servers',
+                                                 max_wait=0))
@@ -0,0 +1,178 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import Queue
+import threading
+import time
+
+from nose.plugins.attrib import attr
+import unittest2 as unittest
+
+from tempest.common import teardown as cleanup
+
+
+class Recorder(object):
+
+    """Cleanups that log when they start and end, and fail on demand."""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def _log(self, event, key):
+        with self._lock:
+            self.events.append((event, key))
+
+    def cleanup(self, key, duration=0, error=None):
+        def function():
+            self._log('start', key)
+            time.sleep(duration)
+            self._log('end', key)
+            if error is not None:
+                raise error
+        function.__name__ = 'delete_%s' % key
+        return function
+
+    def index(self, event, key):
+        return self.events.index((event, key))
+
+    def started(self, key):
+        return ('start', key) in self.events
+
+
+class CleanUpGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.recorder = Recorder()
+        self.graph = cleanup.CleanUpGraph()
+
+    def add(self, key, duration=0, error=None, **kwargs):
+        self.graph.add(key, self.recorder.cleanup(key, duration, error),
+                       **kwargs)
+
+    def run_graph(self, **kwargs):
+        kwargs.setdefault('check_interval', 0.01)
+        return self.graph.run(**kwargs)
+
+    def assertBefore(self, first, then):
+        self.assertLess(self.recorder.index('end', first),
+                        self.recorder.index('start', then))
+
+    @attr(type='positive')
+    def test_dependent_cleanups_run_in_order(self):
+        self.add('server')
+        self.add('volume', after=['server'])
+        self.add('router')
+        self.add('subnet', before=['router'])
+        self.assertEqual([], self.run_graph())
+        self.assertBefore('server', 'volume')
+        self.assertBefore('subnet', 'router')
+        self.assertEqual(0, len(self.graph))
+
+    @attr(type='positive')
+    def test_independent_cleanups_run_concurrently(self):
+        for key in range(4):
+            self.add(key, duration=0.2)
+        start = time.time()
+        self.assertEqual([], self.run_graph(threads=4))
+        self.assertLess(time.time() - start, 0.6)
+
+    @attr(type='positive')
+    def test_dependent_waits_for_check(self):
+        polls = []
+
+        def check():
+            polls.append(time.time())
+            return len(polls) >= 3
+
+        self.graph.add('server', self.recorder.cleanup('server'),
+                       check=check)
+        self.add('volume', after=['server'])
+        self.assertEqual([], self.run_graph())
+        self.assertEqual(3, len(polls))
+        self.assertBefore('server', 'volume')
+
+    @attr(type='positive')
+    def test_check_timeout_does_not_block_dependents(self):
+        self.graph.add('server', self.recorder.cleanup('server'),
+                       check=lambda: False)
+        self.add('volume', after=['server'])
+        self.assertEqual([], self.run_graph(check_timeout=0.05))
+        self.assertTrue(self.recorder.started('volume'))
+
+    @attr(type='negative')
+    def test_failure_does_not_block_dependents(self):
+        error = ValueError('delete failed')
+        self.add('server', error=error)
+        self.add('volume', after=['server'])
+        self.assertEqual([('server', error)], self.run_graph())
+        self.assertBefore('server', 'volume')
+
+    @attr(type='negative')
+    def test_failing_check_is_reported(self):
+        error = ValueError('check failed')
+
+        def check():
+            raise error
+
+        self.graph.add('server', self.recorder.cleanup('server'),
+                       check=check)
+        self.assertEqual([('server', error)], self.run_graph())
+
+    @attr(type='positive')
+    def test_cycle_is_broken_at_its_latest_added_cleanup(self):
+        self.add('first', after=['second'])
+        self.add('second', after=['first'])
+        self.add('third', after=['second'])
+        self.assertEqual([], self.run_graph())
+        self.assertBefore('second', 'first')
+        self.assertBefore('second', 'third')
+
+    @attr(type='positive')
+    def test_unknown_and_cancelled_dependencies_are_ignored(self):
+        self.add('server')
+        self.add('volume', after=['server', 'missing'])
+        self.graph.cancel('server')
+        self.assertEqual([], self.run_graph())
+        self.assertFalse(self.recorder.started('server'))
+        self.assertTrue(self.recorder.started('volume'))
+
+    @attr(type='positive')
+    def test_raise_failures(self):
+        cleanup.raise_failures([])
+        error = ValueError('single')
+        self.assertRaises(ValueError, cleanup.raise_failures,
+                          [('key', error)])
+        self.assertRaises(cleanup.exceptions.TearDownException,
+                          cleanup.raise_failures,
+                          [('a', error), ('b', error)])
+
+
+class InterruptibleGetTest(unittest.TestCase):
+
+    @attr(type='positive')
+    def test_get_returns_item_put_later(self):
+        results = Queue.Queue()
+        timer = threading.Timer(0.1, results.put, ('done',))
+        timer.start()
+        self.assertEqual('done', cleanup._get(results))
+
+    @attr(type='negative')
+    def test_get_times_out(self):
+        start = time.time()
+        self.assertRaises(Queue.Empty, cleanup._get, Queue.Queue(), 0.05)
+        self.assertLess(time.time() - start, 0.5)
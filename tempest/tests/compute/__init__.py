@@ -34,6 +34,12 @@ DISK_CONFIG_ENABLED_OVERRIDE = CONFIG.compute.disk_config_enabled_override
 FLAVOR_EXTRA_DATA_ENABLED = False
 MULTI_USER = False
 
+# setup_package only checks the configuration and sets the flags above,
+# so parallel workers (nosetests --processes) may run it themselves,
+# before every test class they are handed. The isolated credentials of
+# the classes come from the pool of the worker, see creds_pool.
+_multiprocess_can_split_ = True
+
 
 # All compute tests -- single setup function
 def setup_package():
@@ -38,8 +38,9 @@ class ListImageFiltersTest(BaseComputeTest):
         resp, cls.server2 = cls.servers_client.create_server(name,
                                                              cls.image_ref,
                                                              cls.flavor_ref)
-        cls.servers_client.wait_for_server_status(cls.server1['id'], 'ACTIVE')
-        cls.servers_client.wait_for_server_status(cls.server2['id'], 'ACTIVE')
+        cls.servers_client.wait_for_servers_status([cls.server1['id'],
+                                                    cls.server2['id']],
+                                                   'ACTIVE')
 
         # Create images to be used in the filter tests
         image1_name = rand_name('image')
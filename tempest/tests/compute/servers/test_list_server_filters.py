@@ -68,11 +68,10 @@ class ListServerFiltersTest(object):
         resp, cls.s3 = cls.client.create_server(cls.s3_name, cls.image_ref,
                                                 cls.flavor_ref_alt)
 
-        cls.client.wait_for_server_status(cls.s1['id'], 'ACTIVE')
+        cls.client.wait_for_servers_status([cls.s1['id'], cls.s2['id'],
+                                            cls.s3['id']], 'ACTIVE')
         resp, cls.s1 = cls.client.get_server(cls.s1['id'])
-        cls.client.wait_for_server_status(cls.s2['id'], 'ACTIVE')
         resp, cls.s2 = cls.client.get_server(cls.s2['id'])
-        cls.client.wait_for_server_status(cls.s3['id'], 'ACTIVE')
         resp, cls.s3 = cls.client.get_server(cls.s3['id'])
 
         # The list server call returns minimal results, so we need
@@ -93,7 +93,8 @@ class TestServerBasicOps(smoke.DefaultClientSmokeTest):
                 i_name, base_image_id, flavor_id, **create_kwargs)
         try:
             self.assertEqual(self.instance.name, i_name)
-            self.set_resource('instance', self.instance)
+            self.set_resource('instance', self.instance,
+                              delete_before=('keypair', 'secgroup'))
         except AttributeError:
             self.fail("Instance not successfully created.")
 
@@ -17,6 +17,7 @@
 
 from nose.plugins.attrib import attr
 
+from tempest.common import keypairs
 from tempest.common.utils.data_utils import rand_name
 from tempest.tests.compute import base
 
@@ -79,7 +80,8 @@ class ServersTestBase(object):
         try:
             server = None
             key_name = rand_name('key')
-            resp, keypair = self.keypairs_client.create_keypair(key_name)
+            resp, keypair = keypairs.import_keypair(self.keypairs_client,
+                                                    key_name)
             resp, body = self.keypairs_client.list_keypairs()
             server_name = rand_name('server')
             resp, server = self.create_server_with_extras(server_name,
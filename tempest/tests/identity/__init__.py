@@ -19,6 +19,10 @@ import logging
 
 LOG = logging.getLogger(__name__)
 
+# The tests work in the configured demo tenant rather than in isolated
+# tenants. The package fixture makes parallel runs (nosetests --processes)
+# hand the whole package to a single worker, so they never race.
+
 
 # All identity tests -- single setup function
 def setup_package():
@@ -53,7 +53,7 @@ class RolesTestBase(object):
 
     def test_list_roles_request_without_token(self):
         # Request to list roles without a valid token should fail
-        token = self.client.get_auth()
+        token = self.client.get_private_auth()
         self.client.delete_token(token)
         self.assertRaises(exceptions.Unauthorized, self.client.list_roles)
         self.client.clear_auth()
@@ -138,7 +138,7 @@ class UserRolesTestBase(RolesTestBase):
     def test_assign_user_role_request_without_token(self):
         # Request to assign a role to a user without a valid token
         (user, tenant, role) = self._get_role_params()
-        token = self.client.get_auth()
+        token = self.client.get_private_auth()
         self.client.delete_token(token)
         self.assertRaises(exceptions.Unauthorized,
                           self.client.assign_user_role, tenant['id'],
@@ -195,7 +195,7 @@ class UserRolesTestBase(RolesTestBase):
         resp, user_role = self.client.assign_user_role(tenant['id'],
                                                        user['id'],
                                                        role['id'])
-        token = self.client.get_auth()
+        token = self.client.get_private_auth()
         self.client.delete_token(token)
         self.assertRaises(exceptions.Unauthorized,
                           self.client.remove_user_role, tenant['id'],
@@ -248,7 +248,7 @@ class UserRolesTestBase(RolesTestBase):
     def test_list_user_roles_request_without_token(self):
         # Request to list user's roles without a valid token should fail
         (user, tenant, role) = self._get_role_params()
-        token = self.client.get_auth()
+        token = self.client.get_private_auth()
         self.client.delete_token(token)
         try:
             self.assertRaises(exceptions.Unauthorized,
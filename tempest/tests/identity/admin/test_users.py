@@ -113,8 +113,8 @@ class UsersTestBase(object):
     def test_create_user_request_without_a_token(self):
         # Request to create a user without a valid token should fail
         self.data.setup_test_tenant()
-        # Get the token of the current client
-        token = self.client.get_auth()
+        # Get a token of the current client only
+        token = self.client.get_private_auth()
         # Delete the token from database
         self.client.delete_token(token)
         self.assertRaises(exceptions.Unauthorized, self.client.create_user,
@@ -213,8 +213,8 @@ class UsersTestBase(object):
         self.data.setup_test_user()
         self.token_client.auth(self.data.test_user, self.data.test_password,
                                self.data.test_tenant)
-        # Get the token of the current client
-        token = self.client.get_auth()
+        # Get a token of the current client only
+        token = self.client.get_private_auth()
         # Delete the token from database
         self.client.delete_token(token)
         # Re-auth
@@ -242,7 +242,7 @@ class UsersTestBase(object):
     @attr(type='negative')
     def test_get_users_request_without_token(self):
         # Request to get list of users without a valid token should fail
-        token = self.client.get_auth()
+        token = self.client.get_private_auth()
         self.client.delete_token(token)
         self.assertRaises(exceptions.Unauthorized, self.client.get_users)
         self.client.clear_auth()
@@ -23,6 +23,7 @@ import nose
 
 from quantumclient.common import exceptions as exc
 
+from tempest.common import keypairs
 from tempest.common.utils.data_utils import rand_name
 from tempest import smoke
 from tempest import test
@@ -195,14 +196,25 @@ class TestNetworkBasicOps(smoke.DefaultClientSmokeTest):
         cls.keypairs = {}
         cls.security_groups = {}
         cls.networks = []
+        cls.subnets = []
         cls.servers = []
         cls.floating_ips = {}
 
+    @classmethod
+    def tearDownClass(cls):
+        try:
+            super(TestNetworkBasicOps, cls).tearDownClass()
+        finally:
+            keypairs.close_key_pool()
+
     def _create_keypair(self, client):
         kp_name = rand_name('keypair-smoke-')
-        keypair = client.keypairs.create(kp_name)
+        public_key, private_key = keypairs.get_key_pool(self.config).get()
+        keypair = client.keypairs.create(kp_name, public_key=public_key)
         try:
             self.assertEqual(keypair.id, kp_name)
+            # Nova only returns the private key of the keys it generates
+            keypair.private_key = private_key
             self.set_resource(kp_name, keypair)
         except AttributeError:
             self.fail("Keypair object not successfully created.")
@@ -307,6 +319,7 @@ class TestNetworkBasicOps(smoke.DefaultClientSmokeTest):
         configured for tenant networks.
         """
         cfg = self.config.network
+        name = rand_name('subnet-smoke-')
         tenant_cidr = netaddr.IPNetwork(cfg.tenant_network_cidr)
         result = None
         # Repeatedly attempt subnet creation with sequential cidr
@@ -314,6 +327,7 @@ class TestNetworkBasicOps(smoke.DefaultClientSmokeTest):
         for subnet_cidr in tenant_cidr.subnet(cfg.tenant_network_mask_bits):
             body = dict(
                 subnet=dict(
+                name=name,
                 ip_version=4,
                 network_id=network.id,
                 tenant_id=network.tenant_id,
@@ -331,7 +345,7 @@ class TestNetworkBasicOps(smoke.DefaultClientSmokeTest):
         subnet = DeletableSubnet(client=self.network_client,
                                  **result['subnet'])
         self.assertEqual(subnet.cidr, str(subnet_cidr))
-        self.set_resource(rand_name('subnet-smoke-'), subnet)
+        self.set_resource(name, subnet, delete_before=(network.name,))
         return subnet
 
     def _create_server(self, client, network, name, key_name, security_groups):
@@ -346,9 +360,14 @@ class TestNetworkBasicOps(smoke.DefaultClientSmokeTest):
         }
         server = client.servers.create(name, base_image_id, flavor_id,
                                        **create_kwargs)
+        # The server has to be gone before its network, key pair and
+        # security groups can be deleted
+        dependencies = ([network.name, key_name] + list(security_groups) +
+                        [subnet.name for subnet in self.subnets
+                         if subnet.network_id == network.id])
         try:
             self.assertEqual(server.name, name)
-            self.set_resource(name, server)
+            self.set_resource(name, server, delete_before=dependencies)
         except AttributeError:
             self.fail("Server not successfully created.")
         self.status_timeout(client.servers, server.id, 'ACTIVE')
@@ -356,7 +375,7 @@ class TestNetworkBasicOps(smoke.DefaultClientSmokeTest):
         # details, necessitating retrieval after it becomes active to
         # ensure correct details.
         server = client.servers.get(server.id)
-        self.set_resource(name, server)
+        self.set_resource(name, server, delete_before=dependencies)
         return server
 
     def _create_floating_ip(self, server, external_network_id):
@@ -375,7 +394,8 @@ class TestNetworkBasicOps(smoke.DefaultClientSmokeTest):
         result = self.network_client.create_floatingip(body=body)
         floating_ip = DeletableFloatingIp(client=self.network_client,
                                           **result['floatingip'])
-        self.set_resource(rand_name('floatingip-'), floating_ip)
+        self.set_resource(rand_name('floatingip-'), floating_ip,
+                          delete_before=(server.name,))
         return floating_ip
 
     def _ping_ip_address(self, ip_address):
@@ -405,7 +425,10 @@ class TestNetworkBasicOps(smoke.DefaultClientSmokeTest):
         router = self._get_router(self.tenant_id)
         subnet = self._create_subnet(network)
         subnet.add_to_router(router.id)
+        # Deleting the subnet removes its interface from the router
+        self.add_resource_dependency(subnet.name, router.name)
         self.networks.append(network)
+        self.subnets.append(subnet)
 
     def test_004_create_servers(self):
         if not (self.keypairs or self.security_groups or self.networks):
@@ -0,0 +1,28 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+
+LOG = logging.getLogger(__name__)
+
+# The tests work in the configured demo tenant rather than in isolated
+# tenants. The package fixture makes parallel runs (nosetests --processes)
+# hand the whole package to a single worker, so they never race.
+
+
+def setup_package():
+    LOG.debug("Entering tempest.tests.object_storage.setup_package")
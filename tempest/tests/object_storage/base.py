@@ -15,6 +15,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import logging
+
 import nose
 import unittest2 as unittest
 
@@ -22,6 +24,8 @@ from tempest import clients
 import tempest.config
 from tempest import exceptions
 
+LOG = logging.getLogger(__name__)
+
 
 class BaseObjectTest(unittest.TestCase):
 
@@ -40,3 +44,26 @@ class BaseObjectTest(unittest.TestCase):
             enabled = False
             skip_msg = "No OpenStack Object Storage API endpoint"
             raise nose.SkipTest(skip_msg)
+
+    @classmethod
+    def delete_containers(cls, containers):
+        """
+        Deletes every object of the containers, then the containers.
+
+        Objects which cannot be deleted are logged, their containers are
+        left in place, and a TearDownException counting them is raised
+        once the other containers are deleted.
+        """
+        failures = 0
+        for container in containers:
+            _resp, errors = cls.container_client.delete_container_objects(
+                container)
+            for name, exc in sorted(errors.items()):
+                LOG.error("Cannot delete object %s of container %s: %s",
+                          name, container, exc)
+            if errors:
+                failures += len(errors)
+                continue
+            cls.container_client.delete_container(container)
+        if failures:
+            raise exceptions.TearDownException(num=failures)
@@ -36,23 +36,11 @@ class ObjectExpiryTest(base.BaseObjectTest):
 
     @classmethod
     def tearDownClass(cls):
-        """The test script fails in tear down class
-        as the container contains expired objects (LP bug 1069849).
-        But delete action for the expired object is raising
-        NotFound exception and also non empty container cannot be deleted."""
+        """The container may still list expired objects (LP bug 1069849).
+        Deleting them raises NotFound, delete_container_objects counts them
+        as deleted, but the container may then still refuse deletion."""
 
-        #Get list of all object in the container
-        objlist = \
-            cls.container_client.list_all_container_objects(cls.container_name)
-
-        #Attempt to delete every object in the container
-        if objlist:
-            for obj in objlist:
-                resp, _ = cls.object_client.delete_object(cls.container_name,
-                                                          obj['name'])
-
-        #Attempt to delete the container
-        resp, _ = cls.container_client.delete_container(cls.container_name)
+        cls.delete_containers([cls.container_name])
 
     @unittest.skip('Until bug 1069849 is resolved.')
     @attr(type='regression')
@@ -35,17 +35,7 @@ class ObjectTest(base.BaseObjectTest):
 
     @classmethod
     def tearDownClass(cls):
-        #Get list of all object in the container
-        objlist = \
-            cls.container_client.list_all_container_objects(cls.container_name)
-
-        #Attempt to delete every object in the container
-        for obj in objlist:
-            resp, _ = cls.object_client.delete_object(cls.container_name,
-                                                      obj['name'])
-
-        #Attempt to delete the container
-        resp, _ = cls.container_client.delete_container(cls.container_name)
+        cls.delete_containers([cls.container_name])
 
     @attr(type='smoke')
     def test_create_object(self):
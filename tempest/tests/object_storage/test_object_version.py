@@ -29,18 +29,7 @@ class ContainerTest(base.BaseObjectTest):
 
     @classmethod
     def tearDownClass(cls):
-        for container in cls.containers:
-            #Get list of all object in the container
-            objlist = \
-                cls.container_client.list_all_container_objects(container)
-
-            #Attempt to delete every object in the container
-            for obj in objlist:
-                resp, _ = \
-                    cls.object_client.delete_object(container, obj['name'])
-
-            #Attempt to delete the container
-            resp, _ = cls.container_client.delete_container(container)
+        cls.delete_containers(cls.containers)
 
     def assertContainer(self, container, count, byte, versioned):
         resp, _ = self.container_client.list_container_metadata(container)
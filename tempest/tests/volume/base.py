@@ -16,12 +16,13 @@
 #    under the License.
 
 import logging
-import time
 
 import nose
 import unittest2 as unittest
 
 from tempest import clients
+from tempest.common import creds_pool
+from tempest.common import polling
 from tempest.common.utils.data_utils import rand_name
 from tempest import config
 from tempest import exceptions
@@ -37,6 +38,7 @@ class BaseVolumeTest(unittest.TestCase):
     def setUpClass(cls):
         cls.config = config.TempestConfig()
         cls.isolated_creds = []
+        cls._leased_creds = []
 
         if cls.config.compute.allow_tenant_isolation:
             creds = cls._get_isolated_creds()
@@ -79,43 +81,31 @@ class BaseVolumeTest(unittest.TestCase):
     @classmethod
     def _get_isolated_creds(cls):
         """
-        Creates a new set of user/tenant/password credentials for a
-        **regular** user of the Volume API so that a test case can
-        operate in an isolated tenant container.
+        Leases a set of user/tenant/password credentials of a **regular**
+        user of the Volume API from the isolated credentials pool, so that
+        a test case can operate in an isolated tenant container. When the
+        pool has none left, new ones are named after the test class.
         """
-        admin_client = cls._get_identity_admin_client()
         rand_name_root = cls.__name__
         if cls.isolated_creds:
-            # Main user already created. Create the alt one...
+            # Main user already leased. Lease the alt one...
             rand_name_root += '-alt'
-        username = rand_name_root + "-user"
-        email = rand_name_root + "@example.com"
-        tenant_name = rand_name_root + "-tenant"
-        tenant_desc = tenant_name + "-desc"
-        password = "pass"
-
-        resp, tenant = admin_client.create_tenant(name=tenant_name,
-                                                  description=tenant_desc)
-        resp, user = admin_client.create_user(username,
-                                              password,
-                                              tenant['id'],
-                                              email)
+        creds = creds_pool.get_pool(cls.config).lease(rand_name_root)
+        cls._leased_creds.append(creds)
         # Store the complete creds (including UUID ids...) for later
         # but return just the username, tenant_name, password tuple
         # that the various clients will use.
-        cls.isolated_creds.append((user, tenant))
+        cls.isolated_creds.append((creds.user, creds.tenant))
 
-        return username, tenant_name, password
+        return creds.username, creds.tenant_name, creds.password
 
     @classmethod
     def clear_isolated_creds(cls):
-        if not cls.isolated_creds:
-            pass
-        admin_client = cls._get_identity_admin_client()
-
-        for user, tenant in cls.isolated_creds:
-            admin_client.delete_user(user['id'])
-            admin_client.delete_tenant(tenant['id'])
+        pool = creds_pool.get_pool(cls.config)
+        for creds in cls._leased_creds:
+            pool.release(creds)
+        cls._leased_creds = []
+        cls.isolated_creds = []
 
     @classmethod
     def tearDownClass(cls):
@@ -134,7 +124,9 @@ class BaseVolumeTest(unittest.TestCase):
 
     def wait_for(self, condition):
         """Repeatedly calls condition() until a timeout."""
-        start_time = int(time.time())
+        policy = polling.BackoffPolicy.from_config(self.config,
+                                                   self.build_interval)
+        poller = polling.Poller(self.build_timeout, policy)
         while True:
             try:
                 condition()
@@ -142,10 +134,10 @@ class BaseVolumeTest(unittest.TestCase):
                 pass
             else:
                 return
-            if int(time.time()) - start_time >= self.build_timeout:
+            if poller.expired():
                 condition()
                 return
-            time.sleep(self.build_interval)
+            poller.sleep()
 
 
 class BaseVolumeTestJSON(BaseVolumeTest):
@@ -24,7 +24,9 @@ import sys
 import nose
 from sqlalchemy import create_engine, MetaData
 
+from tempest.common import ssh
 from tempest.common.ssh import Client
+from tempest.common import teardown
 from tempest.common.utils.data_utils import rand_name
 from tempest import exceptions
 from tempest import test
@@ -88,21 +90,21 @@ class ComputeWhiteboxTest(test.ComputeFuzzClientTest, WhiteboxTest):
 
     @classmethod
     def tearDownClass(cls):
-        # NOTE(jaypipes): Tests often add things in a particular order
-        # so we destroy resources in the reverse order in which resources
-        # are added to the test class object
-        if not cls.resources:
-            return
-        thing = cls.resources.pop()
-        while True:
+        # NOTE(jaypipes): Tests often add things in a particular order,
+        # set_resource tells which resources have to be deleted before
+        # others and the independent ones are deleted concurrently
+        ssh.close_connections()
+
+        def delete(thing):
             LOG.debug("Deleting %r from shared resources of %s" %
                       (thing, cls.__name__))
             # Resources in novaclient all have a delete() method
             # which destroys the resource...
             thing.delete()
-            if not cls.resources:
-                return
-            thing = cls.resources.pop()
+
+        graph = cls.resource_cleanups(delete)
+        del cls.resources[:]
+        teardown.raise_failures(graph.run())
 
     @classmethod
     def create_server(cls, image_id=None):